@@ -16,6 +16,10 @@ so that any external authentication system can be used inside of Salt
 # Import python libs
 from __future__ import absolute_import, print_function, unicode_literals
 import collections
+import hashlib
+import hmac
+import os
+import threading
 import time
 import logging
 import random
@@ -24,13 +28,16 @@ from salt.ext.six.moves import input
 from salt.ext import six
 
 # Import salt libs
+import salt.cache
 import salt.config
 import salt.loader
 import salt.transport.client
 import salt.utils.args
 import salt.utils.dictupdate
 import salt.utils.files
+import salt.utils.json
 import salt.utils.minions
+import salt.utils.stringutils
 import salt.utils.user
 import salt.utils.versions
 import salt.utils.zeromq
@@ -52,6 +59,142 @@ AUTH_INTERNAL_KEYWORDS = frozenset([
 ])
 
 
+class EauthCache(object):
+    '''
+    Cache of the results of the external authentication modules
+
+    .. versionadded:: Fluorine
+
+    Caches the result of the ``auth``, ``groups`` and ``acl`` functions of an
+    eauth module for ``eauth_cache_ttl`` seconds, and failed authentications
+    for ``eauth_cache_negative_ttl`` seconds. The entries are keyed by a
+    salted HMAC of the credentials passed to the module and kept in memory,
+    shared by the ``LoadAuth`` instances of a process and bounded to
+    ``eauth_cache_size`` entries. With ``eauth_cache_shared``, the successful
+    results are also stored in the ``eauth_cache`` bank of the master cache,
+    so that all the master processes share them, keyed with the private key
+    of the master.
+    '''
+    # (kind, digest) -> (expire, value), oldest first
+    _entries = collections.OrderedDict()
+    _lock = threading.Lock()
+    _key = os.urandom(32)
+    stats = {'hits': 0, 'negative_hits': 0, 'misses': 0}
+
+    def __init__(self, opts):
+        self.ttl = opts.get('eauth_cache_ttl', 0)
+        self.negative_ttl = opts.get('eauth_cache_negative_ttl', 0)
+        self.size = opts.get('eauth_cache_size', 1000)
+        self.key = self._key
+        self.shared = None
+        if self.ttl and opts.get('eauth_cache_shared', False):
+            try:
+                with salt.utils.files.fopen(
+                        os.path.join(opts['pki_dir'], 'master.pem'), 'rb') as fp_:
+                    self.key = hashlib.sha256(fp_.read()).digest()
+                self.shared = salt.cache.factory(opts)
+            except (IOError, OSError, KeyError) as exc:
+                log.warning('Unable to share the eauth cache: %s', exc)
+
+    def digest(self, fun, load):
+        '''
+        Return the salted digest of the arguments ``fun`` is called with for
+        ``load``, or None if the cache is disabled
+        '''
+        if not self.ttl:
+            return None
+        fcall = salt.utils.args.format_call(
+            fun, load, expected_extra_kws=AUTH_INTERNAL_KEYWORDS)
+        try:
+            creds = salt.utils.json.dumps(
+                [load.get('eauth'), fcall.get('args', []), fcall.get('kwargs', {})],
+                sort_keys=True)
+        except (TypeError, ValueError):
+            return None
+        return hmac.new(self.key, salt.utils.stringutils.to_bytes(creds),
+                        hashlib.sha256).hexdigest()
+
+    def get(self, kind, digest):
+        '''
+        Return the cached ``kind`` result for the credentials ``digest`` as a
+        ``(expire, result)`` tuple, or None if there is none
+        '''
+        if digest is None:
+            return None
+        name = '{0}_{1}'.format(kind, digest)
+        entry = self._entries.get((kind, digest))
+        if entry is None and self.shared is not None:
+            try:
+                entry = self.shared.fetch('eauth_cache', name)
+            except Exception as exc:
+                log.debug('Unable to read the shared eauth cache: %s', exc)
+            entry = tuple(entry) if entry else None
+            if entry is not None:
+                self._set(kind, digest, entry)
+        if entry is None or entry[0] < time.time():
+            EauthCache.stats['misses'] += 1
+            if entry is not None:
+                with self._lock:
+                    self._entries.pop((kind, digest), None)
+                if self.shared is not None:
+                    try:
+                        self.shared.flush('eauth_cache', name)
+                    except Exception as exc:
+                        log.debug('Unable to flush the shared eauth cache: %s', exc)
+            return None
+        if kind == 'auth' and not entry[1]:
+            EauthCache.stats['negative_hits'] += 1
+        else:
+            EauthCache.stats['hits'] += 1
+        return entry
+
+    def _set(self, kind, digest, entry):
+        with self._lock:
+            self._entries.pop((kind, digest), None)
+            self._entries[(kind, digest)] = entry
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def set(self, kind, digest, value, negative=False):
+        '''
+        Cache the ``kind`` result for the credentials ``digest``, for
+        ``eauth_cache_negative_ttl`` seconds if it is a ``negative`` one
+        '''
+        ttl = self.negative_ttl if negative else self.ttl
+        if digest is None or not ttl:
+            return
+        entry = (time.time() + ttl, value)
+        self._set(kind, digest, entry)
+        # Failed authentications are only cached in memory: they are short
+        # lived, and anyone could fill the shared bank with them
+        if self.shared is not None and not negative:
+            try:
+                self.shared.store('eauth_cache', '{0}_{1}'.format(kind, digest), list(entry))
+            except Exception as exc:
+                log.debug('Unable to write the shared eauth cache: %s', exc)
+
+    @classmethod
+    def get_stats(cls):
+        '''
+        Return the hit counts of the cache
+        '''
+        ret = dict(cls.stats)
+        lookups = ret['hits'] + ret['negative_hits'] + ret['misses']
+        ret['hit_rate'] = float(ret['hits'] + ret['negative_hits']) / lookups if lookups else 0.0
+        ret['entries'] = len(cls._entries)
+        return ret
+
+    @classmethod
+    def clear(cls):
+        '''
+        Drop the entries cached in memory and reset the hit counts
+        '''
+        with cls._lock:
+            cls._entries.clear()
+            for name in cls.stats:
+                cls.stats[name] = 0
+
+
 class LoadAuth(object):
     '''
     Wrap the authentication system to handle peripheral components
@@ -63,6 +206,7 @@ class LoadAuth(object):
         self.auth = salt.loader.auth(opts)
         self.tokens = salt.loader.eauth_tokens(opts)
         self.ckminions = ckminions or salt.utils.minions.CkMinions(opts)
+        self.cache = EauthCache(opts)
 
     def load_name(self, load):
         '''
@@ -80,7 +224,7 @@ class LoadAuth(object):
         except IndexError:
             return ''
 
-    def __auth_call(self, load):
+    def __auth_call(self, load, digest=None):
         '''
         Return the token and set the cache data for use
 
@@ -98,19 +242,37 @@ class LoadAuth(object):
             expected_extra_kws=AUTH_INTERNAL_KEYWORDS)
         try:
             if 'kwargs' in fcall:
-                return self.auth[fstr](*fcall['args'], **fcall['kwargs'])
+                ret = self.auth[fstr](*fcall['args'], **fcall['kwargs'])
             else:
-                return self.auth[fstr](*fcall['args'])
+                ret = self.auth[fstr](*fcall['args'])
         except Exception as e:
+            # Not a rejection of the credentials, so it is not cached
             log.debug('Authentication module threw %s', e)
             return False
+        self.cache.set('auth', digest, ret, negative=not ret)
+        return ret
+
+    def _cache_digest(self, load):
+        '''
+        Return the digest of the credentials in the load the eauth cache is
+        keyed by, or None if they are not cached
+        '''
+        fstr = '{0}.auth'.format(load.get('eauth'))
+        if fstr not in self.auth:
+            return None
+        return self.cache.digest(self.auth[fstr], load)
 
     def time_auth(self, load):
         '''
         Make sure that all failures happen in the same amount of time
         '''
         start = time.time()
-        ret = self.__auth_call(load)
+        digest = self._cache_digest(load)
+        cached = self.cache.get('auth', digest)
+        if cached is not None:
+            ret = cached[1]
+        else:
+            ret = self.__auth_call(load, digest)
         if ret:
             return ret
         f_time = time.time() - start
@@ -121,8 +283,9 @@ class LoadAuth(object):
                 self.max_fail - deviation,
                 self.max_fail + deviation
                 )
-        while start + r_time > time.time():
-            time.sleep(0.001)
+        remaining = start + r_time - time.time()
+        if remaining > 0:
+            time.sleep(remaining)
         return False
 
     def __get_acl(self, load):
@@ -139,15 +302,21 @@ class LoadAuth(object):
         fstr = '{0}.acl'.format(mod)
         if fstr not in self.auth:
             return None
+        digest = self._cache_digest(load)
+        cached = self.cache.get('acl', digest)
+        if cached is not None:
+            return cached[1]
         fcall = salt.utils.args.format_call(
             self.auth[fstr],
             load,
             expected_extra_kws=AUTH_INTERNAL_KEYWORDS)
         try:
-            return self.auth[fstr](*fcall['args'], **fcall['kwargs'])
+            ret = self.auth[fstr](*fcall['args'], **fcall['kwargs'])
         except Exception as e:
             log.debug('Authentication module threw %s', e)
             return None
+        self.cache.set('acl', digest, ret)
+        return ret
 
     def __process_acl(self, load, auth_list):
         '''
@@ -175,16 +344,22 @@ class LoadAuth(object):
         fstr = '{0}.groups'.format(load['eauth'])
         if fstr not in self.auth:
             return False
+        digest = self._cache_digest(load)
+        cached = self.cache.get('groups', digest)
+        if cached is not None:
+            return cached[1]
         fcall = salt.utils.args.format_call(
             self.auth[fstr],
             load,
             expected_extra_kws=AUTH_INTERNAL_KEYWORDS)
         try:
-            return self.auth[fstr](*fcall['args'], **fcall['kwargs'])
+            ret = self.auth[fstr](*fcall['args'], **fcall['kwargs'])
         except IndexError:
             return False
         except Exception:
             return None
+        self.cache.set('groups', digest, ret)
+        return ret
 
     def _allow_custom_expire(self, load):
         '''
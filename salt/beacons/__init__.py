@@ -7,16 +7,34 @@ from __future__ import absolute_import
 import logging
 import copy
 import re
+import threading
 
 # Import Salt libs
 import salt.loader
 import salt.utils.event
 import salt.utils.minion
+import salt.utils.process
 from salt.ext.six.moves import map
 from salt.exceptions import CommandExecutionError
 
 log = logging.getLogger(__name__)
 
+# The minion re-creates the Beacon object on every beacons and pillar refresh,
+# the worker threads are shared between those instances so they don't pile up
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _get_pool(num_threads):
+    '''
+    Return the process wide beacon thread pool with the given number of
+    worker threads
+    '''
+    with _POOLS_LOCK:
+        if num_threads not in _POOLS:
+            _POOLS[num_threads] = salt.utils.process.ThreadPool(num_threads=num_threads)
+        return _POOLS[num_threads]
+
 
 class Beacon(object):
     '''
@@ -27,6 +45,18 @@ class Beacon(object):
         self.functions = functions
         self.beacons = salt.loader.beacons(opts, functions)
         self.interval_map = dict()
+        # Last batch of events emitted by each beacon, used by emit_on_change
+        self.last_events = dict()
+        # When beacons_workers is set the beacons are run in a thread pool so
+        # that a slow beacon does not hold up the others or the minion loop.
+        # Events from beacons that finish are collected on the next pass.
+        self.pool = None
+        self.running = set()
+        self.finished = []
+        self._finished_lock = threading.Lock()
+        workers = self.opts.get('beacons_workers', 0)
+        if workers and workers > 0:
+            self.pool = _get_pool(workers)
 
     def process(self, config, grains):
         '''
@@ -95,6 +125,9 @@ class Beacon(object):
                         else:
                             log.info('Skipping beacon %s. State run in progress.', mod)
                         continue
+                emit_on_change = self._determine_beacon_config(current_beacon_config, 'emit_on_change')
+                if 'emit_on_change' in current_beacon_config:
+                    b_config = self._trim_config(b_config, mod, 'emit_on_change')
                 # Update __grains__ on the beacon
                 self.beacons[fun_str].__globals__['__grains__'] = grains
 
@@ -108,21 +141,69 @@ class Beacon(object):
                                  'not running.\n%s', mod, vcomment)
                         continue
 
-                # Fire the beacon!
-                raw = self.beacons[fun_str](b_config[mod])
-                for data in raw:
-                    tag = 'salt/beacon/{0}/{1}/'.format(self.opts['id'], mod)
-                    if 'tag' in data:
-                        tag += data.pop('tag')
-                    if 'id' not in data:
-                        data['id'] = self.opts['id']
-                    ret.append({'tag': tag, 'data': data})
+                if self.pool is not None:
+                    if mod in self.running:
+                        log.trace('Skipping beacon %s. Previous run still in progress.', mod)
+                        continue
+                    self.running.add(mod)
+                    if not self.pool.fire_async(self._run_beacon_async,
+                                                args=[mod, b_config[mod], emit_on_change]):
+                        self.running.discard(mod)
+                        log.warning('Unable to queue beacon %s, the beacon thread pool is full', mod)
+                        continue
+                else:
+                    # Fire the beacon!
+                    ret.extend(self._run_beacon(mod, b_config[mod], emit_on_change))
                 if runonce:
                     self.disable_beacon(mod)
             else:
                 log.warning('Unable to process beacon %s', mod)
+        if self.pool is not None:
+            with self._finished_lock:
+                ret.extend(self.finished)
+                self.finished = []
         return ret
 
+    def _run_beacon(self, mod, config, emit_on_change=False):
+        '''
+        Execute a single beacon and return the events it generated
+        '''
+        ret = []
+        raw = self.beacons['{0}.beacon'.format(mod)](config)
+        for data in raw:
+            tag = 'salt/beacon/{0}/{1}/'.format(self.opts['id'], mod)
+            if 'tag' in data:
+                tag += data.pop('tag')
+            if 'id' not in data:
+                data['id'] = self.opts['id']
+            ret.append({'tag': tag, 'data': data})
+        if emit_on_change:
+            ret = self._filter_unchanged(mod, ret)
+        return ret
+
+    def _run_beacon_async(self, mod, config, emit_on_change=False):
+        '''
+        Execute a single beacon from the thread pool, the events are handed
+        back to the next call to ``process``
+        '''
+        try:
+            events = self._run_beacon(mod, config, emit_on_change)
+            with self._finished_lock:
+                self.finished.extend(events)
+        except Exception:
+            log.error('The beacon %s errored:', mod, exc_info=True)
+        finally:
+            self.running.discard(mod)
+
+    def _filter_unchanged(self, mod, events):
+        '''
+        Drop the events which are identical to the ones the beacon generated
+        on its previous run
+        '''
+        previous = self.last_events.get(mod, [])
+        self.last_events[mod] = events
+        return [event for event in events if event not in previous]
+
     def _trim_config(self, b_config, mod, key):
         '''
         Take a beacon configuration and strip out the interval bits
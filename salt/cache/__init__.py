@@ -7,19 +7,52 @@ Loader mechanism for caching data, with data expiration, etc.
 
 # Import Python libs
 from __future__ import absolute_import, print_function, unicode_literals
+import atexit
+import errno
 import logging
+import os
+import shutil
+import threading
 import time
 
 # Import Salt libs
 import salt.config
+from salt.exceptions import SaltCacheError
 from salt.ext import six
 from salt.payload import Serial
 from salt.utils.odict import OrderedDict
 import salt.loader
 import salt.syspaths
+import salt.utils.atomicfile
+import salt.utils.event
+import salt.utils.files
+import salt.utils.path
 
 log = logging.getLogger(__name__)
 
+# The cache objects holding stores delayed by ``cache_write_window``
+_PENDING = set()
+_PENDING_LOCK = threading.Lock()
+
+
+def write_pending():
+    '''
+    Write the delayed stores of all the cache objects of the process
+
+    .. versionadded:: Fluorine
+    '''
+    with _PENDING_LOCK:
+        caches = list(_PENDING)
+    for cache in caches:
+        try:
+            cache.write_pending()
+        except SaltCacheError:
+            # Already logged
+            pass
+
+
+atexit.register(write_pending)
+
 
 def factory(opts, **kwargs):
     '''
@@ -66,6 +99,16 @@ class Cache(object):
 
     Key name is a string identifier of a data container (like a file inside a
     directory) which will hold the data.
+
+    Write-behind.
+
+    If ``cache_write_window`` is set, the stores are delayed for up to that
+    many seconds, or until ``cache_write_max_items`` keys are waiting, then
+    written in one batch with the driver's ``store_many`` function if it has
+    one. The repeated stores to a key in the meantime only write the last
+    value, and the values which the cache already holds are not written again.
+    The delayed stores are seen by this object, but not by the other
+    processes until they are written.
     '''
     def __init__(self, opts, cachedir=None, **kwargs):
         self.opts = opts
@@ -78,6 +121,13 @@ class Cache(object):
         self._modules = None
         self._kwargs = kwargs
         self._kwargs['cachedir'] = self.cachedir
+        self.write_window = opts.get('cache_write_window', 0)
+        self.write_max = opts.get('cache_write_max_items', 1000)
+        # (bank, key) -> (serialized data, time stored) of the delayed stores
+        self._pending = OrderedDict()
+        self._pending_since = None
+        # Whether the last write of the delayed stores failed
+        self._pending_failed = False
 
     def __lazy_init(self):
         self._modules = salt.loader.cache(self.opts, self.serial)
@@ -93,6 +143,78 @@ class Cache(object):
             self.__lazy_init()
         return self._modules
 
+    def _written(self, bank_keys):
+        '''
+        Called once ``(bank, key)`` pairs were stored or flushed in the cache
+        backend, a key of None meaning a whole bank
+        '''
+        pass
+
+    def _pending_banks(self, bank):
+        '''
+        Return the entries of a bank holding delayed stores
+        '''
+        ret = set()
+        prefix = bank + '/'
+        for pbank, pkey in self._pending:
+            if pbank == bank:
+                ret.add(pkey)
+            elif pbank.startswith(prefix):
+                ret.add(pbank[len(prefix):].split('/')[0])
+        return ret
+
+    def write_pending(self):
+        '''
+        Write the stores delayed by ``cache_write_window`` in one batch,
+        skipping the values the cache already holds. The stores stay delayed
+        until they are written, if the write fails they are retried after
+        another ``cache_write_window``.
+
+        .. versionadded:: Fluorine
+
+        :raises SaltCacheError:
+            Raises an exception if cache driver detected an error accessing data
+            in the cache backend (auth, permissions, etc).
+        '''
+        with _PENDING_LOCK:
+            if not self._pending:
+                return
+            # The stores stay pending until they are written
+            pending = list(six.iteritems(self._pending))
+        items = [(bank, key, value) for (bank, key), (value, _) in pending]
+        fun = '{0}.store_many'.format(self.driver)
+        try:
+            if fun in self.modules:
+                written = self.modules[fun](items, **self._kwargs)
+            else:
+                written = 0
+                fetch = self.modules['{0}.fetch'.format(self.driver)]
+                store = self.modules['{0}.store'.format(self.driver)]
+                for bank, key, value in items:
+                    current = fetch(bank, key, **self._kwargs)
+                    if current != {} and self.serial.dumps(current) == value:
+                        continue
+                    store(bank, key, self.serial.loads(value), **self._kwargs)
+                    written += 1
+        except SaltCacheError as exc:
+            log.error('Unable to write %s delayed cache stores: %s', len(items), exc)
+            with _PENDING_LOCK:
+                # Retry after another window
+                self._pending_failed = True
+                self._pending_since = time.time()
+            raise
+        log.debug('Wrote %s of %s delayed cache stores', written, len(items))
+        with _PENDING_LOCK:
+            self._pending_failed = False
+            for bank_key, stored in pending:
+                # Keep the keys stored again in the meantime
+                if self._pending.get(bank_key) is stored:
+                    del self._pending[bank_key]
+            if not self._pending:
+                self._pending_since = None
+                _PENDING.discard(self)
+        self._written([(bank, key) for bank, key, _ in items])
+
     def cache(self, bank, key, fun, loop_fun=None, **kwargs):
         '''
         Check cache for the data. If it is there, check to see if it needs to
@@ -152,8 +274,28 @@ class Cache(object):
             Raises an exception if cache driver detected an error accessing data
             in the cache backend (auth, permissions, etc).
         '''
+        if self.write_window:
+            now = time.time()
+            value = self.serial.dumps(data)
+            with _PENDING_LOCK:
+                if not self._pending:
+                    self._pending_since = now
+                    _PENDING.add(self)
+                self._pending[(bank, key)] = (value, now)
+                due = now - self._pending_since >= self.write_window or \
+                    len(self._pending) >= self.write_max and not self._pending_failed
+            if due:
+                try:
+                    self.write_pending()
+                except SaltCacheError:
+                    # Already logged, the stores stay pending, and the failure
+                    # may not be about this key
+                    pass
+            return
         fun = '{0}.store'.format(self.driver)
-        return self.modules[fun](bank, key, data, **self._kwargs)
+        ret = self.modules[fun](bank, key, data, **self._kwargs)
+        self._written([(bank, key)])
+        return ret
 
     def fetch(self, bank, key):
         '''
@@ -176,9 +318,84 @@ class Cache(object):
             Raises an exception if cache driver detected an error accessing data
             in the cache backend (auth, permissions, etc).
         '''
+        pending = self._pending.get((bank, key))
+        if pending is not None:
+            return self.serial.loads(pending[0])
         fun = '{0}.fetch'.format(self.driver)
         return self.modules[fun](bank, key, **self._kwargs)
 
+    def fetch_many(self, bank_keys):
+        '''
+        Fetch the data of several keys using the specified module, in a single
+        request to the cache backend when the driver supports it
+
+        .. versionadded:: Fluorine
+
+        :param bank_keys:
+            An iterable of ``(bank, key)`` pairs to fetch.
+
+        :return:
+            Return a dict of the python objects fetched from the cache by
+            ``(bank, key)`` pair, with an empty dict for the keys not found.
+
+        :raises SaltCacheError:
+            Raises an exception if cache driver detected an error accessing data
+            in the cache backend (auth, permissions, etc).
+        '''
+        ret = {}
+        missing = []
+        for bank_key in bank_keys:
+            pending = self._pending.get(bank_key)
+            if pending is not None:
+                ret[bank_key] = self.serial.loads(pending[0])
+            elif bank_key not in ret:
+                missing.append(bank_key)
+        if not missing:
+            return ret
+        fun = '{0}.fetch_many'.format(self.driver)
+        if fun in self.modules:
+            ret.update(self.modules[fun](missing, **self._kwargs))
+            for bank_key in missing:
+                ret.setdefault(bank_key, {})
+        else:
+            fun = '{0}.fetch'.format(self.driver)
+            for bank, key in missing:
+                ret[(bank, key)] = self.modules[fun](bank, key, **self._kwargs)
+        return ret
+
+    def fetch_bank(self, bank):
+        '''
+        Fetch the data of all the keys of a bank using the specified module, in
+        a single request to the cache backend when the driver supports it
+
+        .. versionadded:: Fluorine
+
+        :param bank:
+            The name of the location inside the cache which holds the keys.
+
+        :return:
+            Return a dict of the python objects fetched from the cache by key.
+            The sub-banks of the bank are not included, nor, with the drivers
+            which can't tell them apart from the sub-banks, the keys holding an
+            empty dict.
+
+        :raises SaltCacheError:
+            Raises an exception if cache driver detected an error accessing data
+            in the cache backend (auth, permissions, etc).
+        '''
+        fun = '{0}.fetch_bank'.format(self.driver)
+        if fun in self.modules:
+            ret = self.modules[fun](bank, **self._kwargs)
+        else:
+            entries = self.modules['{0}.list'.format(self.driver)](bank, **self._kwargs)
+            fetched = self.fetch_many((bank, entry) for entry in entries or [])
+            ret = dict((key, data) for (_, key), data in six.iteritems(fetched)
+                       if data != {})
+        for (pbank, pkey), (value, _) in list(self._pending.items()):
+            if pbank == bank:
+                ret[pkey] = self.serial.loads(value)
+        return ret
+
     def updated(self, bank, key):
         '''
         Get the last updated epoch for the specified key
@@ -200,6 +417,9 @@ class Cache(object):
             Raises an exception if cache driver detected an error accessing data
             in the cache backend (auth, permissions, etc).
         '''
+        pending = self._pending.get((bank, key))
+        if pending is not None:
+            return int(pending[1])
         fun = '{0}.updated'.format(self.driver)
         return self.modules[fun](bank, key, **self._kwargs)
 
@@ -221,8 +441,17 @@ class Cache(object):
             Raises an exception if cache driver detected an error accessing data
             in the cache backend (auth, permissions, etc).
         '''
+        if self._pending:
+            with _PENDING_LOCK:
+                prefix = bank + '/'
+                for pbank, pkey in list(self._pending):
+                    if (pbank, pkey) == (bank, key) or key is None and \
+                            (pbank == bank or pbank.startswith(prefix)):
+                        del self._pending[(pbank, pkey)]
         fun = '{0}.flush'.format(self.driver)
-        return self.modules[fun](bank, key=key, **self._kwargs)
+        ret = self.modules[fun](bank, key=key, **self._kwargs)
+        self._written([(bank, key)])
+        return ret
 
     def list(self, bank):
         '''
@@ -241,7 +470,12 @@ class Cache(object):
             in the cache backend (auth, permissions, etc).
         '''
         fun = '{0}.list'.format(self.driver)
-        return self.modules[fun](bank, **self._kwargs)
+        ret = self.modules[fun](bank, **self._kwargs)
+        if self._pending:
+            pending = self._pending_banks(bank).difference(ret)
+            if pending:
+                ret = list(ret) + sorted(pending)
+        return ret
 
     def contains(self, bank, key=None):
         '''
@@ -265,39 +499,144 @@ class Cache(object):
             Raises an exception if cache driver detected an error accessing data
             in the cache backend (auth, permissions, etc).
         '''
+        if self._pending:
+            if key is None:
+                if self._pending_banks(bank):
+                    return True
+            elif (bank, key) in self._pending:
+                return True
         fun = '{0}.contains'.format(self.driver)
         return self.modules[fun](bank, key, **self._kwargs)
 
 
 class MemCache(Cache):
     '''
-    Short-lived in-memory cache store keeping values on time and/or size (count)
-    basis.
+    Short-lived in-memory cache store keeping values on time and/or size (count
+    and bytes) basis, evicting the least recently used values first.
+
+    With ``memcache_shared``, the values fetched from the cache backend are
+    also kept for the other master processes in files under
+    ``memcache_shared_dir``, and a ``salt/cache/store`` event is fired when
+    values are written, so that the processes listening to the events drop them
+    from memory. The expired files are removed by :py:meth:`clean_shared`.
     '''
     # {<storage_id>: odict({<key>: [atime, data], ...}), ...}
     data = {}
+    # {<storage_id>: {<key>: size in bytes, ...}, ...}
+    sizes = {}
+    # {<storage_id>: total size in bytes, ...}
+    nbytes = {}
+    # (pid, event) used to fire the store events of the process
+    _event = (None, None)
+    # The event listening to the store events of the other processes
+    _listener = None
 
     def __init__(self, opts, **kwargs):
         super(MemCache, self).__init__(opts, **kwargs)
         self.expire = opts.get('memcache_expire_seconds', 10)
         self.max = opts.get('memcache_max_items', 1024)
+        self.max_bytes = opts.get('memcache_max_bytes', 0)
         self.cleanup = opts.get('memcache_full_cleanup', False)
         self.debug = opts.get('memcache_debug', False)
+        self.shared = opts.get('memcache_shared', False)
+        self.shared_dir = opts.get('memcache_shared_dir') or \
+            os.path.join(self.cachedir, 'memcache')
         if self.debug:
             self.call = 0
             self.hit = 0
         self._storage = None
+        self._storage_id = None
+
+    @classmethod
+    def __forget(cls, storage_id, key):
+        size = cls.sizes.get(storage_id, {}).pop(key, 0)
+        if size:
+            cls.nbytes[storage_id] -= size
 
     @classmethod
     def __cleanup(cls, expire):
         now = time.time()
-        for storage in six.itervalues(cls.data):
+        for storage_id, storage in six.iteritems(cls.data):
             for key, data in list(storage.items()):
                 if data[0] + expire < now:
                     del storage[key]
+                    cls.__forget(storage_id, key)
                 else:
                     break
 
+    @classmethod
+    def __drop(cls, storage_id, bank, key):
+        '''
+        Drop a key, or all the keys of a bank if key is None, from memory
+        '''
+        storage = cls.data.get(storage_id)
+        if not storage:
+            return
+        if key is not None:
+            if storage.pop((bank, key), None) is not None:
+                cls.__forget(storage_id, (bank, key))
+            return
+        prefix = bank + '/'
+        for pbank, pkey in list(storage):
+            if pbank == bank or pbank.startswith(prefix):
+                del storage[(pbank, pkey)]
+                cls.__forget(storage_id, (pbank, pkey))
+
+    @classmethod
+    def listen(cls, opts, io_loop):
+        '''
+        Drop from memory the values written by the other master processes, as
+        their ``salt/cache/store`` events are received on ``io_loop``
+
+        .. versionadded:: Fluorine
+        '''
+        event = salt.utils.event.get_master_event(
+            opts, opts['sock_dir'], listen=True, io_loop=io_loop)
+        event.set_event_handler(cls._handle_event)
+        cls._listener = event
+
+    @classmethod
+    def _handle_event(cls, raw):
+        '''
+        Only the cache store events are unpacked
+        '''
+        mtag, mdata = salt.utils.event.SaltEvent.unpack_tag(raw)
+        if mtag != salt.utils.event.tagify('store', 'cache'):
+            return
+        data = cls._listener.serial.loads(mdata, encoding='utf-8')
+        if not isinstance(data, dict) or data.get('pid') == os.getpid():
+            return
+        for bank, key in data.get('keys', []):
+            for storage_id in list(cls.data):
+                cls.__drop(storage_id, bank, key)
+
+    @classmethod
+    def clean_shared(cls, opts):
+        '''
+        Remove the expired values of the shared tier from disk, along with the
+        directories left empty
+
+        .. versionadded:: Fluorine
+        '''
+        shared_dir = opts.get('memcache_shared_dir') or os.path.join(
+            opts.get('cachedir', salt.syspaths.CACHE_DIR), 'memcache')
+        expire = opts.get('memcache_expire_seconds', 10)
+        now = time.time()
+        for root, _, files in salt.utils.path.os_walk(shared_dir, topdown=False):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if os.path.getmtime(path) + expire < now:
+                        os.remove(path)
+                except OSError:
+                    pass
+            if root != shared_dir:
+                try:
+                    os.rmdir(root)
+                except OSError:
+                    # Not empty
+                    pass
+
     def _get_storage_id(self):
         fun = '{0}.storage_id'.format(self.driver)
         if fun in self.modules:
@@ -305,53 +644,197 @@ class MemCache(Cache):
         else:
             return self.driver
 
+    @property
+    def storage_id(self):
+        if self._storage_id is None:
+            self._storage_id = self._get_storage_id()
+        return self._storage_id
+
     @property
     def storage(self):
         if self._storage is None:
-            storage_id = self._get_storage_id()
-            if storage_id not in MemCache.data:
-                MemCache.data[storage_id] = OrderedDict()
-            self._storage = MemCache.data[storage_id]
+            if self.storage_id not in MemCache.data:
+                MemCache.data[self.storage_id] = OrderedDict()
+            self._storage = MemCache.data[self.storage_id]
         return self._storage
 
+    def _size(self, data):
+        if not self.max_bytes:
+            return 0
+        return len(self.serial.dumps(data))
+
+    def _keep(self, bank_key, data, now, size=0):
+        '''
+        Keep a value in memory, evicting the least recently used values to stay
+        within ``memcache_max_items`` and ``memcache_max_bytes``
+        '''
+        storage = self.storage
+        MemCache.__drop(self.storage_id, bank_key[0], bank_key[1])
+        if self.max_bytes and size > self.max_bytes:
+            return
+        cleanup = self.cleanup
+        while storage and (
+                len(storage) >= self.max or self.max_bytes and
+                MemCache.nbytes.get(self.storage_id, 0) + size > self.max_bytes):
+            if cleanup:
+                MemCache.__cleanup(self.expire)
+                cleanup = False
+                continue
+            key, _ = storage.popitem(last=False)
+            MemCache.__forget(self.storage_id, key)
+        storage[bank_key] = [now, data]
+        if self.max_bytes:
+            MemCache.sizes.setdefault(self.storage_id, {})[bank_key] = size
+            MemCache.nbytes[self.storage_id] = \
+                MemCache.nbytes.get(self.storage_id, 0) + size
+
+    def _get(self, bank_key, now):
+        '''
+        Return the record of a key kept in memory and not expired, if any
+        '''
+        record = self.storage.pop(bank_key, None)
+        if record is None:
+            return None
+        if record[0] + self.expire < now:
+            MemCache.__forget(self.storage_id, bank_key)
+            return None
+        # update atime
+        record[0] = now
+        self.storage[bank_key] = record
+        return record
+
+    def _shared_path(self, bank, key):
+        return os.path.join(self.shared_dir, self.storage_id,
+                            os.path.normpath(bank), '{0}.p'.format(key))
+
+    def _shared_get(self, bank, key, now):
+        '''
+        Return the serialized value of a key from the shared tier, if fresh
+        '''
+        path = self._shared_path(bank, key)
+        try:
+            if os.path.getmtime(path) + self.expire < now:
+                return None
+            with salt.utils.files.fopen(path, 'rb') as fp_:
+                return fp_.read()
+        except (IOError, OSError):
+            return None
+
+    def _shared_set(self, bank, key, value):
+        path = self._shared_path(bank, key)
+        try:
+            try:
+                os.makedirs(os.path.dirname(path))
+            except OSError as exc:
+                if exc.errno != errno.EEXIST:
+                    raise
+            with salt.utils.atomicfile.atomic_open(path, 'wb') as fp_:
+                fp_.write(value)
+        except (IOError, OSError) as exc:
+            log.debug('Unable to write the shared memcache file %s: %s', path, exc)
+
+    def _fetch_missing(self, bank_keys, now):
+        '''
+        Fetch the keys missing from memory from the shared tier, then from the
+        cache backend
+        '''
+        ret = {}
+        sizes = {}
+        missing = []
+        for bank, key in bank_keys:
+            value = self._shared_get(bank, key, now) if self.shared else None
+            if value is None:
+                missing.append((bank, key))
+            else:
+                ret[(bank, key)] = self.serial.loads(value)
+                sizes[(bank, key)] = len(value)
+        if len(missing) == 1:
+            bank, key = missing[0]
+            fetched = {(bank, key): super(MemCache, self).fetch(bank, key)}
+        elif missing:
+            fetched = super(MemCache, self).fetch_many(missing)
+        else:
+            fetched = {}
+        for bank_key, data in six.iteritems(fetched):
+            if self.shared:
+                value = self.serial.dumps(data)
+                self._shared_set(bank_key[0], bank_key[1], value)
+                sizes[bank_key] = len(value)
+            else:
+                sizes[bank_key] = self._size(data)
+        ret.update(fetched)
+        for bank_key, data in six.iteritems(ret):
+            self._keep(bank_key, data, now, sizes[bank_key])
+        return ret
+
     def fetch(self, bank, key):
         if self.debug:
             self.call += 1
         now = time.time()
-        record = self.storage.pop((bank, key), None)
+        record = self._get((bank, key), now)
         # Have a cached value for the key
-        if record is not None and record[0] + self.expire >= now:
+        if record is not None:
             if self.debug:
                 self.hit += 1
                 log.debug(
                     'MemCache stats (call/hit/rate): %s/%s/%s',
                     self.call, self.hit, float(self.hit) / self.call
                 )
-            # update atime and return
-            record[0] = now
-            self.storage[(bank, key)] = record
             return record[1]
 
         # Have no value for the key or value is expired
-        data = super(MemCache, self).fetch(bank, key)
-        if len(self.storage) >= self.max:
-            if self.cleanup:
-                MemCache.__cleanup(self.expire)
-            if len(self.storage) >= self.max:
-                self.storage.popitem(last=False)
-        self.storage[(bank, key)] = [now, data]
-        return data
+        return self._fetch_missing([(bank, key)], now)[(bank, key)]
+
+    def fetch_many(self, bank_keys):
+        now = time.time()
+        ret = {}
+        missing = []
+        for bank_key in bank_keys:
+            record = self._get(bank_key, now)
+            if record is not None:
+                ret[bank_key] = record[1]
+            elif bank_key not in ret:
+                missing.append(bank_key)
+        if self.debug:
+            self.call += len(ret) + len(missing)
+            self.hit += len(ret)
+        if missing:
+            ret.update(self._fetch_missing(missing, now))
+        return ret
 
     def store(self, bank, key, data):
-        self.storage.pop((bank, key), None)
+        MemCache.__drop(self.storage_id, bank, key)
         super(MemCache, self).store(bank, key, data)
-        if len(self.storage) >= self.max:
-            if self.cleanup:
-                MemCache.__cleanup(self.expire)
-            if len(self.storage) >= self.max:
-                self.storage.popitem(last=False)
-        self.storage[(bank, key)] = [time.time(), data]
+        self._keep((bank, key), data, time.time(), self._size(data))
 
     def flush(self, bank, key=None):
-        self.storage.pop((bank, key), None)
+        if self.storage:
+            MemCache.__drop(self.storage_id, bank, key)
         super(MemCache, self).flush(bank, key)
+
+    def _written(self, bank_keys):
+        '''
+        Drop the values written from the shared tier, and tell the other
+        processes to drop them from memory
+        '''
+        if not self.shared:
+            return
+        for bank, key in bank_keys:
+            try:
+                if key is None:
+                    shutil.rmtree(os.path.join(self.shared_dir, self.storage_id,
+                                               os.path.normpath(bank)))
+                else:
+                    os.remove(self._shared_path(bank, key))
+            except OSError:
+                pass
+        pid, event = MemCache._event
+        if pid != os.getpid():
+            event = salt.utils.event.get_master_event(self.opts, self.opts['sock_dir'], listen=False)
+            MemCache._event = (os.getpid(), event)
+        try:
+            event.fire_event({'keys': [list(bank_key) for bank_key in bank_keys],
+                              'pid': os.getpid()},
+                             salt.utils.event.tagify('store', 'cache'))
+        except Exception as exc:
+            log.debug('Unable to fire the cache store event: %s', exc)
@@ -126,6 +126,76 @@ def fetch(bank, key):
         )
 
 
+def _get_recurse(prefix):
+    '''
+    Return the values of all the keys under a prefix, by key.
+    '''
+    try:
+        _, values = api.kv.get(prefix + '/', recurse=True)
+    except Exception as exc:
+        raise SaltCacheError(
+            'There was an error reading the keys under {0}: {1}'.format(
+                prefix, exc
+            )
+        )
+    return dict((value['Key'], value['Value']) for value in values or [])
+
+
+def fetch_many(bank_keys):
+    '''
+    Fetch several key values. The keys of a bank are read with a single
+    recursive get of this bank when several of them are requested. The banks
+    of which a single key is requested, like ``minions/<minion id>``, are read
+    with a single recursive get of their parent bank when most of its
+    sub-banks are requested, the others key by key.
+
+    .. versionadded:: Fluorine
+    '''
+    by_bank = {}
+    for bank, key in bank_keys:
+        by_bank.setdefault(bank, []).append(key)
+    # The values read recursively, by bank
+    values = {}
+    by_parent = {}
+    for bank, keys in by_bank.items():
+        if len(keys) > 1:
+            values[bank] = _get_recurse(bank)
+        elif '/' in bank:
+            by_parent.setdefault(bank.rsplit('/', 1)[0], []).append(bank)
+    for parent, banks in by_parent.items():
+        # Listing the parent is one more round trip, worth it for a few banks
+        if len(banks) > 2 and len(banks) * 2 > len(list_(parent)):
+            parent_values = _get_recurse(parent)
+            for bank in banks:
+                values[bank] = parent_values
+    ret = {}
+    for bank, keys in by_bank.items():
+        for key in keys:
+            if bank not in values:
+                data = fetch(bank, key)
+                if data != {}:
+                    ret[(bank, key)] = data
+                continue
+            value = values[bank].get('{0}/{1}'.format(bank, key))
+            if value is not None:
+                ret[(bank, key)] = __context__['serial'].loads(value)
+    return ret
+
+
+def fetch_bank(bank):
+    '''
+    Fetch all the key values of a bank with a single recursive get.
+
+    .. versionadded:: Fluorine
+    '''
+    ret = {}
+    for c_key, value in _get_recurse(bank).items():
+        key = c_key[len(bank) + 1:]
+        if key and '/' not in key and value is not None:
+            ret[key] = __context__['serial'].loads(value)
+    return ret
+
+
 def flush(bank, key=None):
     '''
     Remove the key from the cache bank with all the key content.
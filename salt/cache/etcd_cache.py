@@ -152,6 +152,32 @@ def fetch(bank, key):
         )
 
 
+def fetch_bank(bank):
+    '''
+    Fetch all the key values of a bank, with a single get of the bank directory.
+
+    .. versionadded:: Fluorine
+    '''
+    _init_client()
+    etcd_key = '{0}/{1}'.format(path_prefix, bank)
+    try:
+        children = client.get(etcd_key).children
+    except etcd.EtcdKeyNotFound:
+        return {}
+    except Exception as exc:
+        raise SaltCacheError(
+            'There was an error reading the bank, {0}: {1}'.format(
+                etcd_key, exc
+            )
+        )
+    ret = {}
+    for child in children:
+        if child.dir or child.value is None or child.key == etcd_key:
+            continue
+        ret[child.key.rsplit('/', 1)[1]] = __context__['serial'].loads(child.value)
+    return ret
+
+
 def flush(bank, key=None):
     '''
     Remove the key from the cache bank with all the key content.
@@ -41,9 +41,9 @@ def get_storage_id(kwargs):
     return ('localfs', __cachedir(kwargs))
 
 
-def store(bank, key, data, cachedir):
+def _write(bank, key, cachedir, data=None, value=None):
     '''
-    Store information in a file.
+    Write data, or an already serialized value, in a file.
     '''
     base = os.path.join(cachedir, os.path.normpath(bank))
     try:
@@ -61,7 +61,9 @@ def store(bank, key, data, cachedir):
     os.close(tmpfh)
     try:
         with salt.utils.files.fopen(tmpfname, 'w+b') as fh_:
-            fh_.write(__context__['serial'].dumps(data))
+            if value is None:
+                value = __context__['serial'].dumps(data)
+            fh_.write(value)
         # On Windows, os.rename will fail if the destination file exists.
         salt.utils.atomicfile.atomic_rename(tmpfname, outfile)
     except IOError as exc:
@@ -72,6 +74,37 @@ def store(bank, key, data, cachedir):
         )
 
 
+def store(bank, key, data, cachedir):
+    '''
+    Store information in a file.
+    '''
+    _write(bank, key, cachedir, data=data)
+
+
+def store_many(items, cachedir):
+    '''
+    Store a list of ``(bank, key, serialized data)`` in files. The files which
+    already hold the same data are only touched.
+
+    .. versionadded:: Fluorine
+    '''
+    written = 0
+    for bank, key, value in items:
+        outfile = os.path.join(cachedir, os.path.normpath(bank), '{0}.p'.format(key))
+        try:
+            if os.path.getsize(outfile) == len(value):
+                with salt.utils.files.fopen(outfile, 'rb') as fh_:
+                    same = fh_.read() == value
+                if same:
+                    os.utime(outfile, None)
+                    continue
+        except (IOError, OSError):
+            pass
+        _write(bank, key, cachedir, value=value)
+        written += 1
+    return written
+
+
 def fetch(bank, key, cachedir):
     '''
     Fetch information from a file.
@@ -100,6 +133,34 @@ def fetch(bank, key, cachedir):
         )
 
 
+def fetch_bank(bank, cachedir):
+    '''
+    Fetch the information of all the files of a bank.
+
+    .. versionadded:: Fluorine
+    '''
+    base = os.path.join(cachedir, os.path.normpath(bank))
+    if not os.path.isdir(base):
+        return {}
+    ret = {}
+    try:
+        for item in os.listdir(base):
+            if not item.endswith('.p'):
+                continue
+            key_file = os.path.join(base, item)
+            if not os.path.isfile(key_file):
+                continue
+            with salt.utils.files.fopen(key_file, 'rb') as fh_:
+                ret[item[:-2]] = __context__['serial'].load(fh_)
+    except (IOError, OSError) as exc:
+        raise SaltCacheError(
+            'There was an error reading the cache bank "{0}": {1}'.format(
+                base, exc
+            )
+        )
+    return ret
+
+
 def updated(bank, key, cachedir):
     '''
     Return the epoch of the mtime for this cache file
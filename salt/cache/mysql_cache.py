@@ -45,6 +45,7 @@ value to ``mysql``:
 '''
 from __future__ import absolute_import, print_function, unicode_literals
 from time import sleep
+import hashlib
 import logging
 
 try:
@@ -66,6 +67,7 @@ except ImportError:
         MySQLdb = None
 
 from salt.exceptions import SaltCacheError
+import salt.utils.stringutils
 
 _DEFAULT_DATABASE_NAME = "salt_cache"
 _DEFAULT_CACHE_TABLE_NAME = "cache"
@@ -89,16 +91,20 @@ def __virtual__():
     return bool(MySQLdb), 'No python mysql client installed.' if MySQLdb is None else ''
 
 
-def run_query(conn, query, retries=3):
+def run_query(conn, query, retries=3, args=None, many=False):
     '''
     Get a cursor and run a query. Reconnect up to `retries` times if
-    needed.
+    needed. The parameters of the query are passed in `args`, a sequence of
+    them if `many` is set to run the query once for each.
     Returns: cursor, affected rows counter
     Raises: SaltCacheError, AttributeError, OperationalError
     '''
     try:
         cur = conn.cursor()
-        out = cur.execute(query)
+        if many:
+            out = cur.executemany(query, args)
+        else:
+            out = cur.execute(query, args)
         return cur, out
     except (AttributeError, OperationalError) as e:
         if retries == 0:
@@ -111,7 +117,7 @@ def run_query(conn, query, retries=3):
             log.info("mysql_cache: recreating db connection due to: %r", e)
         global client
         client = MySQLdb.connect(**_mysql_kwargs)
-        return run_query(client, query, retries - 1)
+        return run_query(client, query, retries - 1, args=args, many=many)
     except Exception as e:
         if len(query) > 150:
             query = query[:150] + "<...>"
@@ -192,6 +198,35 @@ def store(bank, key, data):
         )
 
 
+def store_many(items):
+    '''
+    Store a list of ``(bank, key, serialized data)``. The rows already holding
+    the same data, compared by their MD5 hash, are not written again and the
+    others are written with a single query.
+
+    .. versionadded:: Fluorine
+    '''
+    _init_client()
+    if not items:
+        return 0
+    query = "SELECT bank, etcd_key, MD5(data) FROM {0} WHERE (bank, etcd_key) " \
+        "IN ({1})".format(_table_name, ', '.join(['(%s, %s)'] * len(items)))
+    args = [arg for bank, key, _ in items for arg in (bank, key)]
+    cur, _ = run_query(client, query, args=args)
+    current = dict(((row[0], row[1]), salt.utils.stringutils.to_str(row[2]))
+                   for row in cur.fetchall())
+    cur.close()
+    rows = [(bank, key, value)
+            for bank, key, value in items
+            if current.get((bank, key)) != hashlib.md5(value).hexdigest()]
+    if rows:
+        query = "REPLACE INTO {0} (bank, etcd_key, data) " \
+            "VALUES (%s, %s, %s)".format(_table_name)
+        cur, _ = run_query(client, query, args=rows, many=True)
+        cur.close()
+    return len(rows)
+
+
 def fetch(bank, key):
     '''
     Fetch a key value.
@@ -207,6 +242,40 @@ def fetch(bank, key):
     return __context__['serial'].loads(r[0])
 
 
+def fetch_many(bank_keys):
+    '''
+    Fetch several key values with a single query.
+
+    .. versionadded:: Fluorine
+    '''
+    _init_client()
+    if not bank_keys:
+        return {}
+    query = "SELECT bank, etcd_key, data FROM {0} WHERE (bank, etcd_key) " \
+        "IN ({1})".format(_table_name, ', '.join(['(%s, %s)'] * len(bank_keys)))
+    args = [arg for bank_key in bank_keys for arg in bank_key]
+    cur, _ = run_query(client, query, args=args)
+    ret = dict(((row[0], row[1]), __context__['serial'].loads(row[2]))
+               for row in cur.fetchall())
+    cur.close()
+    return ret
+
+
+def fetch_bank(bank):
+    '''
+    Fetch all the key values of a bank with a single query.
+
+    .. versionadded:: Fluorine
+    '''
+    _init_client()
+    query = "SELECT etcd_key, data FROM {0} WHERE bank=%s".format(_table_name)
+    cur, _ = run_query(client, query, args=(bank,))
+    ret = dict((row[0], __context__['serial'].loads(row[1]))
+               for row in cur.fetchall())
+    cur.close()
+    return ret
+
+
 def flush(bank, key=None):
     '''
     Remove the key from the cache bank with all the key content.
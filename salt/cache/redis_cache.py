@@ -159,6 +159,7 @@ except ImportError:
 # Import salt
 from salt.ext.six.moves import range
 from salt.exceptions import SaltCacheError
+import salt.utils.stringutils
 
 # -----------------------------------------------------------------------------
 # module properties
@@ -358,6 +359,43 @@ def store(bank, key, data):
         raise SaltCacheError(mesg)
 
 
+def store_many(items):
+    '''
+    Store a list of ``(bank, key, serialized data)`` in Redis keys. The keys
+    already holding the same data are not set again. This function is using
+    the Redis pipelining, so there are two requests made: one to get the
+    current values, and one to set the values which changed.
+
+    .. versionadded:: Fluorine
+    '''
+    redis_server = _get_redis_server()
+    redis_pipe = redis_server.pipeline()
+    try:
+        for bank, key, _ in items:
+            redis_pipe.get(_get_key_redis_key(bank, key))
+        current = redis_pipe.execute()
+        banks = set()
+        written = 0
+        for (bank, key, value), redis_value in zip(items, current):
+            if redis_value == value:
+                continue
+            if bank not in banks:
+                _build_bank_hier(bank, redis_pipe)
+                banks.add(bank)
+            redis_pipe.set(_get_key_redis_key(bank, key), value)
+            redis_pipe.sadd(_get_bank_keys_redis_key(bank), key)
+            written += 1
+        if written:
+            log.debug('Setting %s of %s Redis cache keys', written, len(items))
+            redis_pipe.execute()
+    except (RedisConnectionError, RedisResponseError) as rerr:
+        mesg = 'Cannot set {count} Redis cache keys: {rerr}'.format(count=len(items),
+                                                                     rerr=rerr)
+        log.error(mesg)
+        raise SaltCacheError(mesg)
+    return written
+
+
 def fetch(bank, key):
     '''
     Fetch data from the Redis cache.
@@ -377,6 +415,66 @@ def fetch(bank, key):
     return __context__['serial'].loads(redis_value)
 
 
+def _get_many(redis_server, redis_keys):
+    '''
+    Get the values of several Redis keys in a single request.
+    '''
+    if not redis_keys:
+        return []
+    if _get_redis_cache_opts()['cluster_mode']:
+        # The keys may be spread over several nodes
+        redis_pipe = redis_server.pipeline()
+        for redis_key in redis_keys:
+            redis_pipe.get(redis_key)
+        return redis_pipe.execute()
+    return redis_server.mget(redis_keys)
+
+
+def fetch_many(bank_keys):
+    '''
+    Fetch the data of several keys from the Redis cache, with a single ``MGET``.
+
+    .. versionadded:: Fluorine
+    '''
+    redis_server = _get_redis_server()
+    redis_keys = [_get_key_redis_key(bank, key) for bank, key in bank_keys]
+    try:
+        redis_values = _get_many(redis_server, redis_keys)
+    except (RedisConnectionError, RedisResponseError) as rerr:
+        mesg = 'Cannot fetch {count} Redis cache keys: {rerr}'.format(count=len(redis_keys),
+                                                                      rerr=rerr)
+        log.error(mesg)
+        raise SaltCacheError(mesg)
+    ret = {}
+    for bank_key, redis_value in zip(bank_keys, redis_values):
+        if redis_value is not None:
+            ret[bank_key] = __context__['serial'].loads(redis_value)
+    return ret
+
+
+def fetch_bank(bank):
+    '''
+    Fetch the data of all the keys of a bank from the Redis cache. There are two
+    requests made: one to get the keys of the bank, and one ``MGET`` for their
+    values.
+
+    .. versionadded:: Fluorine
+    '''
+    redis_server = _get_redis_server()
+    bank_keys_redis_key = _get_bank_keys_redis_key(bank)
+    try:
+        # Unlike the cluster client, StrictRedis returns bytes on Python 3
+        keys = [salt.utils.stringutils.to_str(key)
+                for key in redis_server.smembers(bank_keys_redis_key)]
+    except (RedisConnectionError, RedisResponseError) as rerr:
+        mesg = 'Cannot list the Redis cache key {rkey}: {rerr}'.format(rkey=bank_keys_redis_key,
+                                                                       rerr=rerr)
+        log.error(mesg)
+        raise SaltCacheError(mesg)
+    return dict((key, data)
+                for (_, key), data in fetch_many([(bank, key) for key in keys]).items())
+
+
 def flush(bank, key=None):
     '''
     Remove the key from the cache bank with all the key content. If no key is specified, remove
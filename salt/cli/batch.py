@@ -5,12 +5,12 @@ Execute batch runs
 
 # Import python libs
 from __future__ import absolute_import, print_function, unicode_literals
-import math
 import time
 import copy
 from datetime import datetime, timedelta
 
 # Import salt libs
+import salt.utils.batch
 import salt.utils.stringutils
 import salt.client
 import salt.output
@@ -83,16 +83,8 @@ class Batch(object):
         '''
         Return the active number of minions to maintain
         '''
-        partition = lambda x: float(x) / 100.0 * len(self.minions)
         try:
-            if '%' in self.opts['batch']:
-                res = partition(float(self.opts['batch'].strip('%')))
-                if res < 1:
-                    return int(math.ceil(res))
-                else:
-                    return int(res)
-            else:
-                return int(self.opts['batch'])
+            return salt.utils.batch.get_bnum(self.opts['batch'], len(self.minions))
         except ValueError:
             if not self.quiet:
                 salt.utils.stringutils.print_cli('Invalid batch data sent: {0}\nData must be in the '
@@ -33,6 +33,7 @@ import salt.payload
 import salt.transport
 import salt.loader
 import salt.utils.args
+import salt.utils.batch
 import salt.utils.event
 import salt.utils.files
 import salt.utils.jid
@@ -565,6 +566,97 @@ class LocalClient(object):
         for ret in batch.run():
             yield ret
 
+    def cmd_batch_master(
+            self,
+            tgt,
+            fun,
+            arg=(),
+            tgt_type='glob',
+            ret='',
+            kwarg=None,
+            batch='10%',
+            **kwargs):
+        '''
+        Iteratively execute a command on subsets of minions at a time, the
+        batch being run by the master
+
+        .. versionadded:: Fluorine
+
+        The function signature is the same as :py:meth:`cmd_batch`. The master
+        must have :conf_master:`batch_master` set. The minions are started by
+        the master as the returns arrive, so the batch goes on if the iteration
+        stops, and its returns can be read from the job cache under a single
+        jid.
+
+        The generator ends when the batch is done, or when the master did not
+        make progress on the batch for as long as all of its sub-batches may
+        take to time out, e.g. because it was stopped.
+
+        :returns: A generator of minion returns
+
+        .. code-block:: python
+
+            >>> returns = local.cmd_batch_master('*', 'state.highstate', batch='10%')
+            >>> for ret in returns:
+            ...     print(ret)
+            {'jerry': {...}}
+            {'dave': {...}}
+            {'stewart': {...}}
+        '''
+        if 'timeout' in kwargs:
+            kwargs['batch_timeout'] = kwargs.pop('timeout')
+        pub_data = self.run_job(
+            tgt,
+            fun,
+            arg,
+            tgt_type,
+            ret,
+            kwarg=kwarg,
+            listen=True,
+            batch=batch,
+            **kwargs)
+        if not pub_data:
+            return
+        ret_tag = salt.utils.event.tagify([pub_data['jid'], 'ret', ''], 'job')
+        done_tag = salt.utils.event.tagify([pub_data['jid'], 'done'], 'batch')
+        path = salt.utils.batch.batch_path(self.opts, pub_data['jid'])
+        batch_data = salt.utils.batch.load_batch(self.opts, pub_data['jid']) or {}
+        # How long the whole batch may take without a single return
+        batches = -(-len(batch_data.get('minions', [])) // max(batch_data.get('size', 1), 1))
+        idle = max(batches, 1) * (
+            batch_data.get('timeout', self.opts['timeout'])
+            + 2 * batch_data.get('gather_job_timeout', self.opts['gather_job_timeout'])
+            + batch_data.get('batch_wait', 0))
+        progress = time.time()
+        try:
+            while True:
+                raw = self.event.get_event(wait=1, full=True, auto_reconnect=self.auto_reconnect)
+                if raw is None:
+                    if batch_data:
+                        # The done event may have been missed, the master
+                        # removes the batch when it is done
+                        try:
+                            progress = max(progress, os.path.getmtime(path))
+                        except OSError:
+                            break
+                    if progress + idle < time.time():
+                        log.warning(
+                            'The batch %s made no progress for %s seconds',
+                            pub_data['jid'], idle)
+                        break
+                    continue
+                if raw['tag'] == done_tag:
+                    break
+                if raw['tag'].startswith(ret_tag):
+                    progress = time.time()
+                    data = raw['data']
+                    if kwargs.get('raw'):
+                        yield data
+                    else:
+                        yield {data['id']: data['return']}
+        finally:
+            self._clean_up_subscriptions(pub_data['jid'])
+
     def cmd(self,
             tgt,
             fun,
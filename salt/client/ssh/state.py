@@ -75,6 +75,7 @@ class SSHHighState(salt.state.BaseHighState):
         salt.state.BaseHighState.__init__(self, opts)
         self.state = SSHState(opts, pillar, wrapper)
         self.matcher = salt.minion.Matcher(self.opts)
+        self.matcher.top_cache = self.top_cache
         self.tops = salt.loader.tops(self.opts)
 
         self._pydsl_all_decls = {}
@@ -374,6 +374,13 @@ VALID_OPTS = {
     # The chunk size to use when streaming files with the file server
     'file_buffer_size': int,
 
+    # Only fetch the chunks of a file which differ from the cached copy
+    'file_delta_transfer': bool,
+
+    # The number of files the file client fetches at the same time when
+    # caching several files, e.g. for cp.cache_dir
+    'file_client_concurrency': int,
+
     # The TCP port on which minion events should be published if ipc_mode is TCP
     'tcp_pub_port': int,
 
@@ -465,12 +472,34 @@ VALID_OPTS = {
     # Tells the highstate outputter to only report diffs of states that changed
     'state_output_diff': bool,
 
+    # Write the output of the highstate outputter as each state is formatted
+    'state_output_stream': bool,
+
     # When true, states run in the order defined in an SLS file, unless requisites re-order them
     'state_auto_order': bool,
 
     # Fire events as state chunks are processed by the state compiler
     'state_events': bool,
 
+    # Cache the salt:// files referenced by a state run before running it
+    'state_prefetch_files': bool,
+
+    # The number of state functions to run at a time, 0 runs the states in
+    # sequence
+    'state_workers': int,
+
+    # Skip the states of a highstate which did not change since the last run
+    'state_incremental': bool,
+
+    # Record the time spent in each phase of the state runs
+    'state_profile': bool,
+
+    # Write the cProfile stats of the phases of the state runs to this directory
+    'state_profile_dir': (type(None), six.string_types),
+
+    # Cache the package metadata parsed by the pkg modules in the cachedir
+    'pkg_metadata_cache': bool,
+
     # The number of seconds a minion should wait before retry when attempting authentication
     'acceptance_wait_time': float,
 
@@ -745,6 +774,9 @@ VALID_OPTS = {
     # (saltenvs); can be 'merge' or 'same'
     'top_file_merging_strategy': six.string_types,
 
+    # Cache the rendered top files and the results of matching their targets
+    'top_match_cache': bool,
+
     # The ordering for salt environment merging, when top_file_merging_strategy
     # is set to 'same'
     'env_order': list,
@@ -796,6 +828,14 @@ VALID_OPTS = {
     # filesystem
     'eauth_tokens': six.string_types,
 
+    # The number of seconds the results of the external authentication modules are cached for,
+    # the number of seconds failed authentications are cached for, the max number of cached
+    # results and whether they are shared with the other master processes through the master cache
+    'eauth_cache_ttl': int,
+    'eauth_cache_negative_ttl': int,
+    'eauth_cache_size': int,
+    'eauth_cache_shared': bool,
+
     # The number of open files a daemon is allowed to have open. Frequently needs to be increased
     # higher than the system default in order to account for the way zeromq consumes file handles.
     'max_open_files': int,
@@ -933,6 +973,13 @@ VALID_OPTS = {
     # If this is set to True the first newline after a Jinja block is removed
     'jinja_trim_blocks': bool,
 
+    # Keep the bytecode of the compiled Jinja templates in the cachedir
+    'jinja_bytecode_cache': bool,
+
+    # The number of seconds during which the templates imported by Jinja are
+    # not fetched again by the later renders of the process
+    'jinja_loader_cache_ttl': int,
+
     # Cache minion ID to file
     'minion_id_caching': bool,
 
@@ -1040,6 +1087,14 @@ VALID_OPTS = {
 
     # Connection caching. Can greatly speed up salt performance.
     'con_cache': bool,
+
+    # Run the publications with a batch kwarg on the master, in a dedicated process
+    'batch_master': bool,
+
+    # Track the connected minions in a dedicated process instead of looking
+    # them up in the minion data cache, and how often to check the connections
+    'presence_service': bool,
+    'presence_interval': int,
     'rotate_aes_key': bool,
 
     # Cache ZeroMQ connections. Can greatly improve salt performance.
@@ -1107,6 +1162,16 @@ VALID_OPTS = {
     'memcache_full_cleanup': bool,
     # Enable collecting the memcache stats and log it on `debug` log level.
     'memcache_debug': bool,
+    # Set a memcache limit in bytes per cache storage, 0 for no limit.
+    'memcache_max_bytes': int,
+    # Share the memcache values between the master processes.
+    'memcache_shared': bool,
+    # The directory holding the memcache values shared between the master processes.
+    'memcache_shared_dir': (type(None), six.string_types),
+    # Delay the cache stores for up to this many seconds to write them in batches.
+    'cache_write_window': float,
+    # The max number of cache stores delayed before they are written.
+    'cache_write_max_items': int,
 
     # Thin and minimal Salt extra modules
     'thin_extra_mods': six.string_types,
@@ -1135,6 +1200,10 @@ VALID_OPTS = {
     # to the master is attempted.
     'beacons_before_connect': bool,
 
+    # The number of threads used to run beacons concurrently, 0 runs the
+    # beacons serially in the minion's main loop.
+    'beacons_workers': int,
+
     # Controls whether the scheduler is set up before a connection
     # to the master is attempted.
     'scheduler_before_connect': bool,
@@ -1277,6 +1346,7 @@ DEFAULT_MINION_OPTS = {
                  salt.syspaths.SPM_FORMULA_PATH]
     },
     'top_file_merging_strategy': 'merge',
+    'top_match_cache': False,
     'env_order': [],
     'default_top': 'base',
     'fileserver_limit_traversal': False,
@@ -1368,6 +1438,8 @@ DEFAULT_MINION_OPTS = {
     'ipc_write_buffer': _DFLT_IPC_WBUFFER,
     'ipv6': False,
     'file_buffer_size': 262144,
+    'file_delta_transfer': False,
+    'file_client_concurrency': 1,
     'tcp_pub_port': 4510,
     'tcp_pull_port': 4511,
     'tcp_authentication_retries': 5,
@@ -1390,9 +1462,18 @@ DEFAULT_MINION_OPTS = {
     'state_verbose': True,
     'state_output': 'full',
     'state_output_diff': False,
+    'state_output_stream': False,
     'state_auto_order': True,
     'state_events': False,
     'state_aggregate': False,
+    'state_prefetch_files': False,
+    'state_workers': 0,
+    'state_incremental': False,
+    'state_profile': False,
+    'state_profile_dir': None,
+    'pkg_metadata_cache': False,
+    'jinja_bytecode_cache': False,
+    'jinja_loader_cache_ttl': 0,
     'snapper_states': False,
     'snapper_states_config': 'root',
     'acceptance_wait_time': 10,
@@ -1491,6 +1572,7 @@ DEFAULT_MINION_OPTS = {
     'ssl': None,
     'multifunc_ordered': False,
     'beacons_before_connect': False,
+    'beacons_workers': 0,
     'scheduler_before_connect': False,
     'cache': 'localfs',
     'salt_cp_chunk_size': 65536,
@@ -1548,6 +1630,7 @@ DEFAULT_MASTER_OPTS = {
         'base': [salt.syspaths.BASE_THORIUM_ROOTS_DIR],
         },
     'top_file_merging_strategy': 'merge',
+    'top_match_cache': False,
     'env_order': [],
     'saltenv': None,
     'lock_saltenv': False,
@@ -1661,6 +1744,10 @@ DEFAULT_MASTER_OPTS = {
     'keep_acl_in_token': False,
     'eauth_acl_module': '',
     'eauth_tokens': 'localfs',
+    'eauth_cache_ttl': 0,
+    'eauth_cache_negative_ttl': 0,
+    'eauth_cache_size': 1000,
+    'eauth_cache_shared': False,
     'extension_modules': os.path.join(salt.syspaths.CACHE_DIR, 'master', 'extmods'),
     'module_dirs': [],
     'file_recv': False,
@@ -1729,6 +1816,7 @@ DEFAULT_MASTER_OPTS = {
     'state_verbose': True,
     'state_output': 'full',
     'state_output_diff': False,
+    'state_output_stream': False,
     'state_auto_order': True,
     'state_events': False,
     'state_aggregate': False,
@@ -1765,6 +1853,8 @@ DEFAULT_MASTER_OPTS = {
     'jinja_sls_env': {},
     'jinja_lstrip_blocks': False,
     'jinja_trim_blocks': False,
+    'jinja_bytecode_cache': False,
+    'jinja_loader_cache_ttl': 0,
     'tcp_keepalive': True,
     'tcp_keepalive_idle': 300,
     'tcp_keepalive_cnt': -1,
@@ -1816,6 +1906,9 @@ DEFAULT_MASTER_OPTS = {
     'zmq_filtering': False,
     'zmq_monitor': False,
     'con_cache': False,
+    'batch_master': False,
+    'presence_service': False,
+    'presence_interval': 5,
     'rotate_aes_key': True,
     'cache_sreqs': True,
     'dummy_pub': False,
@@ -1829,6 +1922,11 @@ DEFAULT_MASTER_OPTS = {
     'memcache_max_items': 1024,
     'memcache_full_cleanup': False,
     'memcache_debug': False,
+    'memcache_max_bytes': 0,
+    'memcache_shared': False,
+    'memcache_shared_dir': None,
+    'cache_write_window': 0,
+    'cache_write_max_items': 1000,
     'thin_extra_mods': '',
     'min_extra_mods': '',
     'ssl': None,
@@ -134,6 +134,11 @@ def clean_expired_tokens(opts):
     Clean expired tokens from the master
     '''
     loadauth = salt.auth.LoadAuth(opts)
+    fstr = '{0}.rm_expired'.format(opts['eauth_tokens'])
+    if fstr in loadauth.tokens:
+        # The store removes the expired tokens in bulk
+        loadauth.tokens[fstr](opts)
+        return
     for tok in loadauth.list_tokens():
         token_data = loadauth.get_tok(tok)
         if 'expire' not in token_data or token_data.get('expire', 0) < time.time():
@@ -436,6 +441,7 @@ class RemoteFuncs(object):
         self._serve_file = fs_.serve_file
         self._file_find = fs_._find_file
         self._file_hash = fs_.file_hash
+        self._file_hash_and_stat_many = fs_.file_hash_and_stat_many
         self._file_list = fs_.file_list
         self._file_list_emptydirs = fs_.file_list_emptydirs
         self._dir_list = fs_.dir_list
@@ -585,8 +591,10 @@ class RemoteFuncs(object):
                 greedy=False
                 )
         minions = _res['minions']
+        mdatas = self.cache.fetch_many(
+            [('minions/{0}'.format(minion), 'mine') for minion in minions])
         for minion in minions:
-            fdata = self.cache.fetch('minions/{0}'.format(minion), 'mine')
+            fdata = mdatas.get(('minions/{0}'.format(minion), 'mine'))
             if isinstance(fdata, dict):
                 fdata = fdata.get(load['fun'])
                 if fdata:
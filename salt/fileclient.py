@@ -6,12 +6,16 @@ from __future__ import absolute_import, print_function, unicode_literals
 
 # Import python libs
 import contextlib
+import copy
 import errno
+import hashlib
 import logging
 import os
 import string
 import shutil
+import threading
 import ftplib
+from multiprocessing.pool import ThreadPool
 from tornado.httputil import parse_response_start_line, HTTPHeaders, HTTPInputError
 import salt.utils.atomicfile
 
@@ -92,6 +96,8 @@ class Client(object):
         self.opts = opts
         self.utils = salt.loader.utils(self.opts)
         self.serial = salt.payload.Serial(self.opts)
+        # The clients of the worker threads of _map_clients, kept for reuse
+        self._idle_clients = []
 
     # Add __setstate__ and __getstate__ so that the object may be
     # deep copied. It normally can't be deep copied because its
@@ -198,24 +204,104 @@ class Client(object):
         Download a list of files stored on the master and put them in the
         minion file cache
         '''
-        ret = []
         if isinstance(paths, six.string_types):
             paths = paths.split(',')
-        for path in paths:
-            ret.append(self.cache_file(path, saltenv, cachedir=cachedir))
-        return ret
+        return self._cache_many(paths, saltenv, cachedir=cachedir)
+
+    def _cache_many(self, paths, saltenv='base', cachedir=None):
+        '''
+        Cache a list of files, the results are returned in the order of the
+        paths
+        '''
+        return self._map_clients(
+            lambda client, path: client.cache_file(path, saltenv, cachedir=cachedir),
+            paths)
+
+    def _map_clients(self, func, items):
+        '''
+        Call ``func(client, item)`` for each of the items and return the
+        results in order. When file_client_concurrency is set the items are
+        processed in parallel by that many clients, each with a channel of its
+        own. These clients are kept and reused by the next calls.
+        '''
+        items = list(items)
+        concurrency = min(self.opts.get('file_client_concurrency', 1) or 1,
+                          len(items))
+        if concurrency < 2:
+            return [func(self, item) for item in items]
+
+        local = threading.local()
+        busy = []
+
+        def _call(item):
+            if not hasattr(local, 'client'):
+                try:
+                    local.client = self._idle_clients.pop()
+                except IndexError:
+                    local.client = self.__class__(self.opts)
+                busy.append(local.client)
+            return func(local.client, item)
+
+        pool = ThreadPool(concurrency)
+        try:
+            return pool.map(_call, items)
+        finally:
+            pool.close()
+            pool.join()
+            for client in busy:
+                # Do not keep what the items of this call taught the client
+                client.clear_prefetch()
+            self._idle_clients.extend(busy)
+
+    def prefetch_files(self, paths, saltenv='base', dests=None):
+        '''
+        Cache files which are about to be used, e.g. by a state run. ``dests``
+        optionally maps paths to the local files they are going to be copied
+        to, paths whose destination is already up to date are not cached and
+        their destination is returned instead of their cached copy.
+        '''
+        if not dests:
+            return self.cache_files(paths, saltenv)
+        return self._map_clients(
+            lambda client, path: client._prefetch_file(path, saltenv, dests),
+            paths)
+
+    def _prefetch_file(self, path, saltenv, dests):
+        dest = dests.get(path)
+        if self._dest_matches(path, saltenv, dest):
+            return dest
+        return self.cache_file(path, saltenv)
+
+    def _dest_matches(self, path, saltenv, dest):
+        '''
+        Return True if the local file ``dest`` has the same hash as ``path``
+        '''
+        if not dest or not os.path.isfile(dest):
+            return False
+        url, senv = salt.utils.url.split_env(path)
+        source_sum = self.hash_file(url, senv or saltenv)
+        if not source_sum or not source_sum.get('hsum'):
+            return False
+        try:
+            return salt.utils.hashutils.get_hash(
+                dest, source_sum.get('hash_type', 'sha256')) == source_sum['hsum']
+        except (IOError, OSError, ValueError):
+            return False
+
+    def clear_prefetch(self):
+        '''
+        Forget what was learned about the files passed to prefetch_files
+        '''
+        pass
 
     def cache_master(self, saltenv='base', cachedir=None):
         '''
         Download and cache all files on a master in a specified environment
         '''
-        ret = []
-        for path in self.file_list(saltenv):
-            ret.append(
-                self.cache_file(
-                    salt.utils.url.create(path), saltenv, cachedir=cachedir)
-            )
-        return ret
+        return self._cache_many(
+            [salt.utils.url.create(path) for path in self.file_list(saltenv)],
+            saltenv,
+            cachedir=cachedir)
 
     def cache_dir(self, path, saltenv='base', include_empty=False,
                   include_pat=None, exclude_pat=None, cachedir=None):
@@ -236,15 +322,17 @@ class Client(object):
         )
         # go through the list of all files finding ones that are in
         # the target directory and caching them
+        targets = []
         for fn_ in self.file_list(saltenv):
             fn_ = salt.utils.data.decode(fn_)
             if fn_.strip() and fn_.startswith(path):
                 if salt.utils.stringutils.check_include_exclude(
                         fn_, include_pat, exclude_pat):
-                    fn_ = self.cache_file(
-                        salt.utils.url.create(fn_), saltenv, cachedir=cachedir)
-                    if fn_:
-                        ret.append(fn_)
+                    targets.append(salt.utils.url.create(fn_))
+        ret.extend(
+            [fn_ for fn_ in self._cache_many(targets, saltenv, cachedir=cachedir)
+             if fn_]
+        )
 
         if include_empty:
             # Break up the path into a list containing the bottom-level
@@ -1054,6 +1142,10 @@ class RemoteClient(Client):
             self.auth = self.channel.auth
         else:
             self.auth = ''
+        # Hash and stat results of salt:// files, only kept between
+        # prefetch_files and clear_prefetch
+        self.hash_cache = None
+        self.prefetch_depth = 0
 
     def _refresh_channel(self):
         '''
@@ -1062,6 +1154,57 @@ class RemoteClient(Client):
         self.channel = salt.transport.Channel.factory(self.opts)
         return self.channel
 
+    def prefetch_files(self, paths, saltenv='base', dests=None):
+        '''
+        Cache files which are about to be used, e.g. by a state run. The
+        hashes of all files are requested from the master at once and only
+        the files which changed are downloaded. Until clear_prefetch is called
+        the hashes of these files are not requested from the master again, so
+        fetching them again is a local cache hit.
+
+        ``dests`` optionally maps paths to the local files they are going to
+        be copied to. Paths whose destination already has the master's hash
+        are not downloaded at all, their destination is returned instead of
+        their cached copy.
+        '''
+        if self.hash_cache is None:
+            self.hash_cache = {}
+        self.prefetch_depth += 1
+        try:
+            by_env = {}
+            for path in paths:
+                url, senv = salt.utils.url.split_env(path)
+                if url.startswith('salt://') and (senv or saltenv, url) not in self.hash_cache:
+                    by_env.setdefault(senv or saltenv, []).append(url)
+            for senv, urls in six.iteritems(by_env):
+                for url, hash_and_stat in six.iteritems(self.hash_and_stat_files(urls, senv)):
+                    self.hash_cache[(senv, url)] = hash_and_stat
+
+            hash_cache = self.hash_cache
+
+            def _prefetch(client, path):
+                if client.hash_cache is None:
+                    client.hash_cache = dict(hash_cache)
+                if dests:
+                    return client._prefetch_file(path, saltenv, dests)
+                return client.cache_file(path, saltenv)
+
+            return self._map_clients(_prefetch, paths)
+        except Exception:
+            # The caller only clears the prefetches which succeeded
+            self.clear_prefetch()
+            raise
+
+    def clear_prefetch(self):
+        '''
+        Forget the hashes learned by prefetch_files, once every call to
+        prefetch_files has been matched by one to clear_prefetch
+        '''
+        if self.prefetch_depth > 0:
+            self.prefetch_depth -= 1
+        if not self.prefetch_depth:
+            self.hash_cache = None
+
     def get_file(self,
                  path,
                  dest='',
@@ -1155,6 +1298,14 @@ class RemoteClient(Client):
             gzip = int(gzip)
             load['gzip'] = gzip
 
+        # With file_delta_transfer the chunks of the outdated local copy are
+        # offered to the master, which only sends back the ones that changed
+        old_fp = None
+        if self.opts.get('file_delta_transfer', False) and not gzip \
+                and dest2check and os.path.isfile(dest2check):
+            old_fp = salt.utils.files.fopen(dest2check, 'rb')  # pylint: disable=resource-leakage
+            load['block_hash_type'] = self.opts.get('hash_type', 'sha256')
+
         fn_ = None
         if dest:
             destdir = os.path.dirname(dest)
@@ -1166,18 +1317,39 @@ class RemoteClient(Client):
                         if exc.errno != errno.EEXIST:  # ignore if it was there already
                             raise
                 else:
+                    if old_fp:
+                        old_fp.close()
                     return False
             # We need an open filehandle here, that's why we're not using a
             # with clause:
-            fn_ = salt.utils.files.fopen(dest, 'wb+')  # pylint: disable=resource-leakage
+            if old_fp:
+                # The old copy is read while the new one is written, write
+                # the new one to a temporary file and move it in place
+                fn_ = salt.utils.atomicfile.atomic_open(dest, 'wb+')
+            else:
+                fn_ = salt.utils.files.fopen(dest, 'wb+')  # pylint: disable=resource-leakage
         else:
             log.debug('No dest file found')
 
+        # The size of the chunks served by the master, which the blocks of the
+        # old copy are compared with, is learned from the first chunk
+        block_size = self.opts['file_buffer_size']
         while True:
             if not fn_:
                 load['loc'] = 0
             else:
                 load['loc'] = fn_.tell()
+            block = None
+            if old_fp:
+                old_fp.seek(load['loc'])
+                block = old_fp.read(block_size)
+                if block:
+                    load['block_hash'] = hashlib.new(
+                        load['block_hash_type'], block).hexdigest()
+                    load['block_size'] = len(block)
+                else:
+                    load.pop('block_hash', None)
+                    load.pop('block_size', None)
             data = self.channel.send(load, raw=True)
             if six.PY3:
                 # Sometimes the source is local (eg when using
@@ -1187,6 +1359,13 @@ class RemoteClient(Client):
                 # strings for the top-level keys to simplify things.
                 data = decode_dict_keys_to_str(data)
             try:
+                if block and data.get('same'):
+                    # The chunk of the master starts with the local block,
+                    # only the rest of the chunk was sent
+                    data['data'] = block + salt.utils.stringutils.to_bytes(
+                        data['data'] or b'')
+                if old_fp and data.get('data') and not data.get('gzip'):
+                    block_size = len(data['data'])
                 if not data['data']:
                     if not fn_ and data['dest']:
                         # This is a 0 byte file on the master
@@ -1248,6 +1427,8 @@ class RemoteClient(Client):
                     )
                     break
 
+        if old_fp:
+            old_fp.close()
         if fn_:
             fn_.close()
             log.info(
@@ -1332,6 +1513,8 @@ class RemoteClient(Client):
         master file server prepend the path with salt://<file on server>
         otherwise, prepend the file with / for a local file.
         '''
+        if self.hash_cache is not None and (saltenv, path) in self.hash_cache:
+            return copy.deepcopy(self.hash_cache[(saltenv, path)][0])
         return self.__hash_and_stat_file(path, saltenv)
 
     def hash_and_stat_file(self, path, saltenv='base'):
@@ -1339,6 +1522,45 @@ class RemoteClient(Client):
         The same as hash_file, but also return the file's mode, or None if no
         mode data is present.
         '''
+        if self.hash_cache is not None:
+            if (saltenv, path) in self.hash_cache:
+                return copy.deepcopy(self.hash_cache[(saltenv, path)])
+            if path.startswith('salt://'):
+                ret = self._hash_and_stat_file(path, saltenv)
+                self.hash_cache[(saltenv, path)] = copy.deepcopy(ret)
+                return ret
+        return self._hash_and_stat_file(path, saltenv)
+
+    def hash_and_stat_files(self, paths, saltenv='base'):
+        '''
+        Return the hashes and stat results of several salt:// files, as a
+        dict mapping each path to what hash_and_stat_file would return. The
+        master is asked about all files with a single request.
+        '''
+        rel_paths = [self._check_proto(path) for path in paths]
+        load = {'paths': rel_paths,
+                'saltenv': saltenv,
+                'cmd': '_file_hash_and_stat_many'}
+        data = self.channel.send(load)
+        if not isinstance(data, dict):
+            # The master does not know about the bulk request
+            return dict((path, self._hash_and_stat_file(path, saltenv))
+                        for path in paths)
+        if six.PY2:
+            data = salt.utils.data.decode(data)
+        ret = {}
+        for path, rel_path in zip(paths, rel_paths):
+            try:
+                hash_result, stat_result = data[rel_path]
+            except (KeyError, TypeError, ValueError):
+                hash_result, stat_result = '', None
+            ret[path] = (hash_result, stat_result)
+        return ret
+
+    def _hash_and_stat_file(self, path, saltenv='base'):
+        '''
+        Fetch the hash and stat result of a file
+        '''
         hash_result = self.hash_file(path, saltenv)
         try:
             path = self._check_proto(path)
@@ -1415,6 +1637,8 @@ class FSClient(RemoteClient):
         Client.__init__(self, opts)  # pylint: disable=W0233
         self.channel = salt.fileserver.FSChan(opts)
         self.auth = DumbAuth()
+        self.hash_cache = None
+        self.prefetch_depth = 0
 
 
 class DumbAuth(object):
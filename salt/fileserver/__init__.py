@@ -8,6 +8,7 @@ from __future__ import absolute_import, print_function, unicode_literals
 import collections
 import errno
 import fnmatch
+import hashlib
 import logging
 import os
 import re
@@ -18,6 +19,7 @@ import salt.loader
 import salt.utils.data
 import salt.utils.files
 import salt.utils.path
+import salt.utils.stringutils
 import salt.utils.url
 import salt.utils.versions
 from salt.utils.args import get_function_argspec as _argspec
@@ -610,7 +612,22 @@ class Fileserver(object):
             return ret
         fstr = '{0}.serve_file'.format(fnd['back'])
         if fstr in self.servers:
-            return self.servers[fstr](load, fnd)
+            ret = self.servers[fstr](load, fnd)
+            if load.get('block_hash') and ret.get('data') and not ret.get('gzip'):
+                # The client already has a copy of the start of this chunk,
+                # tell it to reuse its own data and only send the rest
+                try:
+                    hasher = hashlib.new(load.get('block_hash_type', 'sha256'))
+                except (TypeError, ValueError):
+                    return ret
+                data = salt.utils.stringutils.to_bytes(ret['data'])
+                size = load.get('block_size') or len(data)
+                if len(data) < size:
+                    return ret
+                hasher.update(data[:size])
+                if hasher.hexdigest() == load['block_hash']:
+                    ret['data'] = data[size:]
+                    ret['same'] = True
         return ret
 
     def __file_hash_and_stat(self, load):
@@ -654,6 +671,34 @@ class Fileserver(object):
         except (IndexError, TypeError):
             return '', None
 
+    def file_hash_and_stat_many(self, load):
+        '''
+        Return the hashes and stat results of many files with a single call,
+        either of the files listed in ``paths`` or of all files under
+        ``prefix``. The return is a dict mapping each path to its hash and
+        stat result.
+        '''
+        if 'env' in load:
+            # "env" is not supported; Use "saltenv".
+            load.pop('env')
+
+        if 'saltenv' not in load:
+            return {}
+        if not isinstance(load['saltenv'], six.string_types):
+            load['saltenv'] = six.text_type(load['saltenv'])
+
+        paths = load.get('paths')
+        if paths is None:
+            if 'prefix' not in load:
+                return {}
+            paths = self.file_list({'saltenv': load['saltenv'],
+                                    'prefix': load['prefix']})
+        ret = {}
+        for path in paths:
+            ret[path] = self.file_hash_and_stat({'path': path,
+                                                 'saltenv': load['saltenv']})
+        return ret
+
     def clear_file_list_cache(self, load):
         '''
         Deletes the file_lists cache files
@@ -28,8 +28,10 @@ from salt.utils.zeromq import zmq, ZMQDefaultLoop, install_zmq, ZMQ_VERSION_INFO
 # pylint: enable=import-error,no-name-in-module,redefined-builtin
 
 import tornado.gen  # pylint: disable=F0401
+import tornado.ioloop  # pylint: disable=F0401
 
 # Import salt libs
+import salt.cache
 import salt.crypt
 import salt.client
 import salt.client.ssh.client
@@ -50,6 +52,7 @@ import salt.transport.server
 import salt.log.setup
 import salt.utils.args
 import salt.utils.atomicfile
+import salt.utils.batch
 import salt.utils.crypt
 import salt.utils.event
 import salt.utils.files
@@ -60,6 +63,7 @@ import salt.utils.job
 import salt.utils.master
 import salt.utils.minions
 import salt.utils.platform
+import salt.utils.presence
 import salt.utils.process
 import salt.utils.schedule
 import salt.utils.ssdp
@@ -197,7 +201,7 @@ class Maintenance(salt.utils.process.SignalHandlingMultiprocessingProcess):
         self.git_pillar = salt.daemons.masterapi.init_git_pillar(self.opts)
 
         self.presence_events = False
-        if self.opts.get('presence_events', False):
+        if self.opts.get('presence_events', False) and not self.opts.get('presence_service', False):
             tcp_only = True
             for transport, _ in iter_transport_opts(self.opts):
                 if transport != 'tcp':
@@ -230,6 +234,8 @@ class Maintenance(salt.utils.process.SignalHandlingMultiprocessingProcess):
                 salt.daemons.masterapi.clean_old_jobs(self.opts)
                 salt.daemons.masterapi.clean_expired_tokens(self.opts)
                 salt.daemons.masterapi.clean_pub_auth(self.opts)
+                if self.opts.get('memcache_shared', False):
+                    salt.cache.MemCache.clean_shared(self.opts)
             self.handle_git_pillar()
             self.handle_schedule()
             self.handle_key_cache()
@@ -695,6 +701,14 @@ class Master(SMaster):
             log.info('Creating master maintenance process')
             self.process_manager.add_process(Maintenance, args=(self.opts,))
 
+            if self.opts.get('presence_service'):
+                log.info('Creating master presence service process')
+                self.process_manager.add_process(salt.utils.presence.PresenceService, args=(self.opts,))
+
+            if self.opts.get('batch_master'):
+                log.info('Creating master batch manager process')
+                self.process_manager.add_process(salt.utils.batch.BatchManager, args=(self.opts,))
+
             if self.opts.get('event_return'):
                 log.info('Creating master event return process')
                 self.process_manager.add_process(salt.utils.event.EventReturn, args=(self.opts,))
@@ -1009,6 +1023,7 @@ class MWorker(salt.utils.process.SignalHandlingMultiprocessingProcess):
     def _handle_signals(self, signum, sigframe):
         for channel in getattr(self, 'req_channels', ()):
             channel.close()
+        salt.cache.write_pending()
         super(MWorker, self)._handle_signals(signum, sigframe)
 
     def __bind(self):
@@ -1021,6 +1036,15 @@ class MWorker(salt.utils.process.SignalHandlingMultiprocessingProcess):
         self.io_loop.make_current()
         for req_channel in self.req_channels:
             req_channel.post_fork(self._handle_payload, io_loop=self.io_loop)  # TODO: cleaner? Maybe lazily?
+        if self.opts.get('cache_write_window', 0):
+            # Write the cache stores delayed while no more requests come
+            tornado.ioloop.PeriodicCallback(
+                salt.cache.write_pending,
+                self.opts['cache_write_window'] * 1000).start()
+        if self.opts.get('memcache_expire_seconds', 0) and \
+                self.opts.get('memcache_shared', False):
+            # Forget the cached values the other processes write
+            salt.cache.MemCache.listen(self.opts, self.io_loop)
         try:
             self.io_loop.start()
         except (KeyboardInterrupt, SystemExit):
@@ -1168,6 +1192,7 @@ class AESFuncs(object):
         self._file_find = self.fs_._find_file
         self._file_hash = self.fs_.file_hash
         self._file_hash_and_stat = self.fs_.file_hash_and_stat
+        self._file_hash_and_stat_many = self.fs_.file_hash_and_stat_many
         self._file_list = self.fs_.file_list
         self._file_list_emptydirs = self.fs_.file_list_emptydirs
         self._dir_list = self.fs_.dir_list
@@ -2113,6 +2138,8 @@ class ClearFuncs(object):
                         'error': 'Master could not resolve minions for target {0}'.format(clear_load['tgt'])
                     }
                 }
+        if extra.get('batch'):
+            return self._publish_batch(clear_load, extra, minions, missing)
         jid = self._prep_jid(clear_load, extra)
         if jid is None:
             return {'enc': 'clear',
@@ -2132,6 +2159,48 @@ class ClearFuncs(object):
             }
         }
 
+    def _publish_batch(self, clear_load, extra, minions, missing):
+        '''
+        Hand an authorized publication over to the BatchManager process,
+        which publishes it to a batch of minions at a time
+        '''
+        if not self.opts.get('batch_master', False):
+            return {'enc': 'clear',
+                    'load': {'error': 'Batch execution on the master is not '
+                                      'enabled, set batch_master to enable it'}}
+        try:
+            salt.utils.batch.get_bnum(extra['batch'], len(minions))
+        except ValueError:
+            return {'enc': 'clear',
+                    'load': {'error': 'Invalid batch data sent: {0}\nData must '
+                                      'be in the form of %10, 10% or 3'.format(extra['batch'])}}
+        jid = self._prep_jid(clear_load, extra)
+        if jid is None:
+            return {'enc': 'clear',
+                    'load': {'error': 'Master failed to assign jid'}}
+        payload = self._prep_pub(minions, jid, clear_load, extra, missing)
+        # Leave out the minions known to be down instead of pinging them
+        present = self.ckminions.connected_ids(subset=minions)
+        try:
+            data = salt.utils.batch.new_batch(self.opts, payload, minions, extra, present)
+        except ValueError as exc:
+            return {'enc': 'clear',
+                    'load': {'error': six.text_type(exc)}}
+        except (IOError, OSError) as exc:
+            log.error('Unable to save the batch %s: %s', jid, exc)
+            return {'enc': 'clear',
+                    'load': {'error': 'Master failed to save the batch'}}
+        self.event.fire_event({'minions': data['minions']}, tagify([jid, 'new'], 'batch'))
+
+        return {
+            'enc': 'clear',
+            'load': {
+                'jid': clear_load['jid'],
+                'minions': data['minions'],
+                'missing': missing
+            }
+        }
+
     def _prep_auth_info(self, clear_load):
         sensitive_load_keys = []
         key = None
@@ -433,13 +433,28 @@ class MinionBase(object):
             log.error('Exception %s occurred in scheduled job', exc)
         return loop_interval
 
+    # The merged beacons configuration and the opts/pillar values it was
+    # built from, it is only merged again when those change
+    _beacons_conf = None
+    _beacons_conf_sources = None
+
     def process_beacons(self, functions):
         '''
         Evaluate all of the configured beacons, grab the config again in case
         the pillar or grains changed
         '''
         if 'config.merge' in functions:
-            b_conf = functions['config.merge']('beacons', self.opts['beacons'], omit_opts=True)
+            pillar = self.opts.get('pillar', {})
+            sources = (self.opts['beacons'],
+                       pillar.get('beacons'),
+                       pillar.get('master', {}).get('beacons'))
+            if self._beacons_conf is None or sources != self._beacons_conf_sources:
+                self._beacons_conf = functions['config.merge']('beacons', self.opts['beacons'], omit_opts=True)
+                # config.merge can update the pillar in place, take the
+                # snapshot of the sources afterwards
+                self._beacons_conf_sources = copy.deepcopy(sources)
+            # Beacon.process alters the config it is handed
+            b_conf = copy.deepcopy(self._beacons_conf)
             if b_conf:
                 return self.beacons.process(b_conf, self.opts['grains'])  # pylint: disable=no-member
         return []
@@ -3199,6 +3214,9 @@ class Matcher(object):
     def __init__(self, opts, functions=None):
         self.opts = opts
         self.functions = functions
+        # A salt.utils.topmatch.TopMatchCache set by the users of confirm_top
+        # to reuse the results of the previous runs
+        self.top_cache = None
 
     def confirm_top(self, match, data, nodegroups=None):
         '''
@@ -3214,6 +3232,13 @@ class Matcher(object):
             if isinstance(item, dict):
                 if 'match' in item:
                     matcher = item['match']
+        if self.top_cache is not None:
+            return self.top_cache.confirm_top(
+                matcher, match, nodegroups,
+                lambda: self._confirm_top(matcher, match, nodegroups))
+        return self._confirm_top(matcher, match, nodegroups)
+
+    def _confirm_top(self, matcher, match, nodegroups):
         if hasattr(self, matcher + '_match'):
             funcname = '{0}_match'.format(matcher)
             if matcher == 'nodegroup':
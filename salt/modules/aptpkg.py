@@ -88,6 +88,21 @@ DPKG_ENV_VARS = {
     'DEBIAN_FRONTEND': 'noninteractive',
     'UCF_FORCE_CONFFOLD': '1',
 }
+# Lines of the output of dpkg for the packages it changes, for instance
+# "Setting up zsh (5.4.2-3ubuntu3) ..." or "Removing zsh (5.4.2-3ubuntu3) ..."
+_DPKG_CHANGE_RE = re.compile(
+    r'^(?:Unpacking|Setting up|Removing|Purging configuration files for) '
+    r'([^\s:]+)(?::\S+)? \('
+)
+# The files the package metadata cached with pkg_metadata_cache depends on
+_DPKG_DB = ('/var/lib/dpkg/status',)
+_APT_METADATA = _DPKG_DB + (
+    '/var/lib/apt/lists',
+    '/etc/apt/preferences',
+    '/etc/apt/preferences.d',
+    '/etc/apt/sources.list',
+    '/etc/apt/sources.list.d',
+)
 if six.PY2:
     # Ensure no unicode in env vars on PY2, as it causes problems with
     # subprocess.Popen()
@@ -186,6 +201,35 @@ def _warn_software_properties(repo):
     log.warning('Best guess at ppa format: %s', repo)
 
 
+def _get_candidates(names, repo=None, name=None):
+    '''
+    Return the install candidates of the packages, from a single run of
+    ``apt-cache policy``. Packages apt-cache knows nothing about are missing
+    from the return. With ``name``, the candidate found is returned for it
+    whatever the package is named in the output.
+    '''
+    cmd = ['apt-cache', '-q', 'policy']
+    cmd.extend(names)
+    if repo is not None:
+        cmd.extend(repo)
+    out = _call_apt(cmd, scope=False)
+
+    ret = {}
+    current = name
+    for line in salt.utils.itertools.split(out['stdout'], '\n'):
+        if line and not line[0].isspace() and line.endswith(':'):
+            current = name or line[:-1]
+        elif current is not None and 'Candidate' in line:
+            candidate = ''
+            comps = line.split()
+            if len(comps) >= 2:
+                candidate = comps[-1]
+                if candidate.lower() == '(none)':
+                    candidate = ''
+            ret.setdefault(current, candidate)
+    return ret
+
+
 def latest_version(*names, **kwargs):
     '''
     Return the latest version of the named package available for upgrade or
@@ -235,22 +279,24 @@ def latest_version(*names, **kwargs):
     if refresh:
         refresh_db(cache_valid_time)
 
-    for name in names:
-        cmd = ['apt-cache', '-q', 'policy', name]
-        if repo is not None:
-            cmd.extend(repo)
-        out = _call_apt(cmd, scope=False)
-
-        candidate = ''
-        for line in salt.utils.itertools.split(out['stdout'], '\n'):
-            if 'Candidate' in line:
-                comps = line.split()
-                if len(comps) >= 2:
-                    candidate = comps[-1]
-                    if candidate.lower() == '(none)':
-                        candidate = ''
-                break
+    stamp = salt.utils.pkg.metadata_stamp(__opts__, _APT_METADATA)
+    candidates = salt.utils.pkg.read_metadata_cache(
+        __opts__, 'latest_version', [fromrepo], stamp) or {}
+    missing = [x for x in names if x not in candidates]
+    if missing:
+        # Query all the packages at once, then one by one those missing from
+        # the output, which apt-cache may name differently
+        queried = _get_candidates(missing, repo,
+                                  name=missing[0] if len(missing) == 1 else None)
+        for name in missing:
+            if name not in queried and len(missing) > 1:
+                queried.update(_get_candidates([name], repo, name=name))
+            candidates[name] = queried.get(name, '')
+        salt.utils.pkg.write_metadata_cache(
+            __opts__, 'latest_version', [fromrepo], stamp, candidates)
 
+    for name in names:
+        candidate = candidates[name]
         installed = pkgs.get(name, [])
         if not installed:
             ret[name] = candidate
@@ -759,12 +805,14 @@ def install(name=None,
         if to_unhold:
             unhold(pkgs=to_unhold)
 
+        outputs = []
         for cmd in cmds:
             out = _call_apt(cmd)
+            outputs.append(out['stdout'])
             if out['retcode'] != 0 and out['stderr']:
                 errors.append(out['stderr'])
 
-        __context__.pop('pkg.list_pkgs', None)
+        _refresh_pkg_context(outputs)
         new = list_pkgs()
         ret = salt.utils.data.compare_dicts(old, new)
 
@@ -812,7 +860,7 @@ def _uninstall(action='remove', name=None, pkgs=None, **kwargs):
     else:
         errors = []
 
-    __context__.pop('pkg.list_pkgs', None)
+    _refresh_pkg_context([out['stdout']])
     new = list_pkgs()
     new_removed = list_pkgs(removed=True)
 
@@ -1213,6 +1261,79 @@ def unhold(name=None, pkgs=None, sources=None, **kwargs):  # pylint: disable=W06
     return ret
 
 
+def _parse_dpkg_query(out, ret):
+    '''
+    Add the packages of the output of ``dpkg-query -W`` to the ``installed``,
+    ``removed`` and ``purge_desired`` dicts of ``ret``, and sort them
+    '''
+    # Typical lines of output:
+    # install ok installed zsh 4.3.17-1ubuntu1 amd64
+    # deinstall ok config-files mc 3:4.8.1-2ubuntu1 amd64
+    for line in out.splitlines():
+        cols = line.split()
+        try:
+            linetype, status, name, version_num, arch = \
+                [cols[x] for x in (0, 2, 3, 4, 5)]
+        except (ValueError, IndexError):
+            continue
+        if __grains__.get('cpuarch', '') == 'x86_64':
+            osarch = __grains__.get('osarch', '')
+            if arch != 'all' and osarch == 'amd64' and osarch != arch:
+                name += ':{0}'.format(arch)
+        if len(cols):
+            if ('install' in linetype or 'hold' in linetype) and \
+                    'installed' in status:
+                __salt__['pkg_resource.add_pkg'](ret['installed'],
+                                                 name,
+                                                 version_num)
+            elif 'deinstall' in linetype:
+                __salt__['pkg_resource.add_pkg'](ret['removed'],
+                                                 name,
+                                                 version_num)
+            elif 'purge' in linetype and status == 'installed':
+                __salt__['pkg_resource.add_pkg'](ret['purge_desired'],
+                                                 name,
+                                                 version_num)
+
+    for pkglist_type in ('installed', 'removed', 'purge_desired'):
+        __salt__['pkg_resource.sort_pkglist'](ret[pkglist_type])
+
+
+def _refresh_pkg_context(outputs):
+    '''
+    Update the snapshot of the package database kept in ``__context__`` by
+    list_pkgs after a run of apt-get, with the outputs of the commands run.
+    Only the packages dpkg reports as unpacked, set up or removed are queried
+    again, instead of all packages. When there is no snapshot, or none of the
+    packages changed could be found in the outputs, the snapshot is dropped so
+    that the next call to list_pkgs lists all packages.
+    '''
+    names = set()
+    for out in outputs:
+        for line in (out or '').splitlines():
+            match = _DPKG_CHANGE_RE.match(line)
+            if match:
+                names.add(match.group(1))
+    snapshot = __context__.get('pkg.list_pkgs')
+    if snapshot is None or not names:
+        __context__.pop('pkg.list_pkgs', None)
+        return
+    for pkgs in six.itervalues(snapshot):
+        for key in list(pkgs):
+            if key.split(':')[0] in names:
+                del pkgs[key]
+    cmd = ['dpkg-query', '--showformat',
+           '${Status} ${Package} ${Version} ${Architecture}\n', '-W']
+    cmd.extend(sorted(names))
+    # dpkg-query exits 1 for the packages which were purged
+    out = __salt__['cmd.run_all'](
+            cmd,
+            output_loglevel='trace',
+            python_shell=False,
+            ignore_retcode=True)
+    _parse_dpkg_query(out['stdout'], snapshot)
+
+
 def list_pkgs(versions_as_list=False,
               removed=False,
               purge_desired=False,
@@ -1260,45 +1381,22 @@ def list_pkgs(versions_as_list=False,
             __salt__['pkg_resource.stringify'](ret)
         return ret
 
-    ret = {'installed': {}, 'removed': {}, 'purge_desired': {}}
-    cmd = ['dpkg-query', '--showformat',
-           '${Status} ${Package} ${Version} ${Architecture}\n', '-W']
-
-    out = __salt__['cmd.run_stdout'](
-            cmd,
-            output_loglevel='trace',
-            python_shell=False)
-    # Typical lines of output:
-    # install ok installed zsh 4.3.17-1ubuntu1 amd64
-    # deinstall ok config-files mc 3:4.8.1-2ubuntu1 amd64
-    for line in out.splitlines():
-        cols = line.split()
-        try:
-            linetype, status, name, version_num, arch = \
-                [cols[x] for x in (0, 2, 3, 4, 5)]
-        except (ValueError, IndexError):
-            continue
-        if __grains__.get('cpuarch', '') == 'x86_64':
-            osarch = __grains__.get('osarch', '')
-            if arch != 'all' and osarch == 'amd64' and osarch != arch:
-                name += ':{0}'.format(arch)
-        if len(cols):
-            if ('install' in linetype or 'hold' in linetype) and \
-                    'installed' in status:
-                __salt__['pkg_resource.add_pkg'](ret['installed'],
-                                                 name,
-                                                 version_num)
-            elif 'deinstall' in linetype:
-                __salt__['pkg_resource.add_pkg'](ret['removed'],
-                                                 name,
-                                                 version_num)
-            elif 'purge' in linetype and status == 'installed':
-                __salt__['pkg_resource.add_pkg'](ret['purge_desired'],
-                                                 name,
-                                                 version_num)
-
-    for pkglist_type in ('installed', 'removed', 'purge_desired'):
-        __salt__['pkg_resource.sort_pkglist'](ret[pkglist_type])
+    stamp = salt.utils.pkg.metadata_stamp(__opts__, _DPKG_DB)
+    cache_key = [__grains__.get('cpuarch'), __grains__.get('osarch')]
+    ret = salt.utils.pkg.read_metadata_cache(
+        __opts__, 'list_pkgs', cache_key, stamp)
+    if ret is None:
+        ret = {'installed': {}, 'removed': {}, 'purge_desired': {}}
+        cmd = ['dpkg-query', '--showformat',
+               '${Status} ${Package} ${Version} ${Architecture}\n', '-W']
+
+        out = __salt__['cmd.run_stdout'](
+                cmd,
+                output_loglevel='trace',
+                python_shell=False)
+        _parse_dpkg_query(out, ret)
+        salt.utils.pkg.write_metadata_cache(
+            __opts__, 'list_pkgs', cache_key, stamp, ret)
 
     __context__['pkg.list_pkgs'] = copy.deepcopy(ret)
 
@@ -549,6 +549,51 @@ def cache_files(paths, saltenv='base'):
     return _client().cache_files(paths, saltenv)
 
 
+def prefetch_files(paths, saltenv='base', dests=None):
+    '''
+    .. versionadded:: Fluorine
+
+    Cache many files from the Master ahead of their use, as
+    :py:func:`cp.cache_files <salt.modules.cp.cache_files>` does. Afterwards
+    the hashes of these files are answered from memory, so fetching them again
+    with :py:func:`cp.hash_file <salt.modules.cp.hash_file>` or
+    :py:func:`cp.cache_file <salt.modules.cp.cache_file>` does not contact the
+    Master, until :py:func:`cp.clear_prefetch <salt.modules.cp.clear_prefetch>`
+    is called. This is used by the :conf_minion:`state_prefetch_files` option.
+
+    dests
+        A dict mapping paths to the local files they are going to be copied
+        to. Paths whose destination already has the same hash as the file on
+        the Master are not downloaded.
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt '*' cp.prefetch_files salt://pathto/file1,salt://pathto/file1
+    '''
+    if isinstance(paths, six.string_types):
+        paths = paths.split(',')
+    return _client().prefetch_files(paths, saltenv, dests=dests)
+
+
+def clear_prefetch():
+    '''
+    .. versionadded:: Fluorine
+
+    Forget the file hashes learned by :py:func:`cp.prefetch_files
+    <salt.modules.cp.prefetch_files>`
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt '*' cp.clear_prefetch
+    '''
+    _client().clear_prefetch()
+    return True
+
+
 def cache_dir(path, saltenv='base', include_empty=False, include_pat=None,
               exclude_pat=None):
     '''
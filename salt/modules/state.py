@@ -58,6 +58,7 @@ __outputter__ = {
     'template': 'highstate',
     'template_str': 'highstate',
     'apply_': 'highstate',
+    'show_profile': 'state_profile',
     'request': 'highstate',
     'check_request': 'highstate',
     'run_request': 'highstate',
@@ -984,6 +985,15 @@ def highstate(test=None, queue=False, **kwargs):
 
         .. versionadded:: 2015.8.4
 
+    profile : False
+        Record the time spent in each phase of the state run, like the
+        rendering of each SLS file, the compilation of the top file or the
+        resolution of the requisites. The profile of the last run is returned
+        by :py:func:`state.show_profile <salt.modules.state.show_profile>`.
+        See also :conf_minion:`state_profile`.
+
+        .. versionadded:: Fluorine
+
     CLI Examples:
 
     .. code-block:: bash
@@ -1075,6 +1085,7 @@ def highstate(test=None, queue=False, **kwargs):
 
     _set_retcode(ret, highstate=st_.building_highstate)
     _snapper_post(opts, kwargs.get('__pub_jid', 'called localy'), snapper_pre)
+    _save_profile(st_, 'state.highstate', kwargs)
 
     # Work around Windows multiprocessing bug, set __opts__['test'] back to
     # value from before this function was run.
@@ -1175,6 +1186,15 @@ def sls(mods, test=None, exclude=None, queue=False, sync_mods=None, **kwargs):
 
         .. versionadded:: 2015.8.4
 
+    profile : False
+        Record the time spent in each phase of the state run, like the
+        rendering of each SLS file, the compilation of the top file or the
+        resolution of the requisites. The profile of the last run is returned
+        by :py:func:`state.show_profile <salt.modules.state.show_profile>`.
+        See also :conf_minion:`state_profile`.
+
+        .. versionadded:: Fluorine
+
     sync_mods
         If specified, the desired custom module types will be synced prior to
         running the SLS files:
@@ -1321,6 +1341,7 @@ def sls(mods, test=None, exclude=None, queue=False, sync_mods=None, **kwargs):
         ret = st_.state.call_high(high_, orchestration_jid)
     finally:
         st_.pop_active()
+    _save_profile(st_, 'state.sls', kwargs)
     if __salt__['config.option']('state_data', '') == 'terse' or kwargs.get('terse'):
         ret = _filter_running(ret)
     cache_file = os.path.join(__opts__['cachedir'], 'sls.p')
@@ -1501,6 +1522,54 @@ def show_highstate(queue=False, **kwargs):
     return ret
 
 
+def _save_profile(st_, fun, kwargs):
+    '''
+    Write the phases recorded by the profiler of a state run to the cachedir,
+    for state.show_profile
+    '''
+    profiler = st_.state.profiler
+    if not profiler.enabled:
+        return
+    jid = kwargs.get('__pub_jid') or salt.utils.jid.gen_jid(__opts__)
+    data = {'jid': jid,
+            'fun': fun,
+            'phases': profiler.phases,
+            'stats': profiler.dump_stats(jid)}
+    cache_file = os.path.join(__opts__['cachedir'], 'state_profile.p')
+    serial = salt.payload.Serial(__opts__)
+    with salt.utils.files.set_umask(0o077):
+        try:
+            with salt.utils.files.fopen(cache_file, 'w+b') as fp_:
+                serial.dump(data, fp_)
+        except (IOError, OSError):
+            log.error('Unable to write the state profile to %s', cache_file)
+
+
+def show_profile():
+    '''
+    .. versionadded:: Fluorine
+
+    Return the profile of the last state run made with ``profile=True``, or
+    with :conf_minion:`state_profile` set: the wall clock time, CPU time and
+    number of calls of each phase of the run, keyed by the phases they are
+    part of joined with ``;``. The ``state_profile`` outputter renders it as a
+    tree.
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt '*' state.highstate profile=True
+        salt '*' state.show_profile
+    '''
+    cache_file = os.path.join(__opts__['cachedir'], 'state_profile.p')
+    if not os.path.isfile(cache_file):
+        return {}
+    serial = salt.payload.Serial(__opts__)
+    with salt.utils.files.fopen(cache_file, 'rb') as fp_:
+        return serial.load(fp_)
+
+
 def show_lowstate(queue=False, **kwargs):
     '''
     List out the low data that will be applied to this minion
@@ -1538,6 +1607,52 @@ def show_lowstate(queue=False, **kwargs):
     return ret
 
 
+def show_graph(queue=False, **kwargs):
+    '''
+    .. versionadded:: Fluorine
+
+    Show the requisite graph of the highstate of this minion, mapping the tag
+    of each state to the tags of the states it requires, watches, etc. per
+    requisite type, without running it
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt '*' state.show_graph
+    '''
+    conflict = _check_queue(queue, kwargs)
+    if conflict is not None:
+        return conflict
+
+    opts = salt.utils.state.get_sls_opts(__opts__, **kwargs)
+    try:
+        st_ = salt.state.HighState(opts,
+                                   proxy=__proxy__,
+                                   initial_pillar=_get_initial_pillar(opts))
+    except NameError:
+        st_ = salt.state.HighState(opts,
+                                   initial_pillar=_get_initial_pillar(opts))
+
+    errors = _get_pillar_errors(kwargs, pillar=st_.opts['pillar'])
+    if errors:
+        __context__['retcode'] = 5
+        raise CommandExecutionError('Pillar failed to render', info=errors)
+
+    st_.push_active()
+    try:
+        chunks = st_.compile_low_chunks()
+        if not chunks or not isinstance(chunks[0], dict):
+            # Errors are returned as a list of strings
+            if chunks:
+                __context__['retcode'] = 1
+            return chunks
+        ret = st_.state.requisite_graph(chunks)
+    finally:
+        st_.pop_active()
+    return ret
+
+
 def show_state_usage(queue=False, **kwargs):
     '''
     Retrieve the highstate data from the salt master to analyse used and unused states
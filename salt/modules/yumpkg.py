@@ -66,6 +66,17 @@ log = logging.getLogger(__name__)
 
 __HOLD_PATTERN = r'[\w+]+(?:[.-][^-]+)*'
 
+# The files the package metadata cached with pkg_metadata_cache depends on
+_RPM_DB = ('/var/lib/rpm/Packages', '/var/lib/rpm/rpmdb.sqlite')
+_YUM_METADATA = _RPM_DB + (
+    '/etc/yum.conf',
+    '/etc/dnf/dnf.conf',
+    '/etc/yum.repos.d',
+    '/var/cache/yum',
+    '/var/cache/dnf',
+)
+_YUM_METADATA_PATTERNS = ('*.conf', '*.repo', 'repomd.xml')
+
 # Define the module's virtual name
 __virtualname__ = 'pkg'
 
@@ -661,39 +672,45 @@ def list_pkgs(versions_as_list=False, **kwargs):
     contextkey = 'pkg.list_pkgs'
 
     if contextkey not in __context__:
-        ret = {}
-        cmd = ['rpm', '-qa', '--queryformat',
-               salt.utils.pkg.rpm.QUERYFORMAT.replace('%{REPOID}', '(none)') + '\n']
-        output = __salt__['cmd.run'](cmd,
-                                     python_shell=False,
-                                     output_loglevel='trace')
-        for line in output.splitlines():
-            pkginfo = salt.utils.pkg.rpm.parse_pkginfo(
-                line,
-                osarch=__grains__['osarch']
-            )
-            if pkginfo is not None:
-                # see rpm version string rules available at https://goo.gl/UGKPNd
-                pkgver = pkginfo.version
-                epoch = ''
-                release = ''
-                if ':' in pkgver:
-                    epoch, pkgver = pkgver.split(":", 1)
-                if '-' in pkgver:
-                    pkgver, release = pkgver.split("-", 1)
-                all_attr = {
-                    'epoch': epoch,
-                    'version': pkgver,
-                    'release': release,
-                    'arch': pkginfo.arch,
-                    'install_date': pkginfo.install_date,
-                    'install_date_time_t': pkginfo.install_date_time_t
-                }
-                __salt__['pkg_resource.add_pkg'](ret, pkginfo.name, all_attr)
-
-        for pkgname in ret:
-            ret[pkgname] = sorted(ret[pkgname], key=lambda d: d['version'])
-
+        stamp = salt.utils.pkg.metadata_stamp(__opts__, _RPM_DB)
+        ret = salt.utils.pkg.read_metadata_cache(
+            __opts__, 'list_pkgs', [__grains__['osarch']], stamp)
+        if ret is None:
+            ret = {}
+            cmd = ['rpm', '-qa', '--queryformat',
+                   salt.utils.pkg.rpm.QUERYFORMAT.replace('%{REPOID}', '(none)') + '\n']
+            output = __salt__['cmd.run'](cmd,
+                                         python_shell=False,
+                                         output_loglevel='trace')
+            for line in output.splitlines():
+                pkginfo = salt.utils.pkg.rpm.parse_pkginfo(
+                    line,
+                    osarch=__grains__['osarch']
+                )
+                if pkginfo is not None:
+                    # see rpm version string rules available at https://goo.gl/UGKPNd
+                    pkgver = pkginfo.version
+                    epoch = ''
+                    release = ''
+                    if ':' in pkgver:
+                        epoch, pkgver = pkgver.split(":", 1)
+                    if '-' in pkgver:
+                        pkgver, release = pkgver.split("-", 1)
+                    all_attr = {
+                        'epoch': epoch,
+                        'version': pkgver,
+                        'release': release,
+                        'arch': pkginfo.arch,
+                        'install_date': pkginfo.install_date,
+                        'install_date_time_t': pkginfo.install_date_time_t
+                    }
+                    __salt__['pkg_resource.add_pkg'](ret, pkginfo.name, all_attr)
+
+            for pkgname in ret:
+                ret[pkgname] = sorted(ret[pkgname], key=lambda d: d['version'])
+
+            salt.utils.pkg.write_metadata_cache(
+                __opts__, 'list_pkgs', [__grains__['osarch']], stamp, ret)
         __context__[contextkey] = ret
 
     return __salt__['pkg_resource.format_pkg_list'](
@@ -883,46 +900,63 @@ def list_repo_pkgs(*args, **kwargs):
             version_list = repo_dict.setdefault(pkg.name, set())
             version_list.add(pkg.version)
 
-    yum_version = None if _yum() != 'yum' else _LooseVersion(
-                __salt__['cmd.run'](
-                    ['yum', '--version'],
-                    python_shell=False
-                ).splitlines()[0].strip()
-            )
-    # Really old version of yum; does not even have --showduplicates option
-    if yum_version and yum_version < _LooseVersion('3.2.13'):
-        cmd_prefix = ['--quiet']
-        if cacheonly:
-            cmd_prefix.append('-C')
-        cmd_prefix.append('list')
-        for pkg_src in ('installed', 'available'):
-            # Check installed packages first
-            out = _call_yum(cmd_prefix + [pkg_src], ignore_retcode=True)
-            if out['retcode'] == 0:
-                _parse_output(out['stdout'], strict=True)
-    # The --showduplicates option is added in 3.2.13, but the
-    # repository-packages subcommand is only in 3.4.3 and newer
-    elif yum_version and yum_version < _LooseVersion('3.4.3'):
-        cmd_prefix = ['--quiet', '--showduplicates']
-        if cacheonly:
-            cmd_prefix.append('-C')
-        cmd_prefix.append('list')
-        for pkg_src in ('installed', 'available'):
-            # Check installed packages first
-            out = _call_yum(cmd_prefix + [pkg_src], ignore_retcode=True)
-            if out['retcode'] == 0:
-                _parse_output(out['stdout'], strict=True)
+    stamp = salt.utils.pkg.metadata_stamp(
+        __opts__, _YUM_METADATA, _YUM_METADATA_PATTERNS)
+    cache_key = [list(args), repos, bool(cacheonly)]
+    cached = salt.utils.pkg.read_metadata_cache(
+        __opts__, 'list_repo_pkgs', cache_key, stamp)
+    if cached is not None:
+        for reponame, pkgs in six.iteritems(cached):
+            ret[reponame] = dict(
+                (pkgname, set(versions))
+                for pkgname, versions in six.iteritems(pkgs))
     else:
-        for repo in repos:
-            cmd = ['--quiet', '--showduplicates', 'repository-packages', repo, 'list']
+        yum_version = None if _yum() != 'yum' else _LooseVersion(
+                    __salt__['cmd.run'](
+                        ['yum', '--version'],
+                        python_shell=False
+                    ).splitlines()[0].strip()
+                )
+        # Really old version of yum; does not even have --showduplicates option
+        if yum_version and yum_version < _LooseVersion('3.2.13'):
+            cmd_prefix = ['--quiet']
             if cacheonly:
-                cmd.append('-C')
-            # Can't concatenate because args is a tuple, using list.extend()
-            cmd.extend(args)
-            out = _call_yum(cmd, ignore_retcode=True)
-            if out['retcode'] != 0 and 'Error:' in out['stdout']:
-                continue
-            _parse_output(out['stdout'])
+                cmd_prefix.append('-C')
+            cmd_prefix.append('list')
+            for pkg_src in ('installed', 'available'):
+                # Check installed packages first
+                out = _call_yum(cmd_prefix + [pkg_src], ignore_retcode=True)
+                if out['retcode'] == 0:
+                    _parse_output(out['stdout'], strict=True)
+        # The --showduplicates option is added in 3.2.13, but the
+        # repository-packages subcommand is only in 3.4.3 and newer
+        elif yum_version and yum_version < _LooseVersion('3.4.3'):
+            cmd_prefix = ['--quiet', '--showduplicates']
+            if cacheonly:
+                cmd_prefix.append('-C')
+            cmd_prefix.append('list')
+            for pkg_src in ('installed', 'available'):
+                # Check installed packages first
+                out = _call_yum(cmd_prefix + [pkg_src], ignore_retcode=True)
+                if out['retcode'] == 0:
+                    _parse_output(out['stdout'], strict=True)
+        else:
+            for repo in repos:
+                cmd = ['--quiet', '--showduplicates', 'repository-packages', repo, 'list']
+                if cacheonly:
+                    cmd.append('-C')
+                # Can't concatenate because args is a tuple, using list.extend()
+                cmd.extend(args)
+                out = _call_yum(cmd, ignore_retcode=True)
+                if out['retcode'] != 0 and 'Error:' in out['stdout']:
+                    continue
+                _parse_output(out['stdout'])
+
+        salt.utils.pkg.write_metadata_cache(
+            __opts__, 'list_repo_pkgs', cache_key, stamp,
+            dict((reponame, dict((pkgname, sorted(versions))
+                                 for pkgname, versions in six.iteritems(pkgs)))
+                 for reponame, pkgs in six.iteritems(ret)))
 
     if byrepo:
         for reponame in ret:
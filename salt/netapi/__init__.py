@@ -5,7 +5,10 @@ Make api awesomeness
 from __future__ import absolute_import, print_function, unicode_literals
 # Import Python libs
 import inspect
+import logging
 import os
+import threading
+import time
 
 # Import Salt libs
 import salt.log  # pylint: disable=W0611
@@ -15,11 +18,140 @@ import salt.runner
 import salt.syspaths
 import salt.wheel
 import salt.utils.args
+import salt.utils.event
+import salt.utils.jid
 import salt.client.ssh.client
 import salt.exceptions
 
 # Import third party libs
 from salt.ext import six
+from salt.ext.six.moves import queue
+
+log = logging.getLogger(__name__)
+
+
+class JobReturnListener(object):
+    '''
+    Listen to the job returns on the master event bus in a thread, and
+    dispatch them to the jobs waiting on them
+
+    .. versionadded:: Fluorine
+
+    All the jobs in flight in a process share one listener, hence one
+    subscription to the event bus, see :py:meth:`get`.
+    '''
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, opts):
+        self.opts = opts
+        self.pid = os.getpid()
+        # jid -> queue of the returns of the job
+        self.queues = {}
+        self.lock = threading.Lock()
+        self.connected = threading.Event()
+        self.thread = threading.Thread(target=self._run,
+                                       name='JobReturnListener')
+        self.thread.daemon = True
+        self.thread.start()
+        # Wait for the subscription, so that no return of the jobs published
+        # next is missed
+        self.connected.wait(opts.get('gather_job_timeout', 10))
+
+    @classmethod
+    def get(cls, opts):
+        '''
+        Return the listener of the current process, started on first use
+        '''
+        with cls._lock:
+            if cls._instance is None or cls._instance.pid != os.getpid() \
+                    or not cls._instance.thread.is_alive():
+                cls._instance = cls(opts)
+            return cls._instance
+
+    def subscribe(self):
+        '''
+        Generate the jid of a new job, and return it with the queue the returns
+        of the job are put in
+        '''
+        with self.lock:
+            jid = salt.utils.jid.gen_jid(self.opts)
+            while jid in self.queues:
+                # Another thread got the same jid
+                jid = salt.utils.jid.gen_jid(self.opts)
+            returns = self.queues[jid] = queue.Queue()
+        return jid, returns
+
+    def unsubscribe(self, jid):
+        self.queues.pop(jid, None)
+
+    def _run(self):
+        event = salt.utils.event.get_event(
+            'master',
+            sock_dir=self.opts['sock_dir'],
+            transport=self.opts['transport'],
+            opts=self.opts,
+            listen=True)
+        event.connect_pub()
+        self.connected.set()
+        while True:
+            try:
+                ret = event.get_event(full=True, auto_reconnect=True)
+            except Exception:
+                log.error('Failed to get an event from the master event bus',
+                          exc_info=True)
+                time.sleep(1)
+                continue
+            if not ret:
+                continue
+            # salt/job/<jid>/ret/<minion id>
+            parts = ret['tag'].split('/')
+            if len(parts) < 5 or parts[1] != 'job' or parts[3] != 'ret':
+                continue
+            returns = self.queues.get(parts[2])
+            if returns is not None:
+                returns.put(ret['data'])
+
+
+class JobReturns(six.Iterator):
+    '''
+    Iterate over the returns of a job received by a
+    :py:class:`JobReturnListener`, yielding ``{minion id: return}``
+
+    .. versionadded:: Fluorine
+
+    The job is unsubscribed from the listener once all the minions returned,
+    on timeout, or on :py:meth:`close`, even if the iteration never started.
+    '''
+    def __init__(self, listener, jid, returns, minions, timeout):
+        self.listener = listener
+        self.jid = jid
+        self.returns = returns
+        self.minions = set(minions)
+        self.end = time.time() + timeout
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while self.minions:
+            remaining = self.end - time.time()
+            if remaining <= 0:
+                break
+            try:
+                data = self.returns.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if data.get('id') not in self.minions:
+                continue
+            self.minions.discard(data['id'])
+            return {data['id']: data.get('return')}
+        self.close()
+        raise StopIteration
+
+    def close(self):
+        self.minions.clear()
+        self.listener.unsubscribe(self.jid)
 
 
 class NetapiClient(object):
@@ -90,6 +222,41 @@ class NetapiClient(object):
         local = salt.client.get_local_client(mopts=self.opts)
         return local.run_job(*args, **kwargs)
 
+    def local_async_stream(self, tgt, fun, arg=(), tgt_type='glob', ret='',
+                           timeout=None, **kwargs):
+        '''
+        Run :ref:`execution modules <all-salt.modules>` asynchronously and
+        stream the returns
+
+        .. versionadded:: Fluorine
+
+        Publishes the job like :py:meth:`local_async`, then returns an
+        iterator yielding ``{minion id: return}`` for each minion as soon as it
+        returns. The iterator stops once all the targeted minions returned, or
+        after ``timeout`` seconds, which defaults to the ``timeout`` of the
+        master configuration.
+
+        The returns of all the jobs run in a process are received through one
+        subscription to the master event bus, shared with a
+        :py:class:`JobReturnListener`.
+        '''
+        if timeout is None:
+            timeout = self.opts['timeout']
+        listener = JobReturnListener.get(self.opts)
+        jid, returns = listener.subscribe()
+        try:
+            local = salt.client.get_local_client(mopts=self.opts)
+            pub_data = local.run_job(tgt, fun, arg, tgt_type, ret, jid=jid,
+                                     **kwargs)
+        except Exception:
+            listener.unsubscribe(jid)
+            raise
+        if not pub_data:
+            listener.unsubscribe(jid)
+            return iter([])
+        return JobReturns(listener, jid, returns,
+                          pub_data.get('minions', []), timeout)
+
     def local(self, *args, **kwargs):
         '''
         Run :ref:`execution modules <all-salt.modules>` synchronously
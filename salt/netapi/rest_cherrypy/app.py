@@ -535,6 +535,16 @@ addition to much less network traffic and memory requirements. Job returns can
 be fetched from Salt's job cache via the ``/jobs/<jid>`` endpoint, or they can
 be collected into a data store using Salt's :ref:`Returner system <returners>`.
 
+The ``local_async_stream`` client publishes the job like ``local_async`` and
+streams each minion return as soon as it is received, with chunked transfer
+encoding. The returns of all the jobs in flight are received through one
+subscription to the event bus per salt-api process, instead of one per request
+for the ``local`` client. The response is a list of ``{minion id: return}``
+items, one per line: JSON documents separated by newlines, or the items of a
+YAML list.
+
+.. versionadded:: Fluorine
+
 The ``/events`` endpoint is specifically designed to handle long-running HTTP
 connections and it exposes Salt's event bus which includes job returns.
 Watching this endpoint first, then executing asynchronous Salt commands second,
@@ -588,6 +598,7 @@ import logging
 import os
 import signal
 import tarfile
+import types
 from multiprocessing import Process, Pipe
 
 logger = logging.getLogger(__name__)
@@ -840,6 +851,14 @@ ct_out_map = (
         salt.utils.yaml.safe_dump, default_flow_style=False)),
 )
 
+# Maps Content-Type to the serialization functions of one item of a streamed
+# list: one JSON document per line, or one item of a YAML list
+ct_stream_map = {
+    'application/json': lambda data: salt.utils.json.dumps(data) + '\n',
+    'application/x-yaml': lambda data: salt.utils.yaml.safe_dump(
+        [data], default_flow_style=False),
+}
+
 
 def hypermedia_handler(*args, **kwargs):
     '''
@@ -897,6 +916,9 @@ def hypermedia_handler(*args, **kwargs):
 
     # Transform the output from the handler into the requested output format
     cherrypy.response.headers['Content-Type'] = best
+    if isinstance(ret, types.GeneratorType):
+        cherrypy.response.stream = True
+        return hypermedia_stream(ret, ct_stream_map[best])
     out = cherrypy.response.processors[best]
     try:
         response = out(ret)
@@ -909,6 +931,22 @@ def hypermedia_handler(*args, **kwargs):
         raise cherrypy.HTTPError(500, msg)
 
 
+def hypermedia_stream(items, out):
+    '''
+    Transform the items yielded by a handler into the serialized chunks of a
+    streamed response
+
+    The status and headers are sent before the first item is, so an error
+    raised by the handler only ends the response.
+    '''
+    try:
+        for item in items:
+            yield salt.utils.stringutils.to_bytes(out(item))
+    except Exception:
+        logger.error('Error while streaming the response for: %s',
+                     cherrypy.request.path_info, exc_info=True)
+
+
 def hypermedia_out():
     '''
     Determine the best handler for the requested content type
@@ -1143,11 +1181,10 @@ class LowDataAdapter(object):
         self.apiopts = cherrypy.config['apiopts']
         self.api = salt.netapi.NetapiClient(self.opts)
 
-    def exec_lowstate(self, client=None, token=None):
+    def _lowstate_chunks(self, client=None, token=None):
         '''
-        Pull a Low State data structure from request and execute the low-data
-        chunks through Salt. The low-data chunks will be updated to include the
-        authorization token for the current session.
+        Pull a Low State data structure from request and update its low-data
+        chunks to include the authorization token for the current session
         '''
         lowstate = cherrypy.request.lowstate
 
@@ -1161,8 +1198,7 @@ class LowDataAdapter(object):
         if not isinstance(lowstate, list):
             raise cherrypy.HTTPError(400, 'Lowstates must be a list')
 
-        # Make any requested additions or modifications to each lowstate, then
-        # execute each one and yield the result.
+        # Make any requested additions or modifications to each lowstate
         for chunk in lowstate:
             if token:
                 chunk['token'] = token
@@ -1175,6 +1211,16 @@ class LowDataAdapter(object):
             if 'arg' in chunk and not isinstance(chunk['arg'], list):
                 chunk['arg'] = [chunk['arg']]
 
+        return lowstate
+
+    def exec_lowstate(self, client=None, token=None):
+        '''
+        Pull a Low State data structure from request and execute the low-data
+        chunks through Salt. The low-data chunks will be updated to include the
+        authorization token for the current session.
+        '''
+        # Execute each chunk and yield the result.
+        for chunk in self._lowstate_chunks(client, token):
             ret = self.api.run(chunk)
 
             # Sometimes Salt gives us a return and sometimes an iterator
@@ -1184,6 +1230,44 @@ class LowDataAdapter(object):
             else:
                 yield ret
 
+    def stream_lowstate(self, token=None):
+        '''
+        Execute the low-data chunks of the request like :py:meth:`exec_lowstate`,
+        all at once, and return a generator yielding their results as they come
+
+        .. versionadded:: Fluorine
+
+        The jobs of ``local_async_stream`` chunks are all published before the
+        first return is yielded, so that they run concurrently, and any
+        authentication error is raised before the response is started.
+        '''
+        rets = []
+
+        def _close():
+            # Unsubscribe the jobs whose returns are not all streamed
+            for ret in rets:
+                if hasattr(ret, 'close'):
+                    ret.close()
+
+        try:
+            for chunk in self._lowstate_chunks(token=token):
+                rets.append(self.api.run(chunk))
+        except Exception:
+            _close()
+            raise
+
+        def _stream():
+            try:
+                for ret in rets:
+                    if isinstance(ret, collections.Iterator):
+                        for i in ret:
+                            yield i
+                    else:
+                        yield ret
+            finally:
+                _close()
+        return _stream()
+
     @cherrypy.config(**{'tools.sessions.on': False})
     def GET(self):
         '''
@@ -1281,6 +1365,13 @@ class LowDataAdapter(object):
               ms-3: true
               ms-4: true
         '''
+        lowstate = cherrypy.request.lowstate
+        if isinstance(lowstate, list) and any(
+                isinstance(chunk, dict) and
+                chunk.get('client') == 'local_async_stream'
+                for chunk in lowstate):
+            return self.stream_lowstate(token=cherrypy.session.get('token'))
+
         return {
             'return': list(self.exec_lowstate(
                 token=cherrypy.session.get('token')))
@@ -56,6 +56,7 @@ def get_application(opts):
         (r"/run", saltnado.RunSaltAPIHandler),
         (r"/events", saltnado.EventsSaltAPIHandler),
         (r"/hook(/.*)?", saltnado.WebhookSaltAPIHandler),
+        (r"/stats", saltnado.StatsSaltAPIHandler),
     ]
 
     # if you have enabled websockets, add them!
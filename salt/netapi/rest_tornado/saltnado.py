@@ -31,6 +31,7 @@ add the following to the Salt master config file.
         debug: False
         disable_ssl: False
         webhook_disable_auth: False
+        stats_disable_auth: False
         cors_origin: null
 
 .. _rest_tornado-auth:
@@ -208,6 +209,7 @@ salt.utils.zeromq.install_zmq()
 
 # salt imports
 import salt.ext.six as six
+from salt.ext.six.moves import range  # pylint: disable=redefined-builtin
 import salt.netapi
 import salt.utils.args
 import salt.utils.event
@@ -275,6 +277,14 @@ class EventListener(object):
     Class responsible for listening to the salt master event bus and updating
     futures. This is the core of what makes this async, this allows us to do
     non-blocking work in the main processes and "wait" for an event to happen
+
+    All the handlers of the application share one listener, hence one
+    subscription to the master event bus. The futures waiting on an exact tag
+    are found with a dict lookup and the ones waiting on a tag prefix by
+    walking a trie of the prefixes along the tag, so an event only touches the
+    futures it matches. Only the futures waiting with another matcher are
+    checked one by one. The body of an event is only unpacked when a future
+    matches its tag.
     '''
 
     def __init__(self, mod_opts, opts):
@@ -289,15 +299,31 @@ class EventListener(object):
             io_loop=tornado.ioloop.IOLoop.current()
         )
 
-        # tag -> list of futures
+        # (tag, matcher) -> list of futures
         self.tag_map = defaultdict(list)
 
+        # trie of the tags waited on with the prefix matcher, one dict per
+        # character, the tag ending at a node is stored under the None key
+        self.prefix_trie = {}
+
+        # (tag, matcher) keys of the tag_map using any other matcher
+        self.custom_keys = set()
+
         # request_obj -> list of (tag, future)
         self.request_map = defaultdict(list)
 
         # map of future -> timeout_callback
         self.timeout_map = {}
 
+        # counters reported by the /stats endpoint
+        self.stats = {
+            'events': 0,
+            'events_matched': 0,
+            'futures_set': 0,
+            'match_time': 0.0,
+            'max_match_time': 0.0,
+        }
+
         self.event.set_event_handler(self._handle_event_socket_recv)
 
     def clean_by_request(self, request):
@@ -351,6 +377,7 @@ class EventListener(object):
                 tornado.ioloop.IOLoop.current().add_callback(callback, future)
             future.add_done_callback(handle_future)
         # add this tag and future to the callbacks
+        self._add_key(tag, matcher)
         self.tag_map[(tag, matcher)].append(future)
         self.request_map[request].append((tag, matcher, future))
 
@@ -360,6 +387,80 @@ class EventListener(object):
 
         return future
 
+    def _add_key(self, tag, matcher):
+        '''
+        Index a (tag, matcher) key of the tag_map
+        '''
+        if (tag, matcher) in self.tag_map or matcher is self.exact_matcher:
+            return
+        if matcher is self.prefix_matcher and tag is not None:
+            node = self.prefix_trie
+            for char in tag:
+                node = node.setdefault(char, {})
+            node[None] = tag
+        else:
+            self.custom_keys.add((tag, matcher))
+
+    def _remove_key(self, tag, matcher):
+        '''
+        Remove a (tag, matcher) key from the tag_map and its index
+        '''
+        self.tag_map.pop((tag, matcher), None)
+        if matcher is self.exact_matcher:
+            return
+        if matcher is self.prefix_matcher and tag is not None:
+            path = [self.prefix_trie]
+            for char in tag:
+                if char not in path[-1]:
+                    return
+                path.append(path[-1][char])
+            path[-1].pop(None, None)
+            # prune the branch which no other prefix goes through
+            for index in range(len(tag), 0, -1):
+                if path[index]:
+                    break
+                del path[index - 1][tag[index - 1]]
+        else:
+            self.custom_keys.discard((tag, matcher))
+
+    def _matching_keys(self, mtag):
+        '''
+        Return the (tag, matcher) keys of the tag_map matching the tag of an
+        event
+        '''
+        keys = []
+        if (mtag, self.exact_matcher) in self.tag_map:
+            keys.append((mtag, self.exact_matcher))
+        node = self.prefix_trie
+        if None in node:
+            keys.append((node[None], self.prefix_matcher))
+        for char in mtag:
+            node = node.get(char)
+            if node is None:
+                break
+            if None in node:
+                keys.append((node[None], self.prefix_matcher))
+        for tag, matcher in self.custom_keys:
+            try:
+                is_matched = matcher(mtag, tag)
+            except Exception:
+                log.error('Failed to run a matcher.', exc_info=True)
+                is_matched = False
+            if is_matched:
+                keys.append((tag, matcher))
+        return keys
+
+    def get_stats(self):
+        '''
+        Return the statistics of the listener
+        '''
+        ret = dict(self.stats)
+        ret['waiting_futures'] = sum(len(futures) for futures in six.itervalues(self.tag_map))
+        ret['waiting_tags'] = len(self.tag_map)
+        ret['waiting_requests'] = len(self.request_map)
+        ret['mean_match_time'] = ret['match_time'] / ret['events'] if ret['events'] else 0.0
+        return ret
+
     def _timeout_future(self, tag, matcher, future):
         '''
         Timeout a specific future
@@ -370,34 +471,38 @@ class EventListener(object):
             future.set_exception(TimeoutException())
             self.tag_map[(tag, matcher)].remove(future)
         if len(self.tag_map[(tag, matcher)]) == 0:
-            del self.tag_map[(tag, matcher)]
+            self._remove_key(tag, matcher)
 
     def _handle_event_socket_recv(self, raw):
         '''
         Callback for events on the event sub socket
         '''
-        mtag, data = self.event.unpack(raw, self.event.serial)
+        start = time.time()
+        mtag, mdata = salt.utils.event.SaltEvent.unpack_tag(raw)
 
         # see if we have any futures that need this info:
-        for (tag, matcher), futures in six.iteritems(self.tag_map):
-            try:
-                is_matched = matcher(mtag, tag)
-            except Exception:
-                log.error('Failed to run a matcher.', exc_info=True)
-                is_matched = False
-
-            if not is_matched:
-                continue
-
+        keys = self._matching_keys(mtag)
+        if keys:
+            data = self.event.serial.loads(mdata, encoding='utf-8')
+            self.stats['events_matched'] += 1
+        for key in keys:
+            # unindex the futures first, the callbacks may wait on the key again
+            futures = self.tag_map[key]
+            self._remove_key(*key)
             for future in futures:
                 if future.done():
                     continue
                 future.set_result({'data': data, 'tag': mtag})
-                self.tag_map[(tag, matcher)].remove(future)
+                self.stats['futures_set'] += 1
                 if future in self.timeout_map:
                     tornado.ioloop.IOLoop.current().remove_timeout(self.timeout_map[future])
                     del self.timeout_map[future]
 
+        elapsed = time.time() - start
+        self.stats['events'] += 1
+        self.stats['match_time'] += elapsed
+        self.stats['max_match_time'] = max(self.stats['max_match_time'], elapsed)
+
 
 class BaseSaltAPIHandler(tornado.web.RequestHandler):  # pylint: disable=W0223
     ct_out_map = (
@@ -1557,6 +1662,72 @@ class EventsSaltAPIHandler(SaltAPIHandler):  # pylint: disable=W0223
                 break
 
 
+class StatsSaltAPIHandler(BaseSaltAPIHandler):  # pylint: disable=W0223
+    '''
+    Expose statistics on the running server
+
+    .. versionadded:: Fluorine
+    '''
+    def get(self):
+        '''
+        Return the statistics of the event listener shared by the requests
+        waiting on events: the number of waiting futures, tags and requests,
+        the number of events received and matched, and the time spent
+        dispatching them to the waiting futures. Also return the hit counts of
+        the :py:class:`eauth cache <salt.auth.EauthCache>` of the process.
+
+        .. http:get:: /stats
+
+            :reqheader X-Auth-Token: |req_token|
+            :reqheader Accept: |req_accept|
+
+            :resheader Content-Type: |res_ct|
+
+            :status 200: |200|
+            :status 401: |401|
+            :status 406: |406|
+
+        **Example request:**
+
+        .. code-block:: bash
+
+            curl -i localhost:8000/stats
+
+        **Example response:**
+
+        .. code-block:: http
+
+            HTTP/1.1 200 OK
+            Content-Type: application/x-yaml
+
+            event_listener:
+              events: 1520
+              events_matched: 212
+              futures_set: 230
+              match_time: 0.0318
+              max_match_time: 0.0011
+              mean_match_time: 2.09e-05
+              waiting_futures: 18
+              waiting_requests: 9
+              waiting_tags: 18
+            eauth_cache:
+              entries: 12
+              hit_rate: 0.93
+              hits: 412
+              misses: 31
+              negative_hits: 0
+        '''
+        disable_auth = self.application.mod_opts.get('stats_disable_auth')
+        if not disable_auth and not self._verify_auth():
+            self.redirect('/login')
+            return
+
+        self.write(self.serialize({
+            'event_listener': self.application.event_listener.get_stats(),
+            'eauth_cache': salt.auth.EauthCache.get_stats(),
+        }))
+
+
 class WebhookSaltAPIHandler(SaltAPIHandler):  # pylint: disable=W0223
     '''
     A generic web hook entry point that fires an event on Salt's event bus
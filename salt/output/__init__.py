@@ -93,6 +93,20 @@ def display_output(data, out=None, opts=None, **kwargs):
     '''
     if opts is None:
         opts = {}
+    if opts.get('state_output_stream', False) and not opts.get('output_file'):
+        printout_iter = get_printout_iter(out, opts, **kwargs)
+        if printout_iter is not None:
+            try:
+                for chunk in printout_iter(data, **kwargs):
+                    if chunk:
+                        salt.utils.stringutils.print_cli(chunk)
+            except (KeyError, AttributeError, TypeError):
+                log.error('Streamed output failed: ', exc_info=True)
+            except IOError as exc:
+                # Only raise if it's NOT a broken pipe
+                if exc.errno != errno.EPIPE:
+                    raise exc
+            return
     display_data = try_printout(data, out, opts, **kwargs)
 
     output_filename = opts.get('output_file', None)
@@ -198,6 +212,15 @@ def get_printout(out, opts=None, **kwargs):
     return outputters[out]
 
 
+def get_printout_iter(out, opts=None, **kwargs):
+    '''
+    Return the function of the outputter returned by get_printout which yields
+    its output piece by piece, named ``output_iter``, or None if it has none
+    '''
+    printout = get_printout(out, opts, **kwargs)
+    return getattr(printout, '__globals__', {}).get('output_iter')
+
+
 def out_format(data, out, opts=None, **kwargs):
     '''
     Return the formatted outputter string for the passed data
@@ -56,6 +56,14 @@ state_tabular:
     output format.  If you wish to use a custom format, this can be set to a
     string.
 
+state_output_stream:
+    Set this to `True` to write the output as each state is formatted, rather
+    than once all the states of a minion are. The states are shown in full or
+    tersely as set by `state_output`, and the summary of each minion follows
+    its states.
+
+    .. versionadded:: Fluorine
+
 Example usage:
 
 If ``state_output: filter`` is set in the configuration file:
@@ -133,10 +141,9 @@ import logging
 log = logging.getLogger(__name__)
 
 
-def output(data, **kwargs):  # pylint: disable=unused-argument
+def _strip_data(data):
     '''
-    The HighState Outputter is only meant to be used with the state.highstate
-    function, or a function that returns highstate return data.
+    Discard the data passed along the state returns by the orchestrate runner
     '''
     # Discard retcode in dictionary as present in orchestrate data
     local_masters = [key for key in data.keys() if key.endswith('.local_master')]
@@ -152,6 +159,15 @@ def output(data, **kwargs):  # pylint: disable=unused-argument
     # pull request #27838, and pull request #27175 for more information.
     if 'data' in data:
         data = data.pop('data')
+    return data
+
+
+def output(data, **kwargs):  # pylint: disable=unused-argument
+    '''
+    The HighState Outputter is only meant to be used with the state.highstate
+    function, or a function that returns highstate return data.
+    '''
+    data = _strip_data(data)
 
     indent_level = kwargs.get('indent_level', 1)
     ret = [
@@ -168,11 +184,64 @@ def output(data, **kwargs):  # pylint: disable=unused-argument
     return ''
 
 
+def output_iter(data, **kwargs):  # pylint: disable=unused-argument
+    '''
+    Yield the output of :py:func:`output` a state at a time, so that it can be
+    written as it is formatted when :conf_master:`state_output_stream` is set.
+
+    As the name of each minion is written before its states, it is not colored
+    after the results of its states.
+
+    .. versionadded:: Fluorine
+    '''
+    data = _strip_data(data)
+
+    indent_level = kwargs.get('indent_level', 1)
+    colors = salt.utils.color.get_colors(
+            __opts__.get('color'),
+            __opts__.get('color_theme'))
+    for host, hostdata in six.iteritems(data):
+        yield _format_host_header(host, colors['CYAN'], colors)
+        status = {}
+        for lines in _format_host_lines(host, hostdata, indent_level, status):
+            yield '\n'.join(lines)
+
+
 def _format_host(host, data, indent_level=1):
     '''
     Main highstate formatter. can be called recursively if a nested highstate
     contains other highstates (ie in an orchestration)
     '''
+    colors = salt.utils.color.get_colors(
+            __opts__.get('color'),
+            __opts__.get('color_theme'))
+    status = {}
+    hstrs = []
+    for lines in _format_host_lines(host, data, indent_level, status):
+        hstrs.extend(lines)
+    hstrs.insert(0, _format_host_header(host, status['hcolor'], colors))
+    return '\n'.join(hstrs), status['nchanges'] > 0
+
+
+def _format_host_header(host, hcolor, colors):
+    '''
+    Format the line naming the minion before its states
+    '''
+    host = salt.utils.data.decode(host)
+    if __opts__.get('strip_colors', True):
+        host = salt.output.strip_esc_sequence(host)
+    return '{0}{1}:{2[ENDC]}'.format(hcolor, host, colors)
+
+
+def _format_host_lines(host, data, indent_level, status):
+    '''
+    Yield the lines of the output of a minion, as a list for each state and
+    one for the summary. The color of the name of the minion and whether any
+    state changed are set in ``status`` once all are yielded.
+
+    Whether a state is shown in full or tersely, or not at all, is decided
+    before its changes are formatted.
+    '''
     host = salt.utils.data.decode(host)
 
     colors = salt.utils.color.get_colors(
@@ -218,6 +287,9 @@ def _format_host(host, data, indent_level=1):
             if isinstance(info, dict) and 'result' in info:
                 data_tmp[tname] = info
         data = data_tmp
+        if hstrs:
+            yield hstrs
+            hstrs = []
         # Everything rendered as it should display the output
         for tname in sorted(
                 data,
@@ -237,14 +309,12 @@ def _format_host(host, data, indent_level=1):
                     log.error('Cannot parse a float from duration %s', ret.get('duration', 0))
 
             tcolor = colors['GREEN']
-            if ret.get('name') in ['state.orch', 'state.orchestrate', 'state.sls']:
-                nested = output(ret['changes']['return'], indent_level=indent_level+1)
-                ctext = re.sub('^', ' ' * 14 * indent_level, '\n'+nested, flags=re.MULTILINE)
+            orchestration = ret.get('name') in ['state.orch', 'state.orchestrate', 'state.sls']
+            if orchestration:
                 schanged = True
-                nchanges += 1
             else:
-                schanged, ctext = _format_changes(ret['changes'])
-                nchanges += 1 if schanged else 0
+                schanged = _changes_exist(ret['changes'])
+            nchanges += 1 if schanged else 0
 
             # Skip this state if it was successful & diff output was requested
             if __opts__.get('state_output_diff', False) and \
@@ -302,7 +372,7 @@ def _format_host(host, data, indent_level=1):
 
                 if six.text_type(ret['result']) in terse:
                     msg = _format_terse(tcolor, comps, ret, colors, tabular)
-                    hstrs.append(msg)
+                    yield [msg]
                     continue
                 if six.text_type(ret['result']) in exclude:
                     continue
@@ -314,9 +384,15 @@ def _format_host(host, data, indent_level=1):
             )):
                 # Print this chunk in a terse way and continue in the loop
                 msg = _format_terse(tcolor, comps, ret, colors, tabular)
-                hstrs.append(msg)
+                yield [msg]
                 continue
 
+            if orchestration:
+                nested = output(ret['changes']['return'], indent_level=indent_level+1)
+                ctext = re.sub('^', ' ' * 14 * indent_level, '\n'+nested, flags=re.MULTILINE)
+            else:
+                ctext = _format_changes(ret['changes'])[1]
+
             state_lines = [
                 '{tcolor}----------{colors[ENDC]}',
                 '    {tcolor}      ID: {comps[1]}{colors[ENDC]}',
@@ -398,6 +474,8 @@ def _format_host(host, data, indent_level=1):
                         colors=colors
                     )
                 )
+            yield hstrs
+            hstrs = []
 
         # Append result counts to end of output
         colorfmt = '{0}{1}{2[ENDC]}'
@@ -490,10 +568,10 @@ def _format_host(host, data, indent_level=1):
                 duration_unit)
             hstrs.append(colorfmt.format(colors['CYAN'], total_duration, colors))
 
-    if strip_colors:
-        host = salt.output.strip_esc_sequence(host)
-    hstrs.insert(0, ('{0}{1}:{2[ENDC]}'.format(hcolor, host, colors)))
-    return '\n'.join(hstrs), nchanges > 0
+    if hstrs:
+        yield hstrs
+    status['hcolor'] = hcolor
+    status['nchanges'] = nchanges
 
 
 def _nested_changes(changes):
@@ -536,6 +614,39 @@ def _format_changes(changes, orchestration=False):
     return changed, ctext
 
 
+def _changes_exist(changes):
+    '''
+    Return whether :py:func:`_format_changes` would report changes, without
+    formatting them
+    '''
+    if not changes:
+        return False
+    if not isinstance(changes, dict):
+        return True
+    ret = changes.get('ret')
+    if ret is not None and changes.get('out') == 'highstate':
+        return any(_host_changed(hostdata) for hostdata in six.itervalues(ret))
+    return True
+
+
+def _host_changed(data):
+    '''
+    Return whether :py:func:`_format_host` would report changes for a minion
+    '''
+    if isinstance(data, int) or isinstance(data, six.string_types):
+        return True
+    if not isinstance(data, dict):
+        return False
+    for info in six.itervalues(data):
+        if not isinstance(info, dict) or 'result' not in info:
+            continue
+        if info.get('name') in ['state.orch', 'state.orchestrate', 'state.sls']:
+            return True
+        if _changes_exist(info['changes']):
+            return True
+    return False
+
+
 def _format_terse(tcolor, comps, ret, colors, tabular):
     '''
     Terse formatting of a message.
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+'''
+Display the profile of a state run
+==================================
+
+.. versionadded:: Fluorine
+
+Render the phases recorded by :py:func:`state.show_profile
+<salt.modules.state.show_profile>` as a tree, with the wall clock time, the CPU
+time and the number of calls of each phase, and a bar showing its share of the
+whole run.
+
+Example output::
+
+    myminion:
+        phase                                  wall (s)  cpu (s)  calls
+        execute                                   3.412    0.954      1  ##########################
+        render                                    0.601    0.588      1  ####
+          sls base:webserver                      0.412    0.401      1  ###
+          sls base:users                          0.187    0.185      1  #
+        load_modules                              0.216    0.210      1  #
+        pillar                                    0.104    0.102      1
+'''
+from __future__ import absolute_import, print_function, unicode_literals
+
+# Import Salt libs
+import salt.utils.color
+from salt.ext import six
+
+__virtualname__ = 'state_profile'
+
+BAR_WIDTH = 30
+
+
+def __virtual__():
+    return True
+
+
+def _tree(phases):
+    '''
+    Build the tree of phases out of their ``;`` joined keys
+    '''
+    root = {'children': {}}
+    for key, stats in six.iteritems(phases):
+        node = root
+        for name in key.split(';'):
+            node = node['children'].setdefault(name, {'children': {}})
+        node['stats'] = stats
+    return root
+
+
+def _walk(node, depth, total, lines):
+    children = sorted(
+        six.iteritems(node['children']),
+        key=lambda item: item[1].get('stats', {}).get('wall', 0.0),
+        reverse=True)
+    for name, child in children:
+        stats = child.get('stats', {})
+        wall = stats.get('wall', 0.0)
+        bar = '#' * int(round(BAR_WIDTH * wall / total)) if total else ''
+        lines.append(
+            '{0:<38} {1:>9.3f} {2:>8.3f} {3:>6}  {4}'.format(
+                '  ' * depth + name,
+                wall,
+                stats.get('cpu', 0.0),
+                stats.get('calls', 0),
+                bar).rstrip())
+        _walk(child, depth + 1, total, lines)
+
+
+def _format(record):
+    phases = record.get('phases') or {}
+    if not phases:
+        return ['No profile recorded']
+    root = _tree(phases)
+    total = sum(child.get('stats', {}).get('wall', 0.0)
+                for child in six.itervalues(root['children']))
+    lines = ['{0:<38} {1:>9} {2:>8} {3:>6}'.format(
+        'phase', 'wall (s)', 'cpu (s)', 'calls')]
+    _walk(root, 0, total, lines)
+    if record.get('stats'):
+        lines.append('cProfile stats:')
+        lines.extend('  {0}'.format(path) for path in record['stats'])
+    return lines
+
+
+def output(data, **kwargs):  # pylint: disable=unused-argument
+    '''
+    Display the profile of the last state run of each minion
+    '''
+    colors = salt.utils.color.get_colors(
+        __opts__.get('color'),
+        __opts__.get('color_theme'))
+    if not isinstance(data, dict):
+        return six.text_type(data)
+    if 'phases' in data:
+        data = {None: data}
+    ret = []
+    for host in sorted(data, key=six.text_type):
+        record = data[host]
+        indent = ''
+        if host is not None:
+            ret.append('{0}{1}:{2}'.format(colors['GREEN'], host, colors['ENDC']))
+            indent = '    '
+        if not isinstance(record, dict):
+            ret.append('{0}{1}'.format(indent, record))
+            continue
+        ret.extend('{0}{1}'.format(indent, line) for line in _format(record))
+    return '\n'.join(ret)
@@ -26,6 +26,7 @@ import salt.utils.cache
 import salt.utils.crypt
 import salt.utils.data
 import salt.utils.dictupdate
+import salt.utils.topmatch
 import salt.utils.url
 from salt.exceptions import SaltClientError
 from salt.template import compile_template
@@ -367,6 +368,8 @@ class Pillar(object):
             self.functions = functions
 
         self.matcher = salt.minion.Matcher(self.opts, self.functions)
+        self.top_cache = salt.utils.topmatch.TopMatchCache(self.opts, 'pillar')
+        self.matcher.top_cache = self.top_cache
         self.rend = salt.loader.render(self.opts, self.functions)
         ext_pillar_opts = copy.deepcopy(self.opts)
         # Fix self.opts['file_roots'] so that ext_pillars know the real
@@ -480,6 +483,23 @@ class Pillar(object):
         '''
         return set(['base']) | set(self.opts.get('file_roots', []))
 
+    def _compile_top(self, path, saltenv):
+        '''
+        Render a top file, or reuse its last rendering if top_match_cache is
+        set and it did not change
+        '''
+        return self.top_cache.compile_top(
+            path,
+            saltenv,
+            lambda: compile_template(
+                path,
+                self.rend,
+                self.opts['renderer'],
+                self.opts['renderer_blacklist'],
+                self.opts['renderer_whitelist'],
+                saltenv=saltenv,
+                _pillar_rend=True))
+
     def get_tops(self):
         '''
         Gather the top files
@@ -510,15 +530,7 @@ class Pillar(object):
             for saltenv in saltenvs:
                 top = self.client.cache_file(self.opts['state_top'], saltenv)
                 if top:
-                    tops[saltenv].append(compile_template(
-                        top,
-                        self.rend,
-                        self.opts['renderer'],
-                        self.opts['renderer_blacklist'],
-                        self.opts['renderer_whitelist'],
-                        saltenv=saltenv,
-                        _pillar_rend=True,
-                    ))
+                    tops[saltenv].append(self._compile_top(top, saltenv))
         except Exception as exc:
             errors.append(
                     ('Rendering Primary Top file failed, render error:\n{0}'
@@ -545,17 +557,12 @@ class Pillar(object):
                         continue
                     try:
                         tops[saltenv].append(
-                                compile_template(
+                                self._compile_top(
                                     self.client.get_state(
                                         sls,
                                         saltenv
                                         ).get('dest', False),
-                                    self.rend,
-                                    self.opts['renderer'],
-                                    self.opts['renderer_blacklist'],
-                                    self.opts['renderer_whitelist'],
-                                    saltenv=saltenv,
-                                    _pillar_rend=True,
+                                    saltenv
                                     )
                                 )
                     except Exception as exc:
@@ -661,6 +668,7 @@ class Pillar(object):
                     for item in data:
                         if isinstance(item, six.string_types) and item not in env_matches:
                             env_matches.append(item)
+        self.top_cache.save()
         return matches
 
     def render_pstate(self, sls, saltenv, mods, defaults=None):
@@ -784,7 +792,8 @@ class Pillar(object):
                                             nstate,
                                             self.merge_strategy,
                                             self.opts.get('renderer', 'yaml'),
-                                            self.opts.get('pillar_merge_lists', False))
+                                            self.opts.get('pillar_merge_lists', False),
+                                            copy_on_write=True)
                                 if err:
                                     errors += err
 
@@ -803,7 +812,8 @@ class Pillar(object):
                                         s,
                                         self.merge_strategy,
                                         self.opts.get('renderer', 'yaml'),
-                                        self.opts.get('pillar_merge_lists', False))
+                                        self.opts.get('pillar_merge_lists', False),
+                                        copy_on_write=True)
         return state, mods, errors
 
     def render_pillar(self, matches, errors=None):
@@ -811,7 +821,7 @@ class Pillar(object):
         Extract the sls pillar files from the matches and render them into the
         pillar
         '''
-        pillar = copy.copy(self.pillar_override)
+        pillar = copy.deepcopy(self.pillar_override)
         if errors is None:
             errors = []
         for saltenv, pstates in six.iteritems(matches):
@@ -853,7 +863,8 @@ class Pillar(object):
                         pstate,
                         self.merge_strategy,
                         self.opts.get('renderer', 'yaml'),
-                        self.opts.get('pillar_merge_lists', False))
+                        self.opts.get('pillar_merge_lists', False),
+                        copy_on_write=True)
 
         return pillar, errors
 
@@ -969,7 +980,8 @@ class Pillar(object):
                     ext,
                     self.merge_strategy,
                     self.opts.get('renderer', 'yaml'),
-                    self.opts.get('pillar_merge_lists', False))
+                    self.opts.get('pillar_merge_lists', False),
+                    copy_on_write=True)
                 ext = None
         return pillar, errors
 
@@ -403,15 +403,19 @@ def list_(bank, cachedir=None):
     return cache.list(bank)
 
 
-def fetch(bank, key, cachedir=None):
+def fetch(bank, key=None, cachedir=None):
     '''
     Fetch data from a salt.cache bank.
 
+    .. versionchanged:: Fluorine
+        If no key is specified, return the data of all the keys of the bank.
+
     CLI Example:
 
     .. code-block:: bash
 
         salt-run cache.fetch cloud/active/ec2/myec2 myminion cachedir=/var/cache/salt/
+        salt-run cache.fetch minions/myminion
     '''
     if cachedir is None:
         cachedir = __opts__['cachedir']
@@ -420,6 +424,8 @@ def fetch(bank, key, cachedir=None):
         cache = salt.cache.Cache(__opts__, cachedir=cachedir)
     except TypeError:
         cache = salt.cache.Cache(__opts__)
+    if key is None:
+        return cache.fetch_bank(bank)
     return cache.fetch(bank, key)
 
 
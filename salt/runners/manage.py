@@ -175,7 +175,7 @@ def down(removekeys=False, tgt='*', tgt_type='glob'):
     return ret
 
 
-def up(tgt='*', tgt_type='glob', timeout=None, gather_job_timeout=None):  # pylint: disable=C0103
+def up(tgt='*', tgt_type='glob', timeout=None, gather_job_timeout=None, presence=False):  # pylint: disable=C0103
     '''
     .. versionchanged:: 2017.7.0
         The ``expr_form`` argument has been renamed to ``tgt_type``, earlier
@@ -183,6 +183,13 @@ def up(tgt='*', tgt_type='glob', timeout=None, gather_job_timeout=None):  # pyli
 
     Print a list of all of the minions that are up
 
+    presence : False
+        .. versionadded:: Fluorine
+
+        List the targeted minions connected to the master according to Salt's
+        presence detection instead of pinging them. This is immediate when the
+        :conf_master:`presence_service` is enabled.
+
     CLI Example:
 
     .. code-block:: bash
@@ -190,7 +197,14 @@ def up(tgt='*', tgt_type='glob', timeout=None, gather_job_timeout=None):  # pyli
         salt-run manage.up
         salt-run manage.up tgt="webservers" tgt_type="nodegroup"
         salt-run manage.up timeout=5 gather_job_timeout=10
+        salt-run manage.up presence=True
     '''
+    if presence:
+        ckminions = salt.utils.minions.CkMinions(__opts__)
+        minions = ckminions.check_minions(tgt, tgt_type)['minions']
+        if not minions:
+            return []
+        return sorted(ckminions.connected_ids(subset=minions))
     ret = status(
         output=False,
         tgt=tgt,
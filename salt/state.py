@@ -25,6 +25,7 @@ import traceback
 import re
 import time
 import random
+import multiprocessing
 
 # Import salt libs
 import salt.loader
@@ -38,9 +39,13 @@ import salt.utils.decorators.state
 import salt.utils.dictupdate
 import salt.utils.event
 import salt.utils.files
+import salt.utils.hashutils
 import salt.utils.immutabletypes as immutabletypes
+import salt.utils.json
 import salt.utils.platform
 import salt.utils.process
+import salt.utils.profile
+import salt.utils.topmatch
 import salt.utils.url
 import salt.syspaths as syspaths
 from salt.serializers.msgpack import serialize as msgpack_serialize, deserialize as msgpack_deserialize
@@ -57,7 +62,7 @@ import salt.utils.yamlloader as yamlloader
 import msgpack
 # pylint: disable=import-error,no-name-in-module,redefined-builtin
 from salt.ext import six
-from salt.ext.six.moves import map, range, reload_module
+from salt.ext.six.moves import map, range, reload_module, queue
 # pylint: enable=import-error,no-name-in-module,redefined-builtin
 
 log = logging.getLogger(__name__)
@@ -363,6 +368,76 @@ class StateError(Exception):
     pass
 
 
+class RequisiteIndex(object):
+    '''
+    Lookup tables of a list of low chunks by ``__id__``, ``name`` and
+    ``__sls__``, used to resolve requisites without matching every chunk
+    against every requisite. Only requisites containing glob characters fall
+    back to matching, with the compiled pattern, and every result is cached.
+    '''
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.length = len(chunks)
+        self.by_id = {}
+        self.by_name = {}
+        self.by_sls = {}
+        self.matches = {}
+        for pos, chunk in enumerate(chunks):
+            for key, table in (('__id__', self.by_id),
+                               ('name', self.by_name),
+                               ('__sls__', self.by_sls)):
+                value = chunk.get(key)
+                if isinstance(value, six.string_types):
+                    table.setdefault(os.path.normcase(value), []).append(pos)
+
+    def current(self, chunks):
+        '''
+        Return True if the index still describes the given list of chunks
+        '''
+        return chunks is self.chunks and len(chunks) == self.length
+
+    def _positions(self, key, pattern):
+        '''
+        Return the positions of the chunks whose ``key`` matches the pattern
+        '''
+        table = {'__id__': self.by_id,
+                 'name': self.by_name,
+                 '__sls__': self.by_sls}[key]
+        pattern = os.path.normcase(pattern)
+        if not any(char in pattern for char in '*?['):
+            return table.get(pattern, [])
+        regex = re.compile(fnmatch.translate(pattern))
+        ret = []
+        for value, positions in six.iteritems(table):
+            if regex.match(value):
+                ret.extend(positions)
+        return ret
+
+    def find(self, req_key, req_val):
+        '''
+        Return the chunks a requisite refers to, in the order of the chunks.
+        A requisite on ``sls`` matches the chunks of the sls files matching
+        the value, any other matches the chunks whose ``name`` or ``__id__``
+        matches the value and, unless the key is ``id``, whose state is the
+        key.
+        '''
+        cache_key = (req_key, req_val)
+        if cache_key in self.matches:
+            return self.matches[cache_key]
+        if req_key == 'sls':
+            positions = set(self._positions('__sls__', req_val))
+        else:
+            positions = set(self._positions('name', req_val))
+            positions.update(self._positions('__id__', req_val))
+            if req_key != 'id':
+                positions = set(
+                    pos for pos in positions
+                    if self.chunks[pos]['state'] == req_key)
+        ret = [self.chunks[pos] for pos in sorted(positions)]
+        self.matches[cache_key] = ret
+        return ret
+
+
 class Compiler(object):
     '''
     Class used to compile and manage the High Data structure
@@ -720,6 +795,9 @@ class State(object):
             loader='states',
             initial_pillar=None):
         self.states_loader = loader
+        self.profiler = salt.utils.profile.PhaseProfiler(
+            enabled=opts.get('state_profile', False),
+            stats_path=opts.get('state_profile_dir'))
         if 'grains' not in opts:
             opts['grains'] = salt.loader.grains(opts)
         self.opts = opts
@@ -735,7 +813,8 @@ class State(object):
             self.opts['pillar'] = initial_pillar
         else:
             # Compile pillar data
-            self.opts['pillar'] = self._gather_pillar()
+            with self.profiler.phase('pillar'):
+                self.opts['pillar'] = self._gather_pillar()
             # Reapply overrides on top of compiled pillar
             if self._pillar_override:
                 self.opts['pillar'] = salt.utils.dictupdate.merge(
@@ -745,7 +824,8 @@ class State(object):
                     self.opts.get('renderer', 'yaml'),
                     self.opts.get('pillar_merge_lists', False))
         self.state_con = context or {}
-        self.load_modules()
+        with self.profiler.phase('load_modules'):
+            self.load_modules()
         self.active = set()
         self.mod_init = set()
         self.pre = {}
@@ -753,6 +833,9 @@ class State(object):
         self.jid = jid
         self.instance_id = six.text_type(id(self))
         self.inject_globals = {}
+        self._requisite_index = None
+        self.incremental = None
+        self._incremental_hashes = {}
         self.mocked = mocked
 
     def _gather_pillar(self):
@@ -831,6 +914,10 @@ class State(object):
         if low['state'] in agg_opt and not low.get('__agg__'):
             agg_fun = '{0}.mod_aggregate'.format(low['state'])
             if agg_fun in self.states:
+                # Let the aggregate functions resolve requisites with the
+                # index of the chunks instead of building their own
+                self.states.pack['__context__']['state.requisite_index'] = \
+                    self.requisite_index(chunks)
                 try:
                     low = self.states[agg_fun](low, chunks, running)
                     low['__agg__'] = True
@@ -1004,7 +1091,8 @@ class State(object):
                 log.error('Error encountered during module reload. Modules were not reloaded.')
             except TypeError:
                 log.error('Error encountered during module reload. Modules were not reloaded.')
-        self.load_modules()
+        with self.profiler.phase('load_modules'):
+            self.load_modules()
         if not self.opts.get('local', False) and self.opts.get('multiprocessing', True):
             self.functions['saltutil.refresh_modules']()
 
@@ -1911,6 +1999,13 @@ class State(object):
                 inject_globals['__orchestration_jid__'] = \
                     low['__orchestration_jid__']
 
+            if ret['result'] is False and self.incremental_unchanged(low):
+                ret = {'name': low['name'],
+                       'result': True,
+                       'changes': {},
+                       'comment': 'State was not run because neither its '
+                                  'arguments nor the resource changed since '
+                                  'the last successful run'}
             if 'result' not in ret or ret['result'] is False:
                 self.states.inject_globals = inject_globals
                 if self.mocked:
@@ -2130,20 +2225,26 @@ class State(object):
                         chunks.remove(low)
                         break
         running = {}
-        for low in chunks:
+        if self.opts.get('state_workers', 0) > 0:
+            running = self.call_chunks_concurrent(chunks, running)
             if '__FAILHARD__' in running:
                 running.pop('__FAILHARD__')
                 return running
-            tag = _gen_tag(low)
-            if tag not in running:
-                # Check if this low chunk is paused
-                action = self.check_pause(low)
-                if action == 'kill':
-                    break
-                running = self.call_chunk(low, running, chunks)
-                if self.check_failhard(low, running):
+        else:
+            for low in chunks:
+                if '__FAILHARD__' in running:
+                    running.pop('__FAILHARD__')
                     return running
-            self.active = set()
+                tag = _gen_tag(low)
+                if tag not in running:
+                    # Check if this low chunk is paused
+                    action = self.check_pause(low)
+                    if action == 'kill':
+                        break
+                    running = self.call_chunk(low, running, chunks)
+                    if self.check_failhard(low, running):
+                        return running
+                self.active = set()
         while True:
             if self.reconcile_procs(running):
                 break
@@ -2151,6 +2252,230 @@ class State(object):
         ret = dict(list(disabled.items()) + list(running.items()))
         return ret
 
+    def _order_level(self, low):
+        '''
+        Return 0 for the chunks ordered first, 2 for the chunks ordered last
+        and 1 for all others
+        '''
+        order = low.get('order')
+        if not isinstance(order, (int, float)):
+            return 1
+        if order < 1:
+            return 0
+        if order >= 1000000:
+            return 2
+        return 1
+
+    def _chunk_deps(self, chunks):
+        '''
+        Return a dict mapping the tag of each chunk to the tags of the chunks
+        which have to be done before it starts: the chunks its requisites
+        refer to and the chunks which prereq it, and the set of the tags of
+        the chunks which are prereqs of others.
+        '''
+        index = self.requisite_index(chunks)
+        deps = dict((_gen_tag(low), set()) for low in chunks)
+        prereqs = set()
+        for low in chunks:
+            tag = _gen_tag(low)
+            for requisite in STATE_REQUISITE_KEYWORDS:
+                if requisite == 'listen' or not isinstance(low.get(requisite), list):
+                    continue
+                for req in low[requisite]:
+                    if isinstance(req, six.string_types):
+                        req = {'id': req}
+                    if not isinstance(req, dict) or not req:
+                        continue
+                    req = trim_req(req)
+                    req_val = next(six.itervalues(req))
+                    if not isinstance(req_val, six.string_types):
+                        continue
+                    for chunk in index.find(next(iter(req)), req_val):
+                        ctag = _gen_tag(chunk)
+                        deps[tag].add(ctag)
+                        if requisite == 'prereq':
+                            deps[ctag].add(tag)
+                            prereqs.add(ctag)
+        for tag in deps:
+            deps[tag].discard(tag)
+        return deps, prereqs
+
+    def _state_worker_target(self, low, status, reqs, chunks, running, results):
+        '''
+        Run the state function of a low chunk whose requisites are met and
+        put its return on the results queue
+        '''
+        tag = _gen_tag(low)
+        # This is a copy of the State in a separate process, the modules are
+        # refreshed by the parent when it gets the return
+        self.check_refresh = lambda data, ret: None
+        try:
+            ret = self.call(low, chunks, running)
+            if status == 'change' and not ret['changes'] and not ret.get('skip_watch', False):
+                low = low.copy()
+                low['sfun'] = low['fun']
+                low['fun'] = 'mod_watch'
+                low['__reqs__'] = reqs
+                ret = self.call(low, chunks, running)
+        except Exception:
+            trb = traceback.format_exc()
+            ret = {'result': False,
+                   'name': low.get('name', low.get('__id__')),
+                   'changes': {},
+                   'comment': 'An exception occurred in this state: {0}'.format(trb),
+                   '__sls__': low.get('__sls__')}
+        results.put((tag, ret))
+
+    def _start_state_worker(self, low, status, reqs, chunks, running, results):
+        '''
+        Start a process running the state function of a low chunk
+        '''
+        worker = salt.utils.process.MultiprocessingProcess(
+            target=self._state_worker_target,
+            args=(low, status, reqs, chunks, running, results))
+        worker.start()
+        return worker
+
+    def call_chunks_concurrent(self, chunks, running):
+        '''
+        Call the chunks as a graph of requisites, running up to
+        ``state_workers`` state functions at a time in separate processes.
+        The changes the state functions make to ``__context__`` in these
+        processes are lost.
+
+        A chunk is started once all the chunks its requisites refer to are
+        done, in the order of the chunks. The chunks ordered ``first`` are done
+        before any other starts and the chunks ordered ``last`` start after all
+        others are done. Chunks with prereqs and chunks which are aggregated
+        are called here once no state function is running, as are the chunks
+        of a requisite cycle, so that the same rules as in a sequential run
+        apply to them.
+        '''
+        workers = self.opts['state_workers']
+        results = multiprocessing.Queue()
+        agg_opt = self.functions['config.option']('state_aggregate')
+        pending = list(chunks)
+        deps, prereqs = self._chunk_deps(chunks)
+        inflight = {}
+        stop = failhard = False
+
+        def done(tag):
+            return tag in running and 'proc' not in running[tag]
+
+        def exclusive(low):
+            if 'prereq' in low or 'prerequired' in low or _gen_tag(low) in prereqs:
+                return True
+            agg = low.get('aggregate', agg_opt)
+            return agg is True or (isinstance(agg, list) and low['state'] in agg)
+
+        def failed_hard(low):
+            if running.pop('__FAILHARD__', False):
+                return True
+            return self.check_failhard(low, running)
+
+        def run_here(low):
+            self.active = set()
+            ret = self.call_chunk(low, running, chunks)
+            self.active = set()
+            return ret
+
+        while pending or inflight:
+            self.reconcile_procs(running)
+            pending = [low for low in pending if not done(_gen_tag(low))]
+            started = False
+            if not stop:
+                level = min(
+                    [self._order_level(low) for low in pending[:1]] +
+                    [self._order_level(worker[0]) for worker in six.itervalues(inflight)] or [1])
+                for low in pending:
+                    if len(inflight) >= workers:
+                        break
+                    tag = _gen_tag(low)
+                    if tag in inflight or tag in running:
+                        continue
+                    if self._order_level(low) != level:
+                        break
+                    if not all(done(dep) for dep in deps[tag]):
+                        continue
+                    solo = exclusive(low)
+                    if solo and inflight:
+                        # Wait for the running state functions
+                        break
+                    if self.check_pause(low) == 'kill':
+                        stop = True
+                        break
+                    if solo:
+                        running = run_here(low)
+                    else:
+                        status, reqs = self.check_requisite(low, running, chunks, pre=True)
+                        if status not in ('met', 'change') or low.get('parallel'):
+                            running = run_here(low)
+                        else:
+                            self._mod_init(low)
+                            snapshot = dict(
+                                (rtag, ret) for rtag, ret in six.iteritems(running)
+                                if 'proc' not in ret)
+                            inflight[tag] = (low, self._start_state_worker(
+                                low, status, reqs, chunks, snapshot, results))
+                            started = True
+                            continue
+                    started = True
+                    if failed_hard(low):
+                        failhard = stop = True
+                        break
+            if not inflight:
+                if stop:
+                    break
+                if not started and pending:
+                    if any('proc' in ret for ret in six.itervalues(running)):
+                        # Wait for the parallel states
+                        time.sleep(0.01)
+                        continue
+                    # The remaining chunks wait on each other, run the first
+                    # one as in a sequential run
+                    low = pending[0]
+                    if self.check_pause(low) == 'kill':
+                        break
+                    running = run_here(low)
+                    if failed_hard(low):
+                        failhard = stop = True
+                continue
+            try:
+                returns = [results.get(timeout=0.1)]
+            except queue.Empty:
+                returns = []
+                dead = [tag for tag, (low, worker) in six.iteritems(inflight)
+                        if not worker.is_alive()]
+                if not dead:
+                    continue
+                try:
+                    while True:
+                        returns.append(results.get_nowait())
+                except queue.Empty:
+                    pass
+                for tag in dead:
+                    if tag not in [rtag for rtag, ret in returns]:
+                        low = inflight[tag][0]
+                        returns.append((tag, {
+                            'result': False,
+                            'name': low['name'],
+                            'changes': {},
+                            'comment': 'State worker failed to return',
+                            '__sls__': low.get('__sls__')}))
+            for tag, ret in returns:
+                low, worker = inflight.pop(tag)
+                worker.join()
+                self.check_refresh(low, ret)
+                ret['__run_num__'] = self.__run_num
+                self.__run_num += 1
+                running[tag] = ret
+                self.event(ret, len(chunks), fire_event=low.get('fire_event'))
+                if failed_hard(low):
+                    failhard = stop = True
+        if failhard:
+            running['__FAILHARD__'] = True
+        return running
+
     def check_failhard(self, low, running):
         '''
         Check if the low data chunk should send a failhard signal
@@ -2238,11 +2563,54 @@ class State(object):
                     retset.add(False)
         return False not in retset
 
+    def requisite_index(self, chunks):
+        '''
+        Return the RequisiteIndex of the chunks, it is built once per list of
+        chunks
+        '''
+        if self._requisite_index is None or not self._requisite_index.current(chunks):
+            self._requisite_index = RequisiteIndex(chunks)
+        return self._requisite_index
+
+    def requisite_graph(self, chunks):
+        '''
+        Return the requisites of the chunks as a graph, mapping the tag of each
+        chunk to the tags of the chunks it depends on, per requisite type
+        '''
+        index = self.requisite_index(chunks)
+        graph = {}
+        for low in chunks:
+            edges = {}
+            for requisite in STATE_REQUISITE_KEYWORDS:
+                if requisite == 'listen' or not isinstance(low.get(requisite), list):
+                    continue
+                for req in low[requisite]:
+                    if isinstance(req, six.string_types):
+                        req = {'id': req}
+                    if not isinstance(req, dict) or not req:
+                        continue
+                    req = trim_req(req)
+                    req_key = next(iter(req))
+                    req_val = req[req_key]
+                    if not isinstance(req_val, six.string_types):
+                        continue
+                    for chunk in index.find(req_key, req_val):
+                        tags = edges.setdefault(requisite, [])
+                        ctag = _gen_tag(chunk)
+                        if ctag not in tags:
+                            tags.append(ctag)
+            graph[_gen_tag(low)] = edges
+        return graph
+
     def check_requisite(self, low, running, chunks, pre=False):
         '''
         Look into the running data to check the status of all requisite
         states
         '''
+        with self.profiler.phase('requisites'):
+            return self._check_requisite(low, running, chunks, pre)
+
+    def _check_requisite(self, low, running, chunks, pre=False):
         present = False
         # If mod_watch is not available make it a require
         if 'watch' in low:
@@ -2298,40 +2666,18 @@ class State(object):
                     if isinstance(req, six.string_types):
                         req = {'id': req}
                     req = trim_req(req)
-                    found = False
-                    for chunk in chunks:
-                        req_key = next(iter(req))
-                        req_val = req[req_key]
-                        if req_val is None:
-                            continue
-                        if req_key == 'sls':
-                            # Allow requisite tracking of entire sls files
-                            if fnmatch.fnmatch(chunk['__sls__'], req_val):
-                                found = True
-                                reqs[r_state].append(chunk)
-                            continue
-                        try:
-                            if isinstance(req_val, six.string_types):
-                                if (fnmatch.fnmatch(chunk['name'], req_val) or
-                                    fnmatch.fnmatch(chunk['__id__'], req_val)):
-                                    if req_key == 'id' or chunk['state'] == req_key:
-                                        found = True
-                                        reqs[r_state].append(chunk)
-                            else:
-                                raise KeyError
-                        except KeyError as exc:
-                            raise SaltRenderError(
-                                'Could not locate requisite of [{0}] present in state with name [{1}]'.format(
-                                    req_key, chunk['name']))
-                        except TypeError:
-                            # On Python 2, the above req_val, being an OrderedDict, will raise a KeyError,
-                            # however on Python 3 it will raise a TypeError
-                            # This was found when running tests.unit.test_state.StateCompilerTestCase.test_render_error_on_invalid_requisite
-                            raise SaltRenderError(
-                                'Could not locate requisite of [{0}] present in state with name [{1}]'.format(
-                                    req_key, chunk['name']))
+                    req_key = next(iter(req))
+                    req_val = req[req_key]
+                    if req_val is None or not chunks:
+                        return 'unmet', ()
+                    if not isinstance(req_val, six.string_types):
+                        raise SaltRenderError(
+                            'Could not locate requisite of [{0}] present in state with name [{1}]'.format(
+                                req_key, chunks[0]['name']))
+                    found = self.requisite_index(chunks).find(req_key, req_val)
                     if not found:
                         return 'unmet', ()
+                    reqs[r_state].extend(found)
         fun_stats = set()
         for r_state, chunks in six.iteritems(reqs):
             req_stats = set()
@@ -2487,26 +2833,14 @@ class State(object):
                     found = False
                     req_key = next(iter(req))
                     req_val = req[req_key]
-                    for chunk in chunks:
-                        if req_val is None:
-                            continue
-                        if req_key == 'sls':
-                            # Allow requisite tracking of entire sls files
-                            if fnmatch.fnmatch(chunk['__sls__'], req_val):
-                                if requisite == 'prereq':
-                                    chunk['__prereq__'] = True
-                                reqs.append(chunk)
-                                found = True
-                            continue
-                        if (fnmatch.fnmatch(chunk['name'], req_val) or
-                            fnmatch.fnmatch(chunk['__id__'], req_val)):
-                            if req_key == 'id' or chunk['state'] == req_key:
-                                if requisite == 'prereq':
-                                    chunk['__prereq__'] = True
-                                elif requisite == 'prerequired':
-                                    chunk['__prerequired__'] = True
-                                reqs.append(chunk)
-                                found = True
+                    if req_val is not None:
+                        for chunk in self.requisite_index(chunks).find(req_key, req_val):
+                            if requisite == 'prereq':
+                                chunk['__prereq__'] = True
+                            elif requisite == 'prerequired' and req_key != 'sls':
+                                chunk['__prerequired__'] = True
+                            reqs.append(chunk)
+                            found = True
                     if not found:
                         lost[requisite].append(req)
             if lost['require'] or lost['watch'] or lost['prereq'] \
@@ -2751,32 +3085,172 @@ class State(object):
         running.update(errors)
         return running
 
+    def prefetch_file_refs(self, chunks):
+        '''
+        Cache the salt:// files referenced by the low chunks before any of
+        them is run, so the states find them in the minion's cache instead of
+        each fetching its own files from the master in turn. Returns True if
+        files were prefetched.
+        '''
+        if not self.opts.get('state_prefetch_files', False) \
+                or 'cp.prefetch_files' not in self.functions:
+            return False
+        import salt.client.ssh.state
+        refs = salt.client.ssh.state.lowstate_file_refs(chunks)
+        prefetched = False
+        for saltenv, env_refs in six.iteritems(refs):
+            paths = []
+            for chunk_refs in env_refs:
+                for ref in chunk_refs:
+                    if ref not in paths:
+                        paths.append(ref)
+            if not paths:
+                continue
+            log.debug('Prefetching %d files from saltenv \'%s\'', len(paths), saltenv)
+            prefetched = True
+            try:
+                self.functions['cp.prefetch_files'](paths, saltenv)
+            except Exception as exc:
+                # The states will fetch the files themselves
+                log.warning('Failed to prefetch the files of the state run: %s', exc)
+        return prefetched
+
+    def _incremental_path(self):
+        return os.path.join(self.opts['cachedir'], 'state_incremental.p')
+
+    def load_incremental(self):
+        '''
+        Load the fingerprints and drift probes of the states of the last run
+        and make the state calls skip the states which did not change since
+        '''
+        self.incremental = {}
+        self._incremental_hashes = {}
+        path = self._incremental_path()
+        if not os.path.isfile(path):
+            return
+        try:
+            with salt.utils.files.fopen(path, 'rb') as fp_:
+                self.incremental = msgpack_deserialize(fp_.read())
+        except Exception as exc:
+            log.warning('Unable to read the incremental state data in %s: %s', path, exc)
+
+    def save_incremental(self, chunks, running):
+        '''
+        Record the fingerprint and drift probe of each state which succeeded
+        in this run
+        '''
+        records = {}
+        for low in chunks:
+            tag = _gen_tag(low)
+            if not isinstance(running.get(tag), dict) or running[tag].get('result') is not True:
+                continue
+            record = self._incremental_record(low)
+            if record is not None:
+                records[tag] = record
+        path = self._incremental_path()
+        try:
+            with salt.utils.files.set_umask(0o077):
+                with salt.utils.files.fopen(path, 'w+b') as fp_:
+                    fp_.write(msgpack_serialize(records))
+        except (IOError, OSError) as exc:
+            log.error('Unable to write the incremental state data to %s: %s', path, exc)
+        self.incremental = None
+        self._incremental_hashes = {}
+
+    def _incremental_record(self, low):
+        '''
+        Return the fingerprint of the low chunk and the digest of its drift
+        probe, or None if the state can not be skipped
+        '''
+        if any(key in low for key in ('onlyif', 'unless', 'check_cmd', 'parallel')):
+            return None
+        if low.get('template'):
+            # Templates can import and include other files and call execution
+            # modules, none of which is covered by the fingerprint
+            return None
+        probe = '{0}.mod_drift_probe'.format(low['state'])
+        if probe not in self.states:
+            return None
+        try:
+            drift = self.states[probe](low)
+        except Exception as exc:
+            log.debug('Drift probe of %s failed: %s', _gen_tag(low), exc)
+            return None
+        if drift is None:
+            return None
+        data = dict(
+            (key, val) for key, val in six.iteritems(low)
+            if key not in ('order', '__prereq__', '__prerequired__', '__agg__'))
+        import salt.client.ssh.state
+        hashes = []
+        for saltenv, env_refs in six.iteritems(salt.client.ssh.state.lowstate_file_refs([low])):
+            for ref in [ref for chunk_refs in env_refs for ref in chunk_refs]:
+                if (ref, saltenv) not in self._incremental_hashes:
+                    self._incremental_hashes[(ref, saltenv)] = \
+                        self.functions['cp.hash_file'](ref, saltenv)
+                hashes.append([ref, saltenv, self._incremental_hashes[(ref, saltenv)]])
+        if any(key in low for key in ('contents_pillar', 'contents_grains')):
+            # The contents can come from any of the pillar and grains, but the
+            # pid grain is different in each run
+            grains = dict(self.opts.get('grains', {}))
+            grains.pop('pid', None)
+            hashes.append([self.opts.get('pillar', {}), grains])
+        dumps = lambda obj: salt.utils.json.dumps(obj, sort_keys=True, default=repr)
+        return {'fingerprint': salt.utils.hashutils.sha256_digest(dumps([data, hashes])),
+                'probe': salt.utils.hashutils.sha256_digest(dumps(drift))}
+
+    def incremental_unchanged(self, low):
+        '''
+        Return True if the state can be skipped because neither its rendered
+        arguments, the files it references nor the resource it manages changed
+        since the last run in which it succeeded
+        '''
+        if not self.incremental or low.get('__prereq__') or low.get('test') \
+                or low['fun'] == 'mod_watch':
+            return False
+        recorded = self.incremental.get(_gen_tag(low))
+        if not recorded:
+            return False
+        return self._incremental_record(low) == recorded
+
     def call_high(self, high, orchestration_jid=None):
         '''
         Process a high data call and ensure the defined states.
         '''
         errors = []
-        # If there is extension data reconcile it
-        high, ext_errors = self.reconcile_extend(high)
-        errors.extend(ext_errors)
-        errors.extend(self.verify_high(high))
+        with self.profiler.phase('verify_high'):
+            # If there is extension data reconcile it
+            high, ext_errors = self.reconcile_extend(high)
+            errors.extend(ext_errors)
+            errors.extend(self.verify_high(high))
         if errors:
             return errors
-        high, req_in_errors = self.requisite_in(high)
-        errors.extend(req_in_errors)
-        high = self.apply_exclude(high)
+        with self.profiler.phase('requisite_in'):
+            high, req_in_errors = self.requisite_in(high)
+            errors.extend(req_in_errors)
+            high = self.apply_exclude(high)
         # Verify that the high data is structurally sound
         if errors:
             return errors
         # Compile and verify the raw chunks
-        chunks = self.compile_high_data(high, orchestration_jid)
+        with self.profiler.phase('compile_high_data'):
+            chunks = self.compile_high_data(high, orchestration_jid)
 
         # If there are extensions in the highstate, process them and update
         # the low data chunks
         if errors:
             return errors
-        ret = self.call_chunks(chunks)
-        ret = self.call_listen(chunks, ret)
+        with self.profiler.phase('prefetch'):
+            prefetched = self.prefetch_file_refs(chunks)
+        try:
+            with self.profiler.phase('execute'):
+                ret = self.call_chunks(chunks)
+                ret = self.call_listen(chunks, ret)
+            if self.incremental is not None:
+                self.save_incremental(chunks, ret)
+        finally:
+            if prefetched:
+                self.functions['cp.clear_prefetch']()
 
         def _cleanup_accumulator_data():
             accum_data_path = os.path.join(
@@ -2926,6 +3400,7 @@ class BaseHighState(object):
         self.avail = self.__gather_avail()
         self.serial = salt.payload.Serial(self.opts)
         self.building_highstate = OrderedDict()
+        self.top_cache = salt.utils.topmatch.TopMatchCache(self.opts, 'state')
 
     def __gather_avail(self):
         '''
@@ -3005,6 +3480,22 @@ class BaseHighState(object):
             envs.extend([env for env in client_envs if env not in envs])
             return envs
 
+    def _compile_top(self, path, saltenv):
+        '''
+        Render a top file, or reuse its last rendering if top_match_cache is
+        set and it did not change
+        '''
+        return self.top_cache.compile_top(
+            path,
+            saltenv,
+            lambda: compile_template(
+                path,
+                self.state.rend,
+                self.state.opts['renderer'],
+                self.state.opts['renderer_blacklist'],
+                self.state.opts['renderer_whitelist'],
+                saltenv=saltenv))
+
     def get_tops(self):
         '''
         Gather the top files
@@ -3030,14 +3521,7 @@ class BaseHighState(object):
             if contents:
                 found = 1
                 tops[self.opts['saltenv']] = [
-                    compile_template(
-                        contents,
-                        self.state.rend,
-                        self.state.opts['renderer'],
-                        self.state.opts['renderer_blacklist'],
-                        self.state.opts['renderer_whitelist'],
-                        saltenv=self.opts['saltenv']
-                    )
+                    self._compile_top(contents, self.opts['saltenv'])
                 ]
             else:
                 tops[self.opts['saltenv']] = [{}]
@@ -3057,16 +3541,7 @@ class BaseHighState(object):
                 )
                 if contents:
                     found = found + 1
-                    tops[saltenv].append(
-                        compile_template(
-                            contents,
-                            self.state.rend,
-                            self.state.opts['renderer'],
-                            self.state.opts['renderer_blacklist'],
-                            self.state.opts['renderer_whitelist'],
-                            saltenv=saltenv
-                        )
-                    )
+                    tops[saltenv].append(self._compile_top(contents, saltenv))
                 else:
                     tops[saltenv].append({})
                     log.debug('No contents loaded for saltenv \'%s\'', saltenv)
@@ -3109,15 +3584,11 @@ class BaseHighState(object):
                         if sls in done[saltenv]:
                             continue
                         tops[saltenv].append(
-                            compile_template(
+                            self._compile_top(
                                 self.client.get_state(
                                     sls,
                                     saltenv
                                 ).get('dest', False),
-                                self.state.rend,
-                                self.state.opts['renderer'],
-                                self.state.opts['renderer_blacklist'],
-                                self.state.opts['renderer_whitelist'],
                                 saltenv
                             )
                         )
@@ -3355,11 +3826,13 @@ class BaseHighState(object):
         Returns the high data derived from the top file
         '''
         try:
-            tops = self.get_tops()
+            with self.state.profiler.phase('get_tops'):
+                tops = self.get_tops()
         except SaltRenderError as err:
             log.error('Unable to render top file: %s', err.error)
             return {}
-        return self.merge_tops(tops)
+        with self.state.profiler.phase('merge_tops'):
+            return self.merge_tops(tops)
 
     def top_matches(self, top):
         '''
@@ -3401,6 +3874,7 @@ class BaseHighState(object):
                                     matches[env_key] = []
                                 matches[env_key].append(inc_sls)
                 _filter_matches(match, data, self.opts['nodegroups'])
+        self.top_cache.save()
         ext_matches = self._master_tops()
         for saltenv in ext_matches:
             top_file_matches = matches.get(saltenv, [])
@@ -3440,6 +3914,10 @@ class BaseHighState(object):
         '''
         Render a state file and retrieve all of the include states
         '''
+        with self.state.profiler.phase('sls {0}:{1}'.format(saltenv, sls)):
+            return self._render_state(sls, saltenv, mods, matches, local)
+
+    def _render_state(self, sls, saltenv, mods, matches, local=False):
         errors = []
         if not local:
             state_data = self.client.get_state(sls, saltenv)
@@ -3765,6 +4243,10 @@ class BaseHighState(object):
         Gather the state files and render them into a single unified salt
         high data structure.
         '''
+        with self.state.profiler.phase('render'):
+            return self._render_highstate(matches)
+
+    def _render_highstate(self, matches):
         highstate = self.building_highstate
         all_errors = []
         mods = set()
@@ -3900,7 +4382,8 @@ class BaseHighState(object):
         # File exists so continue
         err = []
         try:
-            top = self.get_top()
+            with self.state.profiler.phase('top'):
+                top = self.get_top()
         except SaltRenderError as err:
             ret[tag_name]['comment'] = 'Unable to render top file: '
             ret[tag_name]['comment'] += six.text_type(err.error)
@@ -3917,7 +4400,8 @@ class BaseHighState(object):
             ret[tag_name]['comment'] = msg
             return ret
         matches = self.matches_whitelist(matches, whitelist)
-        self.load_dynamic(matches)
+        with self.state.profiler.phase('load_dynamic'):
+            self.load_dynamic(matches)
         if not self._check_pillar(force):
             err += ['Pillar failed to render with the following messages:']
             err += self.state.opts['pillar']['_errors']
@@ -3952,6 +4436,8 @@ class BaseHighState(object):
             except (IOError, OSError):
                 log.error('Unable to write to "state.highstate" cache file %s', cfn)
 
+        if self.opts.get('state_incremental', False) and not self.opts.get('test', False):
+            self.state.load_incremental()
         return self.state.call_high(high, orchestration_jid)
 
     def compile_highstate(self):
@@ -4069,6 +4555,7 @@ class HighState(BaseHighState):
                            loader=loader,
                            initial_pillar=initial_pillar)
         self.matcher = salt.minion.Matcher(self.opts)
+        self.matcher.top_cache = self.top_cache
         self.proxy = proxy
 
         # tracks all pydsl state declarations globally across sls files
@@ -312,6 +312,8 @@ log = logging.getLogger(__name__)
 
 COMMENT_REGEX = r'^([[:space:]]*){0}[[:space:]]?'
 __NOT_FOUND = object()
+# The number of files file.recurse asks the master about with one request
+_PREFETCH_CHUNK_SIZE = 100
 
 __func_alias__ = {
     'copy_': 'copy',
@@ -3777,8 +3779,27 @@ def recurse(name,
         merge_ret(os.path.join(name, srelpath), _ret)
     for dirname in mng_dirs:
         manage_directory(dirname)
-    for dest, src in mng_files:
-        manage_file(dest, src, replace)
+    # Ask the master about many files at once instead of once per file, only
+    # downloading the ones which differ from their destination
+    mng_files = list(mng_files)
+    for idx in range(0, len(mng_files), _PREFETCH_CHUNK_SIZE):
+        chunk = mng_files[idx:idx + _PREFETCH_CHUNK_SIZE]
+        prefetched = False
+        if 'cp.prefetch_files' in __salt__:
+            try:
+                __salt__['cp.prefetch_files'](
+                    [src for _, src in chunk],
+                    __env__,
+                    dests=dict((src, dest) for dest, src in chunk))
+                prefetched = True
+            except Exception as exc:
+                log.debug('Failed to prefetch the files of %s: %s', name, exc)
+        try:
+            for dest, src in chunk:
+                manage_file(dest, src, replace)
+        finally:
+            if prefetched:
+                __salt__['cp.clear_prefetch']()
 
     if clean:
         # TODO: Use directory(clean=True) instead
@@ -6883,6 +6904,43 @@ def mknod(name, ntype, major=0, minor=0, user=None, group=None, mode='0600'):
     return ret
 
 
+def mod_drift_probe(low):
+    '''
+    Return the stat and the hash of the file of a ``file.managed`` state, so
+    an incremental highstate (see :conf_minion:`state_incremental`) skips
+    the state as long as neither the file nor the arguments of the state
+    changed. The hashes of local source files are part of the probe. States
+    with sources on other servers are never skipped, their contents can change
+    without the state changing.
+    '''
+    if low.get('fun') != 'managed':
+        return None
+    sources = low.get('source') or []
+    if not isinstance(sources, list):
+        sources = [sources]
+    local_sources = []
+    for source in sources:
+        if isinstance(source, dict):
+            source = next(iter(source))
+        if not isinstance(source, six.string_types):
+            return None
+        if source.startswith('salt://'):
+            # Hashed into the fingerprint of the state
+            continue
+        if not os.path.isabs(source):
+            return None
+        local_sources.append(source)
+    name = os.path.expanduser(low['name'])
+    try:
+        stat = os.stat(name)
+        local_hashes = [salt.utils.hashutils.get_hash(source)
+                        for source in local_sources]
+    except (IOError, OSError):
+        return None
+    return [stat.st_mtime, stat.st_size, stat.st_mode, stat.st_uid,
+            stat.st_gid, salt.utils.hashutils.get_hash(name), local_hashes]
+
+
 def mod_run_check_cmd(cmd, filename, **check_cmd_opts):
     '''
     Execute the check_cmd logic.
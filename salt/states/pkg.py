@@ -145,6 +145,16 @@ if salt.utils.platform.is_windows():
 
 log = logging.getLogger(__name__)
 
+# The databases of the package managers, they change whenever packages are
+# installed, upgraded or removed
+_PKG_DATABASES = (
+    '/var/lib/dpkg/status',
+    '/var/lib/rpm/Packages',
+    '/var/lib/rpm/rpmdb.sqlite',
+    '/var/lib/pacman/local',
+    '/var/db/pkg',
+)
+
 
 def __virtual__():
     '''
@@ -3214,10 +3224,73 @@ def mod_init(low):
     return False
 
 
+# Arguments which make a pkg state conditional, such states are never merged
+# into the transaction of another
+_AGG_CONDITIONAL = (
+    'onlyif',
+    'unless',
+    'check_cmd',
+    'parallel',
+    'prereq',
+    'prerequired',
+    '__prereq__',
+    'onchanges',
+    'onchanges_any',
+    'onfail',
+    'onfail_any',
+)
+
+
+def _agg_ready(chunk, index, running):
+    '''
+    Return True if the requisites of a chunk are all done and succeeded, so
+    that it can be merged into a transaction run before its turn. Without the
+    RequisiteIndex of the chunks, only the chunks without requisites are.
+    '''
+    if any(chunk.get(key) for key in _AGG_CONDITIONAL):
+        return False
+    for req_type in ('require', 'require_any', 'watch', 'watch_any'):
+        found = []
+        for req in chunk.get(req_type) or []:
+            if isinstance(req, six.string_types):
+                req = {'id': req}
+            if not isinstance(req, dict) or len(req) != 1:
+                return False
+            req_key, req_val = next(iter(six.iteritems(req)))
+            if index is None or not isinstance(req_val, six.string_types):
+                return False
+            matches = index.find(req_key, req_val)
+            if not matches:
+                return False
+            found.extend(matches)
+        results = []
+        for req_chunk in found:
+            tag = __utils__['state.gen_tag'](req_chunk)
+            if tag not in running or 'proc' in running[tag]:
+                return False
+            results.append(running[tag].get('result') is not False)
+        if not results:
+            continue
+        if req_type.endswith('_any'):
+            if not any(results):
+                return False
+        elif not all(results):
+            return False
+    return True
+
+
 def mod_aggregate(low, chunks, running):
     '''
     The mod_aggregate function which looks up all packages in the available
     low chunks and merges them into a single pkgs ref in the present low data
+
+    Only the chunks whose requisites are all done and succeeded are merged, as
+    installing their packages with this transaction is then equivalent to
+    installing them on their turn. Chunks which are conditional, on
+    ``onlyif``, ``unless``, ``onchanges``, ``onfail`` or ``prereq``, are
+    left alone. The merged chunks still run on their turn, but find their
+    packages in the package database snapshot kept by the pkg module, which
+    is updated by the transaction.
     '''
     pkgs = []
     pkg_type = None
@@ -3229,6 +3302,11 @@ def mod_aggregate(low, chunks, running):
     ]
     if low.get('fun') not in agg_enabled:
         return low
+    # The RequisiteIndex of the chunks, set by the state system
+    index = __context__.get('state.requisite_index')
+    if index is not None and not index.current(chunks):
+        index = None
+    low_tag = __utils__['state.gen_tag'](low)
     for chunk in chunks:
         tag = __utils__['state.gen_tag'](chunk)
         if tag in running:
@@ -3243,6 +3321,9 @@ def mod_aggregate(low, chunks, running):
             # Check for the same repo
             if chunk.get('fromrepo') != low.get('fromrepo'):
                 continue
+            # The present chunk is checked by the state system itself
+            if tag != low_tag and not _agg_ready(chunk, index, running):
+                continue
             # Check first if 'sources' was passed so we don't aggregate pkgs
             # and sources together.
             if 'sources' in chunk:
@@ -3274,6 +3355,25 @@ def mod_aggregate(low, chunks, running):
     return low
 
 
+def mod_drift_probe(low):
+    '''
+    Return the modification times of the package databases for a
+    ``pkg.installed`` state. As long as they do not change, the packages it
+    installed are still installed, and the state is skipped by an incremental
+    highstate (see :conf_minion:`state_incremental`).
+    '''
+    if low.get('fun') != 'installed':
+        return None
+    probe = []
+    for path in _PKG_DATABASES:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        probe.append([path, stat.st_mtime, stat.st_size])
+    return probe or None
+
+
 def mod_watch(name, **kwargs):
     '''
     Install/reinstall a package based on a watch requisite
@@ -14,4 +14,10 @@
 
     :list_tokens: list all tokens in storage
 
+    A store may also implement:
+
+    :rm_expired: remove all the expired tokens from storage, instead of the
+        master maintenance process listing and fetching every token to find
+        them
+
 '''
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+'''
+Stores eauth tokens in an SQLite database on the master
+
+.. versionadded:: Fluorine
+
+The tokens are stored in the ``tokens.db`` database in the directory configured
+by the master config option ``token_dir``, indexed by token and by expiry time.
+Looking up a token is an indexed query instead of opening a file per token,
+and the expired tokens are removed in bulk by the master maintenance process.
+
+To use it, set in the master config:
+
+.. code-block:: yaml
+
+    eauth_tokens: sqlite
+
+The tokens recently looked up are also kept in memory by each master process.
+Since a token removed by one process may still be found in the memory of
+another one for a while, the tokens are only kept for a few seconds. Default
+values for these configs are as follow:
+
+.. code-block:: yaml
+
+    # The max number of tokens kept in memory
+    eauth_sqlite_cache_size: 1000
+    # The number of seconds a token is kept in memory, 0 to disable
+    eauth_sqlite_cache_ttl: 10
+'''
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import salt.payload
+import salt.utils.files
+from salt.utils.odict import OrderedDict
+
+from salt.ext import six
+
+log = logging.getLogger(__name__)
+
+__virtualname__ = 'sqlite'
+
+# The connections of the current thread, by database path
+_CONNECTIONS = threading.local()
+
+# (database path, token) -> (time cached, token data), oldest first
+_CACHE = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+
+def __virtual__():
+    return __virtualname__
+
+
+def _db_path(opts):
+    return os.path.join(opts['token_dir'], 'tokens.db')
+
+
+def _conn(opts):
+    '''
+    Return the connection of the current thread and process to the database,
+    creating the database if needed
+    '''
+    path = _db_path(opts)
+    conns = getattr(_CONNECTIONS, 'conns', None)
+    if conns is None or _CONNECTIONS.pid != os.getpid():
+        conns = _CONNECTIONS.conns = {}
+        _CONNECTIONS.pid = os.getpid()
+    if path not in conns:
+        if not os.path.isdir(opts['token_dir']):
+            os.makedirs(opts['token_dir'])
+        with salt.utils.files.set_umask(0o177):
+            con = sqlite3.connect(path, timeout=30)
+        with con:
+            con.execute('CREATE TABLE IF NOT EXISTS tokens '
+                        '(token TEXT PRIMARY KEY, expire REAL, data BLOB)')
+            con.execute('CREATE INDEX IF NOT EXISTS tokens_expire '
+                        'ON tokens (expire)')
+        conns[path] = con
+    return conns[path]
+
+
+def _cache_get(opts, tok):
+    ttl = opts.get('eauth_sqlite_cache_ttl', 10)
+    if not ttl:
+        return None
+    key = (_db_path(opts), tok)
+    with _CACHE_LOCK:
+        entry = _CACHE.get(key)
+        if entry is None:
+            return None
+        if entry[0] + ttl < time.time():
+            del _CACHE[key]
+            return None
+    return dict(entry[1])
+
+
+def _cache_set(opts, tok, tdata):
+    if not opts.get('eauth_sqlite_cache_ttl', 10):
+        return
+    key = (_db_path(opts), tok)
+    with _CACHE_LOCK:
+        _CACHE.pop(key, None)
+        _CACHE[key] = (time.time(), dict(tdata))
+        while len(_CACHE) > opts.get('eauth_sqlite_cache_size', 1000):
+            _CACHE.popitem(last=False)
+
+
+def _cache_pop(opts, tok):
+    with _CACHE_LOCK:
+        _CACHE.pop((_db_path(opts), tok), None)
+
+
+def mk_token(opts, tdata):
+    '''
+    Mint a new token using the config option hash_type and store tdata with 'token' attribute set
+    to the token.
+    This module uses the hash of random 512 bytes as a token.
+
+    :param opts: Salt master config options
+    :param tdata: Token data to be stored with 'token' attirbute of this dict set to the token.
+    :returns: tdata with token if successful. Empty dict if failed.
+    '''
+    hash_type = getattr(hashlib, opts.get('hash_type', 'md5'))
+    serial = salt.payload.Serial(opts)
+    try:
+        con = _conn(opts)
+        while True:
+            tok = six.text_type(hash_type(os.urandom(512)).hexdigest())
+            tdata['token'] = tok
+            try:
+                with con:
+                    con.execute(
+                        'INSERT INTO tokens (token, expire, data) VALUES (?, ?, ?)',
+                        (tok, tdata.get('expire'), sqlite3.Binary(serial.dumps(tdata))))
+                break
+            except sqlite3.IntegrityError:
+                # The token already exists
+                continue
+    except (sqlite3.Error, IOError, OSError) as err:
+        log.warning(
+            'Authentication failure: cannot save token to %s: %s',
+            _db_path(opts), err
+        )
+        return {}
+    return tdata
+
+
+def get_token(opts, tok):
+    '''
+    Fetch the token data from the store.
+
+    :param opts: Salt master config options
+    :param tok: Token value to get
+    :returns: Token data if successful. Empty dict if failed.
+    '''
+    tdata = _cache_get(opts, tok)
+    if tdata is not None:
+        return tdata
+    try:
+        row = _conn(opts).execute(
+            'SELECT data FROM tokens WHERE token = ?', (tok,)).fetchone()
+    except (sqlite3.Error, IOError, OSError) as err:
+        log.warning(
+            'Authentication failure: cannot get token %s from %s: %s',
+            tok, _db_path(opts), err
+        )
+        return {}
+    if row is None:
+        return {}
+    tdata = salt.payload.Serial(opts).loads(bytes(row[0]))
+    _cache_set(opts, tok, tdata)
+    return tdata
+
+
+def rm_token(opts, tok):
+    '''
+    Remove token from the store.
+
+    :param opts: Salt master config options
+    :param tok: Token to remove
+    :returns: Empty dict if successful. None if failed.
+    '''
+    _cache_pop(opts, tok)
+    try:
+        con = _conn(opts)
+        with con:
+            con.execute('DELETE FROM tokens WHERE token = ?', (tok,))
+        return {}
+    except (sqlite3.Error, IOError, OSError) as err:
+        log.warning('Could not remove token %s: %s', tok, err)
+
+
+def list_tokens(opts):
+    '''
+    List all tokens in the store.
+
+    :param opts: Salt master config options
+    :returns: List of dicts (tokens)
+    '''
+    try:
+        return [row[0] for row in _conn(opts).execute('SELECT token FROM tokens')]
+    except (sqlite3.Error, IOError, OSError) as err:
+        log.warning('Failed to list tokens: %s', err)
+        return []
+
+
+def rm_expired(opts):
+    '''
+    Remove the expired tokens from the store.
+
+    :param opts: Salt master config options
+    :returns: The number of tokens removed. None if failed.
+    '''
+    now = time.time()
+    with _CACHE_LOCK:
+        for key, entry in list(_CACHE.items()):
+            if entry[1].get('expire', 0) < now:
+                del _CACHE[key]
+    try:
+        con = _conn(opts)
+        with con:
+            return con.execute(
+                'DELETE FROM tokens WHERE expire IS NULL OR expire < ?',
+                (now,)).rowcount
+    except (sqlite3.Error, IOError, OSError) as err:
+        log.warning('Could not remove the expired tokens: %s', err)
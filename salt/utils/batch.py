@@ -0,0 +1,426 @@
+# -*- coding: utf-8 -*-
+'''
+Run batch jobs on the master
+
+.. versionadded:: Fluorine
+
+When ``batch_master`` is set in the master config, a publication carrying a
+``batch`` kwarg is not sent to all the targeted minions at once. The master
+worker resolves the target, leaves out the minions which are not connected,
+saves the batch in ``<cachedir>/batch/<jid>.p`` and fires
+``salt/batch/<jid>/new``. The :py:class:`BatchManager` process then publishes
+the job to a few minions at a time under this same jid, starting the next ones
+as the returns arrive. The job cache and the ``salt/job/<jid>/ret/<minion>``
+events therefore hold the returns of the whole batch, for any number of
+clients to read, and the batch goes on when the client which started it
+disconnects. The progress is saved as the batch runs, so that a batch resumes
+where it was when the master restarts.
+
+The batch itself fires the following events:
+
+``salt/batch/<jid>/start``
+    The minions run by the batch and the ones left out for being down.
+
+``salt/batch/<jid>/next``
+    The minions the job was just published to.
+
+``salt/batch/<jid>/done``
+    The minions which returned, failed, or did not return in time.
+'''
+
+# Import python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import logging
+import math
+import os
+import time
+
+# Import salt libs
+import salt.payload
+import salt.transport.server
+import salt.utils.atomicfile
+import salt.utils.event
+import salt.utils.files
+import salt.utils.jid
+import salt.utils.process
+from salt.transport import iter_transport_opts
+from salt.ext import six
+
+# Import 3rd-party libs
+import tornado.ioloop
+
+log = logging.getLogger(__name__)
+
+
+def get_bnum(batch, count):
+    '''
+    Return the number of minions to run at a time for a batch of ``count``
+    minions, ``batch`` being either a number of minions or a percentage.
+    Raise ValueError if ``batch`` is invalid.
+    '''
+    batch = six.text_type(batch)
+    if '%' in batch:
+        res = float(batch.strip('%')) / 100.0 * count
+        if res < 1:
+            return int(math.ceil(res))
+        return int(res)
+    return int(batch)
+
+
+def batch_dir(opts):
+    return os.path.join(opts['cachedir'], 'batch')
+
+
+def batch_path(opts, jid):
+    return os.path.join(batch_dir(opts), '{0}.p'.format(jid))
+
+
+def save_batch(opts, data):
+    '''
+    Write the state of a batch
+    '''
+    path = batch_path(opts, data['jid'])
+    if not os.path.isdir(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    with salt.utils.files.set_umask(0o177):
+        with salt.utils.atomicfile.atomic_open(path, 'wb') as fp_:
+            salt.payload.Serial(opts).dump(data, fp_)
+
+
+def load_batch(opts, jid):
+    '''
+    Read the state of a batch, return None if there is none
+    '''
+    try:
+        with salt.utils.files.fopen(batch_path(opts, jid), 'rb') as fp_:
+            return salt.payload.Serial(opts).load(fp_)
+    except (IOError, OSError):
+        return None
+    except Exception as exc:
+        log.error('Unable to read the batch %s: %s', jid, exc)
+        return None
+
+
+def new_batch(opts, load, minions, extra, present=None):
+    '''
+    Save a new batch of the publication ``load`` on ``minions``, ``present``
+    being the minions known to be connected, if this is known. Return the
+    state of the batch. Raise ValueError if the batch kwargs are invalid.
+    '''
+    if present:
+        run = [minion for minion in minions if minion in present]
+        down = [minion for minion in minions if minion not in present]
+    else:
+        run, down = list(minions), []
+    size = get_bnum(extra['batch'], len(run))
+    if size < 1:
+        raise ValueError('Invalid batch size {0}'.format(extra['batch']))
+    data = {
+        'jid': load['jid'],
+        'load': load,
+        'size': size,
+        'batch_wait': float(extra.get('batch_wait') or 0),
+        'failhard': bool(extra.get('failhard', False)),
+        'timeout': float(extra.get('batch_timeout') or opts['timeout']),
+        'gather_job_timeout': float(extra.get('gather_job_timeout') or opts['gather_job_timeout']),
+        'minions': run,
+        'down': down,
+        'pending': list(run),
+        # minion -> time at which to check if the job still runs
+        'active': {},
+        # minion -> time at which the minion is timed out if it did not
+        # answer the find_job
+        'checking': {},
+        # times at which the slots held by batch_wait are released
+        'wait': [],
+        'returned': [],
+        'failed': [],
+        'timedout': [],
+        'stopped': False,
+    }
+    save_batch(opts, data)
+    return data
+
+
+class BatchJob(object):
+    '''
+    The state of a batch, which knows which minions to run next
+    '''
+    def __init__(self, data):
+        self.data = data
+        self.jid = data['jid']
+        self.dirty = False
+
+    @property
+    def done(self):
+        return not self.data['active'] and \
+            (not self.data['pending'] or self.data['stopped'])
+
+    def _release(self, minion, now):
+        self.data['active'].pop(minion, None)
+        self.data['checking'].pop(minion, None)
+        if self.data['batch_wait']:
+            self.data['wait'].append(now + self.data['batch_wait'])
+        self.dirty = True
+
+    def resume(self):
+        '''
+        Forget the find_job checks of a batch loaded from disk, their returns
+        have been missed
+        '''
+        self.data['checking'] = {}
+
+    def next_minions(self, now):
+        '''
+        Return the minions to start now
+        '''
+        data = self.data
+        data['wait'] = [release for release in data['wait'] if release > now]
+        if data['stopped']:
+            return []
+        slots = data['size'] - len(data['active']) - len(data['wait'])
+        if slots <= 0 or not data['pending']:
+            return []
+        minions, data['pending'] = data['pending'][:slots], data['pending'][slots:]
+        for minion in minions:
+            data['active'][minion] = now + data['timeout']
+        self.dirty = True
+        return minions
+
+    def to_check(self, now):
+        '''
+        Return the minions which did not return before the timeout, whose
+        job has to be looked for
+        '''
+        data = self.data
+        minions = [minion for minion, deadline in six.iteritems(data['active'])
+                   if deadline <= now and minion not in data['checking']]
+        for minion in minions:
+            data['checking'][minion] = now + data['gather_job_timeout']
+        if minions:
+            self.dirty = True
+        return minions
+
+    def timed_out(self, now):
+        '''
+        Time out the minions which did not answer the find_job in time
+        '''
+        minions = [minion for minion, deadline in six.iteritems(self.data['checking'])
+                   if deadline <= now]
+        for minion in minions:
+            self.data['timedout'].append(minion)
+            self._release(minion, now)
+        return minions
+
+    def returned(self, minion, load, now):
+        '''
+        Record the return of a minion
+        '''
+        data = self.data
+        if minion not in data['active']:
+            return
+        data['returned'].append(minion)
+        retcode = load.get('retcode', 0)
+        if retcode or load.get('success') is False:
+            data['failed'].append(minion)
+            if data['failhard']:
+                log.error(
+                    'Minion %s returned with non-zero exit code. '
+                    'Batch run stopped due to failhard', minion
+                )
+                data['stopped'] = True
+        self._release(minion, now)
+
+    def found_job(self, minion, ret, now):
+        '''
+        Record the answer of a minion to the find_job
+        '''
+        data = self.data
+        if minion not in data['checking']:
+            return
+        if ret:
+            # Still running, check again after another timeout
+            del data['checking'][minion]
+            data['active'][minion] = now + data['timeout']
+            self.dirty = True
+        else:
+            # The job is gone without its return
+            data['timedout'].append(minion)
+            self._release(minion, now)
+
+    def summary(self):
+        data = self.data
+        return {
+            'minions': data['minions'],
+            'down': data['down'],
+            'returned': data['returned'],
+            'failed': data['failed'],
+            'timedout': data['timedout'],
+            'not_run': data['pending'],
+        }
+
+
+class BatchManager(salt.utils.process.SignalHandlingMultiprocessingProcess):
+    '''
+    The master process running the batches saved by the master workers
+    '''
+    def __init__(self, opts, **kwargs):
+        super(BatchManager, self).__init__(**kwargs)
+        self.opts = opts
+        # batch jid -> BatchJob
+        self.batches = {}
+        # find_job jid -> (batch jid, time to forget it)
+        self.find_jobs = {}
+
+    # __setstate__ and __getstate__ are only used on Windows.
+    # We do this so that __init__ will be invoked on Windows in the child
+    # process so that a register_after_fork() equivalent will work on Windows.
+    def __setstate__(self, state):
+        self._is_child = True
+        self.__init__(
+            state['opts'],
+            log_queue=state['log_queue'],
+            log_queue_level=state['log_queue_level']
+        )
+
+    def __getstate__(self):
+        return {'opts': self.opts,
+                'log_queue': self.log_queue,
+                'log_queue_level': self.log_queue_level}
+
+    def run(self):
+        '''
+        Resume the saved batches and run the batches as they are started
+        '''
+        salt.utils.process.appendproctitle(self.__class__.__name__)
+        self.io_loop = tornado.ioloop.IOLoop()
+        self.io_loop.make_current()
+        self.event = salt.utils.event.get_master_event(
+            self.opts, self.opts['sock_dir'], listen=True, io_loop=self.io_loop)
+        self.event.set_event_handler(self.handle_event)
+        self.resume()
+        tornado.ioloop.PeriodicCallback(self.tick, 1000).start()
+        try:
+            self.io_loop.start()
+        except (KeyboardInterrupt, SystemExit):
+            pass
+
+    def resume(self):
+        try:
+            names = os.listdir(batch_dir(self.opts))
+        except OSError:
+            return
+        for name in names:
+            if name.endswith('.p'):
+                self.add(name[:-2], resume=True)
+
+    def add(self, jid, resume=False):
+        '''
+        Start running the batch saved under ``jid``
+        '''
+        if jid in self.batches or os.path.basename(jid) != jid:
+            return
+        data = load_batch(self.opts, jid)
+        if data is None:
+            return
+        batch = BatchJob(data)
+        if resume:
+            log.info('Resuming the batch %s', jid)
+            batch.resume()
+        else:
+            self.event.fire_event(
+                {'minions': data['minions'], 'down': data['down'], 'size': data['size']},
+                salt.utils.event.tagify([jid, 'start'], 'batch'))
+        self.batches[jid] = batch
+        self.run_batch(batch, time.time())
+
+    def publish(self, load):
+        for transport, opts in iter_transport_opts(self.opts):
+            chan = salt.transport.server.PubServerChannel.factory(opts)
+            chan.publish(load)
+
+    def publish_minions(self, batch, minions):
+        load = dict(batch.data['load'])
+        load.pop('delimiter', None)
+        load['tgt'] = minions
+        load['tgt_type'] = 'list'
+        self.publish(load)
+        self.event.fire_event(
+            {'minions': minions}, salt.utils.event.tagify([batch.jid, 'next'], 'batch'))
+
+    def find_job(self, batch, minions, now):
+        fjid = salt.utils.jid.gen_jid(self.opts)
+        template = batch.data['load']
+        load = {'fun': 'saltutil.find_job',
+                'arg': [batch.jid],
+                'tgt': minions,
+                'tgt_type': 'list',
+                'jid': fjid,
+                'ret': ''}
+        for key in ('user', 'master_id'):
+            if key in template:
+                load[key] = template[key]
+        self.find_jobs[fjid] = (batch.jid, now + 2 * batch.data['gather_job_timeout'])
+        self.publish(load)
+
+    def run_batch(self, batch, now):
+        '''
+        Start the next minions of a batch, look for the jobs which did not
+        return in time, and finish the batch when all the minions are done
+        '''
+        batch.timed_out(now)
+        check = batch.to_check(now)
+        if check:
+            self.find_job(batch, check, now)
+        minions = batch.next_minions(now)
+        if minions:
+            self.publish_minions(batch, minions)
+        if batch.done:
+            del self.batches[batch.jid]
+            self.event.fire_event(
+                batch.summary(), salt.utils.event.tagify([batch.jid, 'done'], 'batch'))
+            try:
+                os.remove(batch_path(self.opts, batch.jid))
+            except OSError:
+                pass
+        elif batch.dirty:
+            try:
+                save_batch(self.opts, batch.data)
+                batch.dirty = False
+            except (IOError, OSError) as exc:
+                log.error('Unable to save the batch %s: %s', batch.jid, exc)
+
+    def tick(self):
+        now = time.time()
+        for batch in list(self.batches.values()):
+            self.run_batch(batch, now)
+        for fjid, (_, forget) in list(self.find_jobs.items()):
+            if forget <= now:
+                del self.find_jobs[fjid]
+
+    def handle_event(self, raw):
+        '''
+        Only the events of the running batches are unpacked
+        '''
+        mtag, mdata = salt.utils.event.SaltEvent.unpack_tag(raw)
+        parts = mtag.split('/')
+        if len(parts) == 4 and parts[:2] == ['salt', 'batch'] and parts[3] == 'new':
+            # The event only says where to look, anyone can fire it
+            self.add(parts[2])
+            return
+        if len(parts) != 5 or parts[:2] != ['salt', 'job'] or parts[3] != 'ret':
+            return
+        jid, minion = parts[2], parts[4]
+        if jid in self.batches:
+            batch = self.batches[jid]
+            data = self.event.serial.loads(mdata, encoding='utf-8')
+            batch.returned(minion, data, time.time())
+        elif jid in self.find_jobs:
+            batch = self.batches.get(self.find_jobs[jid][0])
+            if batch is None:
+                return
+            data = self.event.serial.loads(mdata, encoding='utf-8')
+            batch.found_job(minion, data.get('return'), time.time())
+        else:
+            return
+        self.run_batch(batch, time.time())
@@ -27,6 +27,59 @@ from salt.ext.six.moves import range  # pylint: disable=redefined-builtin
 
 log = logging.getLogger(__name__)
 
+# Leaf types which decode() and encode() never convert. Values of these types,
+# and values which are already of the target string type, are checked for
+# first, which spares the conversion attempt (and the TypeError it raises for
+# every number and None) and the costlier container checks on every leaf.
+_PLAIN_TYPES = six.integer_types + (float, type(None))
+_ENCODED_TYPES = _PLAIN_TYPES + (bytes,)
+
+
+def _decoded_types(normalize, to_str):
+    '''
+    Return the types of the values which decode() hands back as they are
+    '''
+    if normalize:
+        return _PLAIN_TYPES
+    return _PLAIN_TYPES + ((str,) if to_str else (six.text_type,))
+
+
+def _decode_scalar(data, encoding, errors, keep, normalize, to_str):
+    '''
+    Decode a single non-container value for decode()
+    '''
+    _decode_func = salt.utils.stringutils.to_unicode \
+        if not to_str \
+        else salt.utils.stringutils.to_str
+    try:
+        data = _decode_func(data, encoding, errors, normalize)
+    except TypeError:
+        # to_unicode raises a TypeError when input is not a
+        # string/bytestring/bytearray. This is expected and simply means we
+        # are going to leave the value as-is.
+        pass
+    except UnicodeDecodeError:
+        if not keep:
+            raise
+    return data
+
+
+def _encode_scalar(data, encoding, errors, keep):
+    '''
+    Encode a single non-container value for encode()
+    '''
+    try:
+        return salt.utils.stringutils.to_bytes(data, encoding, errors)
+    except TypeError:
+        # to_bytes raises a TypeError when input is not a
+        # string/bytestring/bytearray. This is expected and simply
+        # means we are going to leave the value as-is.
+        pass
+    except UnicodeEncodeError:
+        if not keep:
+            raise
+    return data
+
 
 @jinja_filter('compare_dicts')
 def compare_dicts(old=None, new=None):
@@ -97,10 +150,9 @@ def decode(data, encoding=None, errors='strict', keep=False,
     for the base character, and one for the breve mark). Normalizing allows for
     a more reliable test case.
     '''
-    _decode_func = salt.utils.stringutils.to_unicode \
-        if not to_str \
-        else salt.utils.stringutils.to_str
-    if isinstance(data, collections.Mapping):
+    if isinstance(data, _decoded_types(normalize, to_str)):
+        return data
+    elif isinstance(data, collections.Mapping):
         return decode_dict(data, encoding, errors, keep, normalize,
                            preserve_dict_class, preserve_tuples, to_str)
     elif isinstance(data, list):
@@ -113,17 +165,7 @@ def decode(data, encoding=None, errors='strict', keep=False,
             else decode_list(data, encoding, errors, keep, normalize,
                              preserve_dict_class, preserve_tuples, to_str)
     else:
-        try:
-            data = _decode_func(data, encoding, errors, normalize)
-        except TypeError:
-            # to_unicode raises a TypeError when input is not a
-            # string/bytestring/bytearray. This is expected and simply means we
-            # are going to leave the value as-is.
-            pass
-        except UnicodeDecodeError:
-            if not keep:
-                raise
-        return data
+        return _decode_scalar(data, encoding, errors, keep, normalize, to_str)
 
 
 def decode_dict(data, encoding=None, errors='strict', keep=False,
@@ -133,31 +175,25 @@ def decode_dict(data, encoding=None, errors='strict', keep=False,
     Decode all string values to Unicode. Optionally use to_str=True to ensure
     strings are str types and not unicode on Python 2.
     '''
-    _decode_func = salt.utils.stringutils.to_unicode \
-        if not to_str \
-        else salt.utils.stringutils.to_str
+    decoded_types = _decoded_types(normalize, to_str)
     # Make sure we preserve OrderedDicts
     rv = data.__class__() if preserve_dict_class else {}
     for key, value in six.iteritems(data):
-        if isinstance(key, tuple):
+        if isinstance(key, decoded_types):
+            pass
+        elif isinstance(key, tuple):
             key = decode_tuple(key, encoding, errors, keep, normalize,
                                preserve_dict_class, to_str) \
                 if preserve_tuples \
                 else decode_list(key, encoding, errors, keep, normalize,
                                  preserve_dict_class, preserve_tuples, to_str)
         else:
-            try:
-                key = _decode_func(key, encoding, errors, normalize)
-            except TypeError:
-                # to_unicode raises a TypeError when input is not a
-                # string/bytestring/bytearray. This is expected and simply
-                # means we are going to leave the value as-is.
-                pass
-            except UnicodeDecodeError:
-                if not keep:
-                    raise
-
-        if isinstance(value, list):
+            key = _decode_scalar(key, encoding, errors, keep, normalize,
+                                 to_str)
+
+        if isinstance(value, decoded_types):
+            pass
+        elif isinstance(value, list):
             value = decode_list(value, encoding, errors, keep, normalize,
                                 preserve_dict_class, preserve_tuples, to_str)
         elif isinstance(value, tuple):
@@ -170,16 +206,8 @@ def decode_dict(data, encoding=None, errors='strict', keep=False,
             value = decode_dict(value, encoding, errors, keep, normalize,
                                 preserve_dict_class, preserve_tuples, to_str)
         else:
-            try:
-                value = _decode_func(value, encoding, errors, normalize)
-            except TypeError:
-                # to_unicode raises a TypeError when input is not a
-                # string/bytestring/bytearray. This is expected and simply
-                # means we are going to leave the value as-is.
-                pass
-            except UnicodeDecodeError:
-                if not keep:
-                    raise
+            value = _decode_scalar(value, encoding, errors, keep, normalize,
+                                   to_str)
 
         rv[key] = value
     return rv
@@ -192,12 +220,12 @@ def decode_list(data, encoding=None, errors='strict', keep=False,
     Decode all string values to Unicode. Optionally use to_str=True to ensure
     strings are str types and not unicode on Python 2.
     '''
-    _decode_func = salt.utils.stringutils.to_unicode \
-        if not to_str \
-        else salt.utils.stringutils.to_str
+    decoded_types = _decoded_types(normalize, to_str)
     rv = []
     for item in data:
-        if isinstance(item, list):
+        if isinstance(item, decoded_types):
+            pass
+        elif isinstance(item, list):
             item = decode_list(item, encoding, errors, keep, normalize,
                                preserve_dict_class, preserve_tuples, to_str)
         elif isinstance(item, tuple):
@@ -210,16 +238,8 @@ def decode_list(data, encoding=None, errors='strict', keep=False,
             item = decode_dict(item, encoding, errors, keep, normalize,
                                preserve_dict_class, preserve_tuples, to_str)
         else:
-            try:
-                item = _decode_func(item, encoding, errors, normalize)
-            except TypeError:
-                # to_unicode raises a TypeError when input is not a
-                # string/bytestring/bytearray. This is expected and simply
-                # means we are going to leave the value as-is.
-                pass
-            except UnicodeDecodeError:
-                if not keep:
-                    raise
+            item = _decode_scalar(item, encoding, errors, keep, normalize,
+                                  to_str)
 
         rv.append(item)
     return rv
@@ -248,7 +268,9 @@ def encode(data, encoding=None, errors='strict', keep=False,
     can be useful for cases where the data passed to this function is likely to
     contain binary blobs.
     '''
-    if isinstance(data, collections.Mapping):
+    if isinstance(data, _ENCODED_TYPES):
+        return data
+    elif isinstance(data, collections.Mapping):
         return encode_dict(data, encoding, errors, keep,
                            preserve_dict_class, preserve_tuples)
     elif isinstance(data, list):
@@ -260,17 +282,7 @@ def encode(data, encoding=None, errors='strict', keep=False,
             else encode_list(data, encoding, errors, keep,
                              preserve_dict_class, preserve_tuples)
     else:
-        try:
-            return salt.utils.stringutils.to_bytes(data, encoding, errors)
-        except TypeError:
-            # to_bytes raises a TypeError when input is not a
-            # string/bytestring/bytearray. This is expected and simply
-            # means we are going to leave the value as-is.
-            pass
-        except UnicodeEncodeError:
-            if not keep:
-                raise
-        return data
+        return _encode_scalar(data, encoding, errors, keep)
 
 
 @jinja_filter('json_decode_dict')  # Remove this for Neon
@@ -282,24 +294,19 @@ def encode_dict(data, encoding=None, errors='strict', keep=False,
     '''
     rv = data.__class__() if preserve_dict_class else {}
     for key, value in six.iteritems(data):
-        if isinstance(key, tuple):
+        if isinstance(key, _ENCODED_TYPES):
+            pass
+        elif isinstance(key, tuple):
             key = encode_tuple(key, encoding, errors, keep, preserve_dict_class) \
                 if preserve_tuples \
                 else encode_list(key, encoding, errors, keep,
                                  preserve_dict_class, preserve_tuples)
         else:
-            try:
-                key = salt.utils.stringutils.to_bytes(key, encoding, errors)
-            except TypeError:
-                # to_bytes raises a TypeError when input is not a
-                # string/bytestring/bytearray. This is expected and simply
-                # means we are going to leave the value as-is.
-                pass
-            except UnicodeEncodeError:
-                if not keep:
-                    raise
-
-        if isinstance(value, list):
+            key = _encode_scalar(key, encoding, errors, keep)
+
+        if isinstance(value, _ENCODED_TYPES):
+            pass
+        elif isinstance(value, list):
             value = encode_list(value, encoding, errors, keep,
                                 preserve_dict_class, preserve_tuples)
         elif isinstance(value, tuple):
@@ -311,16 +318,7 @@ def encode_dict(data, encoding=None, errors='strict', keep=False,
             value = encode_dict(value, encoding, errors, keep,
                                 preserve_dict_class, preserve_tuples)
         else:
-            try:
-                value = salt.utils.stringutils.to_bytes(value, encoding, errors)
-            except TypeError:
-                # to_bytes raises a TypeError when input is not a
-                # string/bytestring/bytearray. This is expected and simply
-                # means we are going to leave the value as-is.
-                pass
-            except UnicodeEncodeError:
-                if not keep:
-                    raise
+            value = _encode_scalar(value, encoding, errors, keep)
 
         rv[key] = value
     return rv
@@ -335,7 +333,9 @@ def encode_list(data, encoding=None, errors='strict', keep=False,
     '''
     rv = []
     for item in data:
-        if isinstance(item, list):
+        if isinstance(item, _ENCODED_TYPES):
+            pass
+        elif isinstance(item, list):
             item = encode_list(item, encoding, errors, keep,
                                preserve_dict_class, preserve_tuples)
         elif isinstance(item, tuple):
@@ -347,16 +347,7 @@ def encode_list(data, encoding=None, errors='strict', keep=False,
             item = encode_dict(item, encoding, errors, keep,
                                preserve_dict_class, preserve_tuples)
         else:
-            try:
-                item = salt.utils.stringutils.to_bytes(item, encoding, errors)
-            except TypeError:
-                # to_bytes raises a TypeError when input is not a
-                # string/bytestring/bytearray. This is expected and simply
-                # means we are going to leave the value as-is.
-                pass
-            except UnicodeEncodeError:
-                if not keep:
-                    raise
+            item = _encode_scalar(item, encoding, errors, keep)
 
         rv.append(item)
     return rv
@@ -55,9 +55,7 @@ def update(dest, upd, recursive_update=True, merge_lists=False):
             elif isinstance(dest_subkey, list) \
                      and isinstance(val, list):
                 if merge_lists:
-                    merged = copy.deepcopy(dest_subkey)
-                    merged.extend([x for x in val if x not in merged])
-                    dest[key] = merged
+                    dest[key] = _merge_lists(dest_subkey, val)
                 else:
                     dest[key] = upd[key]
             else:
@@ -74,6 +72,30 @@ def update(dest, upd, recursive_update=True, merge_lists=False):
         return dest
 
 
+def _merge_lists(list_a, list_b):
+    '''
+    Return a new list made of ``list_a`` followed by the items of ``list_b``
+    which ``list_a`` does not hold
+    '''
+    seen = set()
+    unhashable = []
+    for item in list_a:
+        try:
+            seen.add(item)
+        except TypeError:
+            unhashable.append(item)
+
+    def _missing(item):
+        try:
+            return item not in seen
+        except TypeError:
+            return item not in unhashable
+
+    merged = list(list_a)
+    merged.extend([x for x in list_b if _missing(x)])
+    return merged
+
+
 def merge_list(obj_a, obj_b):
     ret = {}
     for key, val in six.iteritems(obj_a):
@@ -84,23 +106,62 @@ def merge_list(obj_a, obj_b):
     return ret
 
 
-def merge_recurse(obj_a, obj_b, merge_lists=False):
-    copied = copy.deepcopy(obj_a)
-    return update(copied, obj_b, merge_lists=merge_lists)
+def merge_recurse(obj_a, obj_b, merge_lists=False, copy_on_write=False):
+    '''
+    Merge obj_b recursively into a copy of obj_a
+
+    .. versionchanged:: Fluorine
+        With ``copy_on_write``, obj_a is not copied deeply: only the mappings
+        along the keys set by obj_b are copied, the rest of obj_a is shared
+        with the result. This is only safe when neither the result nor obj_a
+        is changed in place afterwards.
+    '''
+    if (not isinstance(obj_a, collections.Mapping)) \
+            or (not isinstance(obj_b, collections.Mapping)):
+        raise TypeError('Cannot update using non-dict types in dictupdate.update()')
+    if copy_on_write:
+        merged = copy.copy(obj_a)
+    else:
+        merged = copy.deepcopy(obj_a)
+    # Walk the mappings to merge with a stack rather than recursion, so that
+    # deeply nested pillar data cannot exhaust the interpreter stack
+    pending = [(merged, obj_b)]
+    while pending:
+        dest, upd = pending.pop()
+        for key, val in six.iteritems(upd):
+            try:
+                dest_subkey = dest.get(key, None)
+            except AttributeError:
+                dest_subkey = None
+            if isinstance(dest_subkey, collections.Mapping) \
+                    and isinstance(val, collections.Mapping):
+                if copy_on_write:
+                    # Copy the nested mapping of obj_a before merging into it
+                    dest_subkey = copy.copy(dest_subkey)
+                    dest[key] = dest_subkey
+                pending.append((dest_subkey, val))
+            elif merge_lists and isinstance(dest_subkey, list) \
+                    and isinstance(val, list):
+                dest[key] = _merge_lists(dest_subkey, val)
+            else:
+                dest[key] = val
+    return merged
 
 
 def merge_aggregate(obj_a, obj_b):
     return _yamlex_merge_recursive(obj_a, obj_b, level=1)
 
 
-def merge_overwrite(obj_a, obj_b, merge_lists=False):
+def merge_overwrite(obj_a, obj_b, merge_lists=False, copy_on_write=False):
     for obj in obj_b:
         if obj in obj_a:
             obj_a[obj] = obj_b[obj]
-    return merge_recurse(obj_a, obj_b, merge_lists=merge_lists)
+    return merge_recurse(obj_a, obj_b, merge_lists=merge_lists,
+                         copy_on_write=copy_on_write)
 
 
-def merge(obj_a, obj_b, strategy='smart', renderer='yaml', merge_lists=False):
+def merge(obj_a, obj_b, strategy='smart', renderer='yaml', merge_lists=False,
+          copy_on_write=False):
     if strategy == 'smart':
         if renderer.split('|')[-1] == 'yamlex' or renderer.startswith('yamlex_'):
             strategy = 'aggregate'
@@ -110,12 +171,12 @@ def merge(obj_a, obj_b, strategy='smart', renderer='yaml', merge_lists=False):
     if strategy == 'list':
         merged = merge_list(obj_a, obj_b)
     elif strategy == 'recurse':
-        merged = merge_recurse(obj_a, obj_b, merge_lists)
+        merged = merge_recurse(obj_a, obj_b, merge_lists, copy_on_write)
     elif strategy == 'aggregate':
         #: level = 1 merge at least root data
         merged = merge_aggregate(obj_a, obj_b)
     elif strategy == 'overwrite':
-        merged = merge_overwrite(obj_a, obj_b, merge_lists)
+        merged = merge_overwrite(obj_a, obj_b, merge_lists, copy_on_write)
     elif strategy == 'none':
         # If we do not want to merge, there is only one pillar passed, so we can safely use the default recurse,
         # we just do not want to log an error
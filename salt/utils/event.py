@@ -107,6 +107,8 @@ TAGS = {
     'cloud': 'cloud',  # prefix for all salt/cloud events
     'fileserver': 'fileserver',  # prefix for all salt/fileserver events
     'queue': 'queue',  # prefix for all salt/queue events
+    'batch': 'batch',  # prefix for all salt/batch events (master-side batches)
+    'cache': 'cache',  # prefix for all salt/cache events
 }
 
 
@@ -434,14 +436,25 @@ class SaltEvent(object):
         if serial is None:
             serial = salt.payload.Serial({'serial': 'msgpack'})
 
+        mtag, mdata = cls.unpack_tag(raw)
+        data = serial.loads(mdata, encoding='utf-8')
+        return mtag, data
+
+    @staticmethod
+    def unpack_tag(raw):
+        '''
+        Split the tag of a raw event from its still serialized data, so that
+        the handlers of events can skip loading the data of the events they do
+        not need
+
+        .. versionadded:: Fluorine
+        '''
         if six.PY2:
             mtag, sep, mdata = raw.partition(TAGEND)  # split tag from data
-            data = serial.loads(mdata, encoding='utf-8')
         else:
             mtag, sep, mdata = raw.partition(salt.utils.stringutils.to_bytes(TAGEND))  # split tag from data
             mtag = salt.utils.stringutils.to_str(mtag)
-            data = serial.loads(mdata, encoding='utf-8')
-        return mtag, data
+        return mtag, mdata
 
     def _get_match_func(self, match_type=None):
         if match_type is None:
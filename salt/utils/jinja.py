@@ -11,6 +11,8 @@ import os.path
 import pipes
 import pprint
 import re
+import threading
+import time
 import uuid
 from functools import wraps
 from xml.dom import minidom
@@ -19,7 +21,7 @@ from xml.etree.ElementTree import Element, SubElement, tostring
 # Import third party libs
 import jinja2
 from salt.ext import six
-from jinja2 import BaseLoader, Markup, TemplateNotFound, nodes
+from jinja2 import BaseLoader, BytecodeCache, Markup, TemplateNotFound, nodes
 from jinja2.environment import TemplateModule
 from jinja2.exceptions import TemplateRuntimeError
 from jinja2.ext import Extension
@@ -27,6 +29,7 @@ from jinja2.ext import Extension
 # Import salt libs
 from salt.exceptions import TemplateError
 import salt.fileclient
+import salt.utils.atomicfile
 import salt.utils.data
 import salt.utils.files
 import salt.utils.json
@@ -39,6 +42,7 @@ from salt.utils.odict import OrderedDict
 log = logging.getLogger(__name__)
 
 __all__ = [
+    'SaltBytecodeCache',
     'SaltCacheLoader',
     'SerializerExtension'
 ]
@@ -54,6 +58,12 @@ class SaltCacheLoader(BaseLoader):
     Templates are cached like regular salt states
     and only loaded once per loader instance.
     '''
+    # When the templates were last fetched by the loaders of the process
+    _fetched = {}
+    # The pid, opts and file client of the last loader of each thread, by
+    # pillar_rend, which the next loaders reuse if they get the same opts
+    _file_clients = threading.local()
+
     def __init__(self, opts, saltenv='base', encoding='utf-8',
                  pillar_rend=False):
         self.opts = opts
@@ -78,8 +88,15 @@ class SaltCacheLoader(BaseLoader):
         Return a file client. Instantiates on first call.
         '''
         if not self._file_client:
-            self._file_client = salt.fileclient.get_file_client(
-                self.opts, self.pillar_rend)
+            clients = self._file_clients.__dict__.setdefault('clients', {})
+            pid, opts, client = clients.get(self.pillar_rend, (None, None, None))
+            # A client is not shared with the processes forked after it
+            # was created
+            if opts is not self.opts or pid != os.getpid():
+                client = salt.fileclient.get_file_client(
+                    self.opts, self.pillar_rend)
+                clients[self.pillar_rend] = (os.getpid(), self.opts, client)
+            self._file_client = client
         return self._file_client
 
     def cache_file(self, template):
@@ -91,11 +108,21 @@ class SaltCacheLoader(BaseLoader):
 
     def check_cache(self, template):
         '''
-        Cache a file only once
+        Cache a file only once, or only once every jinja_loader_cache_ttl
+        seconds for all the loaders of the process if it is set
         '''
-        if template not in self.cached:
-            self.cache_file(template)
+        if template in self.cached:
+            return
+        ttl = self.opts.get('jinja_loader_cache_ttl', 0)
+        key = (self.opts.get('cachedir'), self.opts.get('file_client'),
+               self.pillar_rend, self.saltenv, template)
+        if ttl and time.time() - self._fetched.get(key, 0) < ttl:
             self.cached.append(template)
+            return
+        self.cache_file(template)
+        self.cached.append(template)
+        if ttl:
+            self._fetched[key] = time.time()
 
     def get_source(self, environment, template):
         '''
@@ -171,6 +198,67 @@ class SaltCacheLoader(BaseLoader):
         raise TemplateNotFound(template)
 
 
+class SaltBytecodeCache(BytecodeCache):
+    '''
+    A Jinja bytecode cache shared by the environments of the process, which
+    also keeps the bytecode in ``directory`` if one is passed, so that the
+    templates are only compiled again when their source changes.
+
+    The bytecode compiled for the environment options which ``prefix`` stands
+    for is kept apart from the bytecode compiled for other options.
+    '''
+    # The bytecode compiled by the process, by cache key
+    _compiled = {}
+
+    def __init__(self, directory=None, prefix=''):
+        self.directory = directory
+        self.prefix = prefix
+
+    def _path(self, key):
+        return os.path.join(self.directory, '{0}.cache'.format(key))
+
+    def load_bytecode(self, bucket):
+        key = self.prefix + bucket.key
+        data = self._compiled.get(key)
+        if data is None and self.directory:
+            try:
+                with salt.utils.files.fopen(self._path(key), 'rb') as fp_:
+                    data = fp_.read()
+            except (IOError, OSError):
+                return
+        if data is not None:
+            # Resets the bucket if the source changed since it was compiled
+            bucket.bytecode_from_string(data)
+
+    def dump_bytecode(self, bucket):
+        key = self.prefix + bucket.key
+        data = bucket.bytecode_to_string()
+        self._compiled[key] = data
+        if not self.directory:
+            return
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            with salt.utils.atomicfile.atomic_open(self._path(key), 'wb') as fp_:
+                fp_.write(data)
+        except (IOError, OSError) as exc:
+            log.warning('Unable to write the Jinja bytecode cache %s: %s',
+                        self.directory, exc)
+
+    def clear(self):
+        for key in list(self._compiled):
+            if key.startswith(self.prefix):
+                del self._compiled[key]
+        if not self.directory or not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.startswith(self.prefix) and name.endswith('.cache'):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+
 class PrintableDict(OrderedDict):
     '''
     Ensures that dict str() and repr() are YAML friendly.
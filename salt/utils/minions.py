@@ -10,6 +10,7 @@ import os
 import fnmatch
 import re
 import logging
+import time
 
 # Import salt libs
 import salt.payload
@@ -17,6 +18,7 @@ import salt.roster
 import salt.utils.data
 import salt.utils.files
 import salt.utils.network
+import salt.utils.presence
 import salt.utils.stringutils
 import salt.utils.versions
 from salt.defaults import DEFAULT_TARGET_DELIM
@@ -49,6 +51,36 @@ TARGET_REX = re.compile(
         (?P<pattern>.+)$'''                # The pattern passed to the target engine
     )
 
+# The regexes of the ACLs compiled by match_check, None if invalid
+_REGEX_CACHE = {}
+_REGEX_CACHE_SIZE = 1000
+
+# The matchers whose results only depend on the accepted minion keys
+_PKI_MATCHERS = ('glob', 'pcre', 'list')
+_EXPAND_CACHE_SIZE = 1000
+
+
+def _compile_regex(regex):
+    '''
+    Return the compiled regex, or None if it is invalid. The regexes are
+    compiled once per process since the same ACLs are checked on every publish.
+    '''
+    try:
+        return _REGEX_CACHE[regex]
+    except KeyError:
+        pass
+    except TypeError:
+        # Not hashable, so not a valid regex either
+        return None
+    try:
+        compiled = re.compile(regex)
+    except Exception:
+        compiled = None
+    if len(_REGEX_CACHE) >= _REGEX_CACHE_SIZE:
+        _REGEX_CACHE.clear()
+    _REGEX_CACHE[regex] = compiled
+    return compiled
+
 
 def parse_target(target_expression):
     '''Parse `target_expressing` splitting it into `engine`, `delimiter`,
@@ -200,6 +232,8 @@ class CkMinions(object):
             self.acc = 'minions'
         else:
             self.acc = 'accepted'
+        # (matcher, expr) -> (minions version, matching minions)
+        self._expand_cache = {}
 
     def _check_nodegroup_minions(self, expr, greedy):  # pylint: disable=unused-argument
         '''
@@ -263,6 +297,23 @@ class CkMinions(object):
             )
             return minions
 
+    def _minions_version(self):
+        '''
+        Return a value which changes when the accepted minion keys change, or
+        None if it cannot be trusted to
+        '''
+        try:
+            path = os.path.join(self.opts['pki_dir'], self.acc)
+            stats = [os.stat(path)]
+            if self.opts.get('key_cache'):
+                stats.append(os.stat(os.path.join(path, '.key_cache')))
+        except (KeyError, OSError):
+            return None
+        # A key added within the resolution of the mtime would go unnoticed
+        if any(time.time() - stat.st_mtime < 2 for stat in stats):
+            return None
+        return tuple((stat.st_ino, stat.st_mtime) for stat in stats)
+
     def _check_cache_minions(self,
                              expr,
                              delimiter,
@@ -300,10 +351,12 @@ class CkMinions(object):
                 return {'minions': minions,
                         'missing': []}
             minions = set(minions)
+            if greedy:
+                cminions = [id_ for id_ in cminions if id_ in minions]
+            mdatas = self.cache.fetch_many(
+                [('minions/{0}'.format(id_), 'data') for id_ in cminions])
             for id_ in cminions:
-                if greedy and id_ not in minions:
-                    continue
-                mdata = self.cache.fetch('minions/{0}'.format(id_), 'data')
+                mdata = mdatas.get(('minions/{0}'.format(id_), 'data'))
                 if mdata is None:
                     if not greedy:
                         minions.remove(id_)
@@ -399,8 +452,10 @@ class CkMinions(object):
             proto = 'ipv{0}'.format(tgt.version)
 
             minions = set(minions)
+            mdatas = self.cache.fetch_many(
+                [('minions/{0}'.format(id_), 'data') for id_ in cminions])
             for id_ in cminions:
-                mdata = self.cache.fetch('minions/{0}'.format(id_), 'data')
+                mdata = mdatas.get(('minions/{0}'.format(id_), 'data'))
                 if mdata is None:
                     if not greedy:
                         minions.remove(id_)
@@ -632,19 +687,19 @@ class CkMinions(object):
                 'minions.'
             )
         minions = set()
+        present = salt.utils.presence.connected(self.opts)
+        if present is not None:
+            # Tracked by the presence service
+            if subset:
+                present = dict((id_, present[id_]) for id_ in subset if id_ in present)
+            if show_ip:
+                return set(six.iteritems(present))
+            return set(present)
         if self.opts.get('minion_data_cache', False):
             search = self.cache.list('minions')
             if search is None:
                 return minions
-            addrs = salt.utils.network.local_port_tcp(int(self.opts['publish_port']))
-            if '127.0.0.1' in addrs:
-                # Add in the address of a possible locally-connected minion.
-                addrs.discard('127.0.0.1')
-                addrs.update(set(salt.utils.network.ip_addrs(include_loopback=False)))
-            if '::1' in addrs:
-                # Add in the address of a possible locally-connected minion.
-                addrs.discard('::1')
-                addrs.update(set(salt.utils.network.ip_addrs6(include_loopback=False)))
+            addrs = salt.utils.presence.connected_addrs(self.opts)
             if subset:
                 search = subset
             for id_ in search:
@@ -743,7 +798,32 @@ class CkMinions(object):
         v_matcher = ref.get(target_info['engine'])
         v_expr = target_info['pattern']
 
-        _res = self.check_minions(v_expr, v_matcher)
+        return self._cached_minions(v_expr, v_matcher)
+
+    def _cached_minions(self, expr, tgt_type):
+        '''
+        Return the set of minions matched by the target. The minions matched
+        by their ids alone are reused until the accepted keys change, those
+        matched by grains or pillar are always looked up since these may
+        change at any time.
+        '''
+        version = None
+        if tgt_type in _PKI_MATCHERS and not self.opts.get('enable_ssh_minions', False):
+            version = self._minions_version()
+        try:
+            key = (tgt_type, expr)
+            cached = self._expand_cache.get(key) if version is not None else None
+        except TypeError:
+            # A list target
+            key = version = cached = None
+        if cached is not None and cached[0] == version:
+            return set(cached[1])
+
+        _res = self.check_minions(expr, tgt_type)
+        if version is not None:
+            if len(self._expand_cache) >= _EXPAND_CACHE_SIZE:
+                self._expand_cache.clear()
+            self._expand_cache[key] = (version, frozenset(_res['minions']))
         return set(_res['minions'])
 
     def validate_tgt(self, valid, expr, tgt_type, minions=None):
@@ -772,9 +852,13 @@ class CkMinions(object):
         vals = []
         if isinstance(fun, six.string_types):
             fun = [fun]
+        compiled = _compile_regex(regex)
+        if compiled is None:
+            log.error('Invalid regular expression: %s', regex)
+            return []
         for func in fun:
             try:
-                if re.match(regex, func):
+                if compiled.match(func):
                     vals.append(True)
                 else:
                     vals.append(False)
@@ -974,6 +1058,9 @@ class CkMinions(object):
                             # Invalid argument
                             continue
                         valid = next(six.iterkeys(ind))
+                        if minions is None:
+                            # Resolve the target once for all the ACL entries
+                            minions = self._cached_minions(tgt, tgt_type)
                         # Check if minions are allowed
                         if self.validate_tgt(
                             valid,
@@ -1156,8 +1243,9 @@ def mine_get(tgt, fun, tgt_type='glob', opts=None):
             tgt_type)
     minions = _res['minions']
     cache = salt.cache.factory(opts)
+    mdatas = cache.fetch_many([('minions/{0}'.format(minion), 'mine') for minion in minions])
     for minion in minions:
-        mdata = cache.fetch('minions/{0}'.format(minion), 'mine')
+        mdata = mdatas.get(('minions/{0}'.format(minion), 'mine'))
         if mdata is None:
             continue
         fdata = mdata.get(fun)
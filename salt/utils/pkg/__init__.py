@@ -5,13 +5,19 @@ Common functions for managing package refreshes during states
 # Import python libs
 from __future__ import absolute_import, print_function, unicode_literals
 import errno
+import fnmatch
 import logging
 import os
 import re
 
 # Import Salt libs
+import salt.payload
+import salt.utils.atomicfile
 import salt.utils.data
 import salt.utils.files
+import salt.utils.hashutils
+import salt.utils.json
+import salt.utils.path
 import salt.utils.versions
 
 log = logging.getLogger(__name__)
@@ -67,6 +73,102 @@ def check_refresh(opts, refresh=None):
     )
 
 
+def metadata_stamp(opts, paths, patterns=None):
+    '''
+    Return the mtimes and sizes of the given paths, which change when the
+    package database or the repository metadata they hold are updated. For
+    the directories, the files under them are part of the stamp, only those
+    whose name matches one of the glob ``patterns`` if they are passed.
+
+    Return None if the ``pkg_metadata_cache`` option is not set, in which case
+    the cache functions below do nothing.
+    '''
+    if not opts.get('pkg_metadata_cache', False):
+        return None
+    stamp = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            stamp.append([path, None, None])
+            continue
+        stamp.append([path, stat.st_mtime, stat.st_size])
+        if not os.path.isdir(path):
+            continue
+        for root, dirs, files in salt.utils.path.os_walk(path):
+            dirs.sort()
+            for filename in sorted(files):
+                if patterns is not None and not any(
+                        fnmatch.fnmatch(filename, x) for x in patterns):
+                    continue
+                full = os.path.join(root, filename)
+                try:
+                    stat = os.stat(full)
+                except OSError:
+                    continue
+                stamp.append([full, stat.st_mtime, stat.st_size])
+    return stamp
+
+
+def _metadata_cache_path(opts, name):
+    return os.path.join(opts['cachedir'], 'pkg_metadata', '{0}.p'.format(name))
+
+
+def _metadata_cache_key(key):
+    return salt.utils.hashutils.sha256_digest(
+        salt.utils.json.dumps(key, sort_keys=True))
+
+
+def read_metadata_cache(opts, name, key, stamp):
+    '''
+    Return the package metadata cached under ``name`` and ``key`` by
+    :py:func:`write_metadata_cache`, or None if there is none or if it was
+    written for another ``stamp``, as returned by :py:func:`metadata_stamp`.
+    '''
+    if stamp is None:
+        return None
+    path = _metadata_cache_path(opts, name)
+    try:
+        with salt.utils.files.fopen(path, 'rb') as fp_:
+            cache = salt.payload.Serial(opts).load(fp_)
+    except (IOError, OSError):
+        return None
+    except Exception as exc:
+        log.warning('Unable to read the package metadata cache %s: %s', path, exc)
+        return None
+    if not isinstance(cache, dict) or cache.get('stamp') != stamp:
+        return None
+    return cache.get('entries', {}).get(_metadata_cache_key(key))
+
+
+def write_metadata_cache(opts, name, key, stamp, data):
+    '''
+    Cache package metadata under ``name`` and ``key``, for as long as the
+    paths ``stamp`` was computed from do not change. The entries cached for
+    another stamp are dropped.
+    '''
+    if stamp is None:
+        return
+    path = _metadata_cache_path(opts, name)
+    serial = salt.payload.Serial(opts)
+    cache = None
+    try:
+        with salt.utils.files.fopen(path, 'rb') as fp_:
+            cache = serial.load(fp_)
+    except Exception:
+        pass
+    if not isinstance(cache, dict) or cache.get('stamp') != stamp:
+        cache = {'stamp': stamp, 'entries': {}}
+    cache['entries'][_metadata_cache_key(key)] = data
+    try:
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with salt.utils.atomicfile.atomic_open(path, 'wb') as fp_:
+            serial.dump(cache, fp_)
+    except (IOError, OSError) as exc:
+        log.warning('Unable to write the package metadata cache %s: %s', path, exc)
+
+
 def split_comparison(version):
     match = re.match(r'^([<>])?(=)?([^<>=]+)$', version)
     if match:
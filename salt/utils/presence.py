@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+'''
+Track the minions connected to the master
+
+.. versionadded:: Fluorine
+
+When ``presence_service`` is set in the master config, the
+:py:class:`PresenceService` process keeps the set of the connected minions up
+to date, instead of every call to
+:py:meth:`CkMinions.connected_ids <salt.utils.minions.CkMinions.connected_ids>`
+fetching the grains of all the minions from the minion data cache to match
+their addresses with the connections to the publish port.
+
+The addresses of the minions are indexed once from the minion data cache, then
+updated from the ``salt/auth``, ``salt/key`` and ``salt/minion/<id>/start``
+events. Every ``presence_interval`` seconds, the connections to the publish
+port are compared with the previous ones, and only the minions at the
+addresses which connected or disconnected are updated. The connected minions
+are written to ``<cachedir>/presence.p``, which the master processes read
+again only when it is replaced, and the ``salt/presence/change`` and
+``salt/presence/present`` events are fired if ``presence_events`` is set.
+'''
+
+# Import python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import logging
+import os
+import time
+
+# Import salt libs
+import salt.cache
+import salt.payload
+import salt.utils.atomicfile
+import salt.utils.event
+import salt.utils.files
+import salt.utils.network
+import salt.utils.process
+from salt.exceptions import SaltCacheError
+from salt.transport import iter_transport_opts
+
+# Import 3rd-party libs
+import tornado.ioloop
+
+log = logging.getLogger(__name__)
+
+# path -> ((inode, mtime), connected minions) of the presence tables read
+_TABLES = {}
+
+
+def presence_path(opts):
+    return os.path.join(opts['cachedir'], 'presence.p')
+
+
+def connected_addrs(opts):
+    '''
+    Return the addresses connected to the publish port of the master
+    '''
+    addrs = salt.utils.network.local_port_tcp(int(opts['publish_port']))
+    if '127.0.0.1' in addrs:
+        # Add in the address of a possible locally-connected minion.
+        addrs.discard('127.0.0.1')
+        addrs.update(set(salt.utils.network.ip_addrs(include_loopback=False)))
+    if '::1' in addrs:
+        # Add in the address of a possible locally-connected minion.
+        addrs.discard('::1')
+        addrs.update(set(salt.utils.network.ip_addrs6(include_loopback=False)))
+    return addrs
+
+
+def minion_addrs(grains):
+    '''
+    Return the addresses of a minion, by order of preference
+    '''
+    return list(grains.get('ipv4', [])) + list(grains.get('ipv6', []))
+
+
+def connected(opts):
+    '''
+    Return a dict of the connected minion ids and the address they connect
+    from, as tracked by the presence service, or None if the service is not
+    enabled or not running
+    '''
+    if not opts.get('presence_service', False):
+        return None
+    path = presence_path(opts)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    if time.time() - stat.st_mtime > 3 * opts.get('presence_interval', 5):
+        # The service stopped updating the table
+        return None
+    key = (stat.st_ino, stat.st_mtime)
+    cached = _TABLES.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    try:
+        with salt.utils.files.fopen(path, 'rb') as fp_:
+            minions = salt.payload.Serial(opts).load(fp_)['minions']
+    except Exception as exc:
+        log.debug('Unable to read the presence table %s: %s', path, exc)
+        return None
+    _TABLES[path] = (key, minions)
+    return minions
+
+
+class PresenceService(salt.utils.process.SignalHandlingMultiprocessingProcess):
+    '''
+    The master process tracking the connected minions
+    '''
+    def __init__(self, opts, **kwargs):
+        super(PresenceService, self).__init__(**kwargs)
+        self.opts = opts
+        self.interval = opts.get('presence_interval', 5)
+        # minion id -> addresses from its grains
+        self.addrs = {}
+        # address -> minion ids
+        self.by_addr = {}
+        # connected minion id -> address it connects from
+        self.present = {}
+        # the addresses connected to the publish port
+        self.conns = set()
+        # the connected addresses no minion is known at, and when the index
+        # was last rebuilt to look for them
+        self.unknown = set()
+        self.last_rebuild = 0
+        self.last_present_event = 0
+        self.dirty = True
+        self.presence_events = False
+        if self.opts.get('presence_events', False):
+            # With a TCP only transport the presence events are fired by the
+            # publisher
+            self.presence_events = any(
+                transport != 'tcp' for transport, _ in iter_transport_opts(self.opts))
+        # minion ids which connected or disconnected since the last events
+        self.changes = {'new': set(), 'lost': set()}
+
+    # __setstate__ and __getstate__ are only used on Windows.
+    # We do this so that __init__ will be invoked on Windows in the child
+    # process so that a register_after_fork() equivalent will work on Windows.
+    def __setstate__(self, state):
+        self._is_child = True
+        self.__init__(
+            state['opts'],
+            log_queue=state['log_queue'],
+            log_queue_level=state['log_queue_level']
+        )
+
+    def __getstate__(self):
+        return {'opts': self.opts,
+                'log_queue': self.log_queue,
+                'log_queue_level': self.log_queue_level}
+
+    def run(self):
+        '''
+        Index the minions, then track the connections and the events
+        '''
+        salt.utils.process.appendproctitle(self.__class__.__name__)
+        self.io_loop = tornado.ioloop.IOLoop()
+        self.io_loop.make_current()
+        self.cache = salt.cache.factory(self.opts)
+        self.event = salt.utils.event.get_master_event(
+            self.opts, self.opts['sock_dir'], listen=True, io_loop=self.io_loop)
+        self.event.set_event_handler(self.handle_event)
+        # The first tick indexes the minions
+        self.tick()
+        tornado.ioloop.PeriodicCallback(self.tick, self.interval * 1000).start()
+        try:
+            self.io_loop.start()
+        except (KeyboardInterrupt, SystemExit):
+            pass
+
+    def _fetch_addrs(self, id_):
+        try:
+            mdata = self.cache.fetch('minions/{0}'.format(id_), 'data')
+        except SaltCacheError:
+            return []
+        if not isinstance(mdata, dict):
+            return []
+        return minion_addrs(mdata.get('grains', {}))
+
+    def _set_addrs(self, id_, addrs):
+        for addr in self.addrs.pop(id_, []):
+            ids = self.by_addr.get(addr)
+            if ids is not None:
+                ids.discard(id_)
+                if not ids:
+                    del self.by_addr[addr]
+        if addrs:
+            self.addrs[id_] = addrs
+            for addr in addrs:
+                self.by_addr.setdefault(addr, set()).add(id_)
+
+    def _update_minion(self, id_):
+        '''
+        Update whether a minion is connected from its indexed addresses
+        '''
+        addr = next((addr for addr in self.addrs.get(id_, []) if addr in self.conns), None)
+        if addr is None:
+            if self.present.pop(id_, None) is not None:
+                self.changes['lost'].add(id_)
+                self.dirty = True
+        elif self.present.get(id_) != addr:
+            if id_ not in self.present:
+                self.changes['new'].add(id_)
+            self.present[id_] = addr
+            self.dirty = True
+
+    def refresh(self, id_):
+        '''
+        Index the addresses of a minion again
+        '''
+        self._set_addrs(id_, self._fetch_addrs(id_))
+        self._update_minion(id_)
+
+    def drop(self, id_):
+        self._set_addrs(id_, [])
+        self._update_minion(id_)
+
+    def rebuild(self):
+        '''
+        Index the addresses of all the minions of the minion data cache
+        '''
+        self.last_rebuild = time.time()
+        if not self.opts.get('minion_data_cache', False):
+            return
+        ids = self.cache.list('minions') or []
+        for id_ in set(self.addrs) - set(ids):
+            self.drop(id_)
+        for id_ in ids:
+            self.refresh(id_)
+
+    def update_conns(self, conns):
+        '''
+        Update the minions at the addresses which connected or disconnected
+        '''
+        changed = conns.symmetric_difference(self.conns)
+        self.conns = conns
+        ids = set()
+        for addr in changed:
+            ids.update(self.by_addr.get(addr, ()))
+        for id_ in ids:
+            self._update_minion(id_)
+        self.unknown &= conns
+        unknown = set(addr for addr in conns if addr not in self.by_addr)
+        # Look for the minions at unknown addresses in the minion data cache
+        # when new ones connect, and from time to time for the ones which
+        # were not found, since their grains may have been cached since. The
+        # minions which authenticate are indexed from their events meanwhile.
+        since = time.time() - self.last_rebuild
+        if (unknown - self.unknown and since >= self.opts['loop_interval']) or \
+                (unknown and since >= 10 * self.opts['loop_interval']):
+            self.rebuild()
+            self.unknown = set(addr for addr in conns if addr not in self.by_addr)
+
+    def save(self):
+        path = presence_path(self.opts)
+        try:
+            if self.dirty:
+                with salt.utils.atomicfile.atomic_open(path, 'wb') as fp_:
+                    salt.payload.Serial(self.opts).dump(
+                        {'time': time.time(), 'minions': self.present}, fp_)
+                self.dirty = False
+            else:
+                # Tell the readers the table is up to date
+                os.utime(path, None)
+        except (IOError, OSError) as exc:
+            log.error('Unable to write the presence table %s: %s', path, exc)
+
+    def fire_events(self):
+        if not self.presence_events:
+            self.changes = {'new': set(), 'lost': set()}
+            return
+        now = time.time()
+        new, lost = self.changes['new'], self.changes['lost']
+        self.changes = {'new': set(), 'lost': set()}
+        if new or lost:
+            self.event.fire_event({'new': list(new), 'lost': list(lost)},
+                                  salt.utils.event.tagify('change', 'presence'))
+        if new or lost or now - self.last_present_event >= self.opts['loop_interval']:
+            self.event.fire_event({'present': list(self.present)},
+                                  salt.utils.event.tagify('present', 'presence'))
+            self.last_present_event = now
+
+    def tick(self):
+        if self.opts.get('minion_data_cache', False):
+            self.update_conns(connected_addrs(self.opts))
+        self.save()
+        self.fire_events()
+
+    def handle_event(self, raw):
+        '''
+        Only the events about the minion keys and starts are unpacked
+        '''
+        mtag, mdata = salt.utils.event.SaltEvent.unpack_tag(raw)
+        if mtag.startswith('salt/minion/') and mtag.endswith('/start'):
+            self.refresh(mtag[len('salt/minion/'):-len('/start')])
+        elif mtag in ('salt/auth', 'salt/key'):
+            data = self.event.serial.loads(mdata, encoding='utf-8')
+            if not isinstance(data, dict) or 'id' not in data:
+                return
+            if data.get('act') in ('delete', 'reject'):
+                self.drop(data['id'])
+            elif data.get('act') == 'accept' and data.get('result', True):
+                self.refresh(data['id'])
+        else:
+            return
+        if self.dirty:
+            self.save()
+            self.fire_events()
@@ -6,11 +6,13 @@ Decorator and functions to profile Salt using cProfile
 from __future__ import absolute_import, print_function, unicode_literals
 
 # Import Python libs
+import contextlib
 import datetime
 import logging
 import os
 import pstats
 import subprocess
+import time
 
 # Import Salt libs
 import salt.utils.files
@@ -18,6 +20,9 @@ import salt.utils.hashutils
 import salt.utils.path
 import salt.utils.stringutils
 
+# Import 3rd-party libs
+from salt.ext import six
+
 log = logging.getLogger(__name__)
 
 try:
@@ -101,3 +106,67 @@ def output_profile(pr, stats_path='/tmp/stats', stop=False, id_=None):
             if not stop:
                 pr.enable()
     return pr
+
+
+class PhaseProfiler(object):
+    '''
+    Record the wall clock time, the CPU time and the number of calls of the
+    nested phases of a run. Phases are keyed by the names of the enclosing
+    phases and their own, joined with ``;`` like the stacks of a flame graph.
+
+    With ``stats_path``, each top level phase is also profiled with cProfile,
+    the stats are written there by :py:meth:`dump_stats`.
+    '''
+    def __init__(self, enabled=True, stats_path=None):
+        self.enabled = enabled
+        self.stats_path = stats_path if HAS_CPROFILE else None
+        self.phases = {}
+        self._stack = []
+        self._profilers = {}
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        '''
+        Context manager recording the time spent in the block under ``name``
+        '''
+        if not self.enabled:
+            yield
+            return
+        self._stack.append(six.text_type(name).replace(';', ':'))
+        key = ';'.join(self._stack)
+        profiler = None
+        if self.stats_path and len(self._stack) == 1:
+            profiler = self._profilers.setdefault(key, cProfile.Profile())
+            profiler.enable()
+        start_wall = time.time()
+        start_cpu = sum(os.times()[:2])
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            stats = self.phases.setdefault(key, {'wall': 0.0, 'cpu': 0.0, 'calls': 0})
+            stats['wall'] += time.time() - start_wall
+            stats['cpu'] += sum(os.times()[:2]) - start_cpu
+            stats['calls'] += 1
+            self._stack.pop()
+
+    def dump_stats(self, id_):
+        '''
+        Write the cProfile stats of the top level phases to
+        ``<stats_path>/<id_>.<phase>.pstats`` and return the paths
+        '''
+        paths = []
+        if not self.stats_path or not self._profilers:
+            return paths
+        for name, profiler in six.iteritems(self._profilers):
+            path = os.path.join(self.stats_path, '{0}.{1}.pstats'.format(id_, name))
+            try:
+                if not os.path.isdir(self.stats_path):
+                    os.makedirs(self.stats_path)
+                profiler.dump_stats(path)
+            except (IOError, OSError) as exc:
+                log.error('Unable to write the profile of %s to %s: %s', name, path, exc)
+                continue
+            paths.append(path)
+        return paths
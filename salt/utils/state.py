@@ -246,4 +246,7 @@ def get_sls_opts(opts, **kwargs):
         else:
             opts['pillarenv'] = pillarenv
 
+    if kwargs.get('profile'):
+        opts['state_profile'] = True
+
     return opts
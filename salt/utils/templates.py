@@ -10,6 +10,7 @@ import codecs
 import os
 import logging
 import tempfile
+import threading
 import traceback
 import sys
 
@@ -49,6 +50,9 @@ log = logging.getLogger(__name__)
 
 TEMPLATE_DIRNAME = os.path.join(saltpath[0], 'templates')
 
+# The Jinja environments of each thread, see _get_jinja_env
+_JINJA_ENVS = threading.local()
+
 # FIXME: also in salt/template.py
 SLS_ENCODING = 'utf-8'  # this one has no BOM.
 SLS_ENCODER = codecs.getencoder(SLS_ENCODING)
@@ -287,6 +291,72 @@ def _get_jinja_error(trace, context=None):
     return line, out
 
 
+def _new_jinja_env(env_args):
+    jinja_env = jinja2.Environment(**env_args)
+
+    tojson_filter = jinja_env.filters.get('tojson')
+    jinja_env.tests.update(JinjaTest.salt_jinja_tests)
+    jinja_env.filters.update(JinjaFilter.salt_jinja_filters)
+    if tojson_filter is not None:
+        # Use the existing tojson filter, if present (jinja2 >= 2.9)
+        jinja_env.filters['tojson'] = tojson_filter
+    jinja_env.globals.update(JinjaGlobal.salt_jinja_globals)
+
+    # globals
+    jinja_env.globals['odict'] = OrderedDict
+    jinja_env.globals['show_full_context'] = salt.utils.jinja.show_full_context
+
+    jinja_env.tests['list'] = salt.utils.data.is_list
+    return jinja_env
+
+
+def _get_jinja_env(opts, env_args):
+    '''
+    Return a Jinja environment for env_args. The environments configured by
+    the same options are set up once per thread, each render gets an overlay
+    of it with the loader of the render and globals of its own, so that
+    nested renders do not change the environment of the outer ones.
+    '''
+    options = dict(env_args)
+    loader = options.pop('loader')
+    # The loader changes with every render, so the templates cached by the
+    # environment could never be reused. The bytecode cache is used instead.
+    options['cache_size'] = 0
+    key = repr(sorted(options.items()))
+    envs = _JINJA_ENVS.__dict__.setdefault('envs', {})
+    if key not in envs:
+        envs[key] = (_new_jinja_env(options),
+                     salt.utils.hashutils.sha256_digest(key)[:16])
+    base_env, prefix = envs[key]
+    directory = None
+    if opts.get('jinja_bytecode_cache', False) and opts.get('cachedir'):
+        directory = os.path.join(opts['cachedir'], 'jinja_bytecode')
+    jinja_env = base_env.overlay(
+        loader=loader,
+        bytecode_cache=salt.utils.jinja.SaltBytecodeCache(directory, prefix))
+    # The overlay shares the globals of the base environment otherwise
+    jinja_env.globals = dict(base_env.globals)
+    return jinja_env
+
+
+def _jinja_from_string(jinja_env, tmplstr, tmplpath):
+    '''
+    Like jinja_env.from_string, but reuse the bytecode compiled for the
+    template at tmplpath while its source is unchanged
+    '''
+    if not tmplpath or jinja_env.bytecode_cache is None:
+        return jinja_env.from_string(tmplstr)
+    bucket = jinja_env.bytecode_cache.get_bucket(
+        jinja_env, '<template>', tmplpath, tmplstr)
+    code = bucket.code
+    if code is None:
+        code = jinja_env.compile(tmplstr)
+        bucket.code = code
+        jinja_env.bytecode_cache.set_bucket(bucket)
+    return jinja_env.template_class.from_code(
+        jinja_env, code, jinja_env.make_globals(None), None)
+
+
 def render_jinja_tmpl(tmplstr, context, tmplpath=None):
     opts = context['opts']
     saltenv = context['saltenv']
@@ -351,25 +421,9 @@ def render_jinja_tmpl(tmplstr, context, tmplpath=None):
     else:
         opt_jinja_env_helper(opt_jinja_env, 'jinja_env')
 
-    if opts.get('allow_undefined', False):
-        jinja_env = jinja2.Environment(**env_args)
-    else:
-        jinja_env = jinja2.Environment(undefined=jinja2.StrictUndefined,
-                                       **env_args)
-
-    tojson_filter = jinja_env.filters.get('tojson')
-    jinja_env.tests.update(JinjaTest.salt_jinja_tests)
-    jinja_env.filters.update(JinjaFilter.salt_jinja_filters)
-    if tojson_filter is not None:
-        # Use the existing tojson filter, if present (jinja2 >= 2.9)
-        jinja_env.filters['tojson'] = tojson_filter
-    jinja_env.globals.update(JinjaGlobal.salt_jinja_globals)
-
-    # globals
-    jinja_env.globals['odict'] = OrderedDict
-    jinja_env.globals['show_full_context'] = salt.utils.jinja.show_full_context
-
-    jinja_env.tests['list'] = salt.utils.data.is_list
+    if not opts.get('allow_undefined', False):
+        env_args['undefined'] = jinja2.StrictUndefined
+    jinja_env = _get_jinja_env(opts, env_args)
 
     decoded_context = {}
     for key, value in six.iteritems(context):
@@ -387,7 +441,7 @@ def render_jinja_tmpl(tmplstr, context, tmplpath=None):
             decoded_context[key] = salt.utils.data.decode(value)
 
     try:
-        template = jinja_env.from_string(tmplstr)
+        template = _jinja_from_string(jinja_env, tmplstr, tmplpath)
         template.globals.update(decoded_context)
         output = template.render(**decoded_context)
     except jinja2.exceptions.UndefinedError as exc:
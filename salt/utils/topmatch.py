@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+'''
+Cache the rendered top files and the results of matching their targets
+
+.. versionadded:: Fluorine
+
+Used by :py:class:`salt.state.BaseHighState` and :py:class:`salt.pillar.Pillar`
+when the ``top_match_cache`` option is set. A rendered top file is reused as
+long as the file is unchanged and, if it is a template, as long as the id, the
+grains and the pillar of the minion are unchanged. Top files which call
+execution modules, import or include other templates, or are rendered by
+another renderer than jinja and yaml are always rendered. The result of
+matching a target is reused as long as the inputs this target reads, i.e. the
+minion id or the grains and pillar keys it references, are unchanged.
+'''
+
+# Import python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import logging
+import os
+
+# Import Salt libs
+import salt.payload
+import salt.utils.atomicfile
+import salt.utils.files
+import salt.utils.hashutils
+import salt.utils.json
+import salt.utils.minions
+from salt.defaults import DEFAULT_TARGET_DELIM
+from salt.ext import six
+from salt.utils.odict import OrderedDict
+
+log = logging.getLogger(__name__)
+
+# Bump when the layout of the cache files or of the references changes
+CACHE_VERSION = 1
+
+# The markers of a template, whose rendering depends on the minion data
+_TEMPLATE_MARKERS = (b'{%', b'{{', b'{#')
+
+# The markers of a template whose rendering depends on more than the minion
+# data, i.e. on other files or on execution modules
+_DYNAMIC_MARKERS = (b'salt[', b'salt.', b'import', b'include', b'extends')
+
+# The markers of the templating engines other than jinja
+_OTHER_TEMPLATE_MARKERS = (b'${', b'<%')
+
+# The renderers which render a top file out of its contents and the minion
+# data alone
+_STATIC_RENDERERS = ('jinja', 'yaml', 'yamlex', 'json')
+
+_OPERATORS = ('and', 'or', 'not', '(', ')')
+
+
+def _digest(value):
+    '''
+    Return the digest of a JSON serializable value, or None if it is not one
+    '''
+    try:
+        return salt.utils.hashutils.sha256_digest(
+            salt.utils.json.dumps(value, sort_keys=True, default=repr))
+    except (TypeError, ValueError):
+        return None
+
+
+def _subdict_refs(kind, tgt, delimiter):
+    # The grain and pillar matchers traverse the data from the key before
+    # the first delimiter
+    if not isinstance(tgt, six.string_types):
+        return None
+    return [[kind, tgt.split(delimiter or DEFAULT_TARGET_DELIM, 1)[0]]]
+
+
+def _compound_refs(tgt, nodegroups):
+    if isinstance(tgt, six.string_types):
+        words = tgt.split()
+    elif isinstance(tgt, (list, tuple)):
+        words = list(tgt)
+    else:
+        return None
+    refs = []
+    while words:
+        word = words.pop(0)
+        if word in _OPERATORS:
+            continue
+        target_info = salt.utils.minions.parse_target(word)
+        engine = target_info['engine']
+        if engine == 'N':
+            decomposed = salt.utils.minions.nodegroup_comp(
+                target_info['pattern'], nodegroups)
+            if decomposed:
+                words = decomposed + words
+            continue
+        if engine in ('G', 'P'):
+            refs.extend(_subdict_refs(
+                'grains', target_info['pattern'], target_info['delimiter']))
+        elif engine in ('I', 'J'):
+            refs.extend(_subdict_refs(
+                'pillar', target_info['pattern'], target_info['delimiter']))
+        elif engine == 'S':
+            refs.extend([['grains', 'ipv4'], ['grains', 'ipv6']])
+        elif engine == 'R':
+            # Range targets depend on the range server
+            return None
+        else:
+            refs.append(['id'])
+    return refs
+
+
+def references(matcher, tgt, opts, nodegroups=None):
+    '''
+    Return the inputs which the result of matching ``tgt`` with ``matcher``
+    depends on, as a list of ``['id']``, ``['grains', key]`` and ``['pillar',
+    key]`` items. Return None if the result depends on something else, such as
+    the minion data store or a range server, and cannot be cached.
+    '''
+    if matcher in ('glob', 'pcre', 'list'):
+        return [['id']]
+    if matcher in ('grain', 'grain_pcre'):
+        return _subdict_refs('grains', tgt, DEFAULT_TARGET_DELIM)
+    if matcher in ('pillar', 'pillar_pcre', 'pillar_exact'):
+        return _subdict_refs('pillar', tgt, DEFAULT_TARGET_DELIM)
+    if matcher == 'ipcidr':
+        return [['grains', 'ipv4'], ['grains', 'ipv6']]
+    if matcher == 'nodegroup':
+        if not isinstance(nodegroups, dict) or tgt not in nodegroups:
+            return []
+        return _compound_refs(
+            salt.utils.minions.nodegroup_comp(tgt, nodegroups),
+            opts.get('nodegroups', {}))
+    if matcher == 'compound':
+        return _compound_refs(tgt, opts.get('nodegroups', {}))
+    return None
+
+
+class TopMatchCache(object):
+    '''
+    On-disk cache of the rendered top files and of the top target matches of
+    one minion, stored in ``<cachedir>/top_match/<kind>/<minion id>.p``
+    '''
+    def __init__(self, opts, kind):
+        self.opts = opts
+        self.enabled = bool(opts.get('top_match_cache', False))
+        self.path = os.path.join(
+            opts.get('cachedir', ''),
+            'top_match',
+            kind,
+            '{0}.p'.format(opts.get('id')))
+        self.serial = salt.payload.Serial(opts)
+        self.data = None
+        self.dirty = False
+        self.used = {'tops': set(), 'matches': set()}
+        self.inputs = {}
+
+    def _load(self):
+        if self.data is not None:
+            return self.data
+        data = None
+        try:
+            with salt.utils.files.fopen(self.path, 'rb') as fp_:
+                data = self.serial.load(fp_)
+        except (IOError, OSError):
+            pass
+        except Exception as exc:
+            log.warning('Unable to read the top match cache %s: %s', self.path, exc)
+        if not isinstance(data, dict) or data.get('version') != CACHE_VERSION:
+            data = {}
+        self.data = {
+            'version': CACHE_VERSION,
+            'tops': data.get('tops', {}),
+            'matches': data.get('matches', {}),
+        }
+        return self.data
+
+    def _input(self, ref):
+        '''
+        Return the digest of an input referenced by the targets, computed once
+        until the next :py:meth:`save`
+        '''
+        key = tuple(ref)
+        if key not in self.inputs:
+            if ref[0] == 'id':
+                value = self.opts.get('id')
+            else:
+                value = (self.opts.get(ref[0]) or {}).get(ref[1])
+            self.inputs[key] = _digest(value)
+        return self.inputs[key]
+
+    def compile_top(self, path, saltenv, render):
+        '''
+        Return the top file at ``path`` as rendered by ``render()``, which is
+        only called if the file, or the minion data a template renders, changed
+        since it was last rendered
+        '''
+        if not self.enabled or not path:
+            return render()
+        try:
+            with salt.utils.files.fopen(path, 'rb') as fp_:
+                contents = fp_.read()
+        except (IOError, OSError):
+            return render()
+        if contents.startswith(b'#!') \
+                or any(marker in contents for marker in _OTHER_TEMPLATE_MARKERS):
+            # A renderer pipeline of its own, which may render anything
+            return render()
+        renderers = (self.opts.get('renderer') or 'jinja|yaml').split('|')
+        if any(rend.strip() not in _STATIC_RENDERERS for rend in renderers):
+            return render()
+        template = any(marker in contents for marker in _TEMPLATE_MARKERS)
+        if template and any(marker in contents for marker in _DYNAMIC_MARKERS):
+            return render()
+        parts = [saltenv, self.opts.get('renderer'),
+                 salt.utils.hashutils.sha256_digest(contents)]
+        if template:
+            parts.extend([self._input(['id']),
+                          _digest(self.opts.get('grains', {})),
+                          _digest(self.opts.get('pillar', {}))])
+        key = _digest(parts)
+        cache = self._load()
+        self.used['tops'].add(key)
+        if key in cache['tops']:
+            try:
+                return salt.utils.json.loads(
+                    cache['tops'][key], object_pairs_hook=OrderedDict)
+            except ValueError:
+                pass
+        ret = render()
+        try:
+            cache['tops'][key] = salt.utils.json.dumps(ret)
+        except (TypeError, ValueError):
+            # Not JSON serializable, e.g. the dates of a YAML top file
+            cache['tops'].pop(key, None)
+        else:
+            self.dirty = True
+        return ret
+
+    def confirm_top(self, matcher, tgt, nodegroups, confirm):
+        '''
+        Return the result of matching ``tgt`` with ``matcher``, which is
+        computed by ``confirm()`` only if the inputs it reads changed
+        '''
+        if not self.enabled:
+            return confirm()
+        refs = references(matcher, tgt, self.opts, nodegroups)
+        key = _digest([matcher, tgt, nodegroups if matcher == 'nodegroup' else None,
+                       self.opts.get('nodegroups', {})])
+        if refs is None or key is None:
+            return confirm()
+        inputs = [self._input(ref) for ref in refs]
+        cache = self._load()
+        self.used['matches'].add(key)
+        cached = cache['matches'].get(key)
+        if cached is not None and cached[0] == inputs:
+            return cached[1]
+        ret = confirm()
+        cache['matches'][key] = [inputs, ret]
+        self.dirty = True
+        return ret
+
+    def save(self):
+        '''
+        Write the cache, dropping the entries unused since the last save
+        '''
+        self.inputs = {}
+        if not self.enabled or self.data is None:
+            return
+        used, self.used = self.used, {'tops': set(), 'matches': set()}
+        for name in ('tops', 'matches'):
+            unused = set(self.data[name]) - used[name]
+            if unused:
+                self.dirty = True
+                for key in unused:
+                    del self.data[name][key]
+        if not self.dirty:
+            return
+        try:
+            if not os.path.isdir(os.path.dirname(self.path)):
+                os.makedirs(os.path.dirname(self.path))
+            with salt.utils.atomicfile.atomic_open(self.path, 'wb') as fp_:
+                self.serial.dump(self.data, fp_)
+            self.dirty = False
+        except (IOError, OSError) as exc:
+            log.warning('Unable to write the top match cache %s: %s', self.path, exc)
@@ -61,6 +61,16 @@ class NetapiClientTest(TestCase):
         ret['minions'] = sorted(ret['minions'])
         self.assertEqual(ret, {'minions': sorted(['minion', 'sub_minion', 'localhost'])})
 
+    def test_local_async_stream(self):
+        low = {'client': 'local_async_stream', 'tgt': '*', 'fun': 'test.ping'}
+        low.update(self.eauth_creds)
+
+        rets = list(self.netapi.run(low))
+        self.assertEqual(len(rets), 3)
+        self.assertIn({'localhost': True}, rets)
+        self.assertIn({'sub_minion': True}, rets)
+        self.assertIn({'minion': True}, rets)
+
     def test_wheel(self):
         low = {'client': 'wheel', 'fun': 'key.list_all'}
         low.update(self.eauth_creds)
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+'''
+Time the pillar merge strategies and salt.utils.data.decode/encode on large
+synthetic pillars
+
+Usage::
+
+    python tests/perf/merge_pillar.py [--sls 50] [--keys 20] [--depth 3] [--runs 5]
+
+Each synthetic pillar is built like a top file matching ``--sls`` SLS files
+which all render a tree of ``--keys`` keys per level, ``--depth`` levels deep,
+partly overlapping with each other. The SLS files are merged one after the
+other, the way Pillar.render_pillar does it.
+'''
+
+# Import python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import optparse
+import sys
+import timeit
+
+# Import salt libs
+import salt.utils.data
+import salt.utils.dictupdate
+from salt.ext.six.moves import range  # pylint: disable=redefined-builtin
+
+STRATEGIES = ('smart', 'recurse', 'overwrite', 'aggregate')
+
+
+def make_sls(index, keys, depth):
+    '''
+    Build the data rendered by one synthetic SLS file. Half of the keys of
+    every level are shared by all SLS files, so that they have to be merged.
+    '''
+    def _level(level):
+        ret = {}
+        for key in range(keys):
+            name = 'key{0}'.format(key) if key % 2 else 'sls{0}_key{1}'.format(index, key)
+            if level < depth:
+                ret[name] = _level(level + 1)
+            elif key % 3:
+                ret[name] = 'value {0} of sls {1}'.format(key, index)
+            else:
+                ret[name] = [index, key, 'item {0}'.format(key)]
+        return ret
+    return _level(1)
+
+
+def merge_all(pstates, strategy, merge_lists):
+    pillar = {}
+    for pstate in pstates:
+        pillar = salt.utils.dictupdate.merge(
+            pillar, pstate, strategy, 'yaml', merge_lists, copy_on_write=True)
+    return pillar
+
+
+def count(data):
+    if isinstance(data, dict):
+        return sum(count(val) for val in data.values()) + len(data)
+    if isinstance(data, list):
+        return sum(count(val) for val in data) + len(data)
+    return 0
+
+
+def report(name, timings):
+    print('{0:<30} best {1:>8.3f}s  mean {2:>8.3f}s'.format(
+        name, min(timings), sum(timings) / len(timings)))
+
+
+def main():
+    parser = optparse.OptionParser()
+    parser.add_option('--sls', type='int', default=50,
+                      help='Number of SLS files merged into the pillar')
+    parser.add_option('--keys', type='int', default=20,
+                      help='Number of keys on each level of an SLS file')
+    parser.add_option('--depth', type='int', default=3,
+                      help='Depth of the data of an SLS file')
+    parser.add_option('--runs', type='int', default=5,
+                      help='Number of timed runs of each benchmark')
+    options, _ = parser.parse_args()
+
+    pstates = [make_sls(index, options.keys, options.depth)
+               for index in range(options.sls)]
+    pillar = merge_all(pstates, 'recurse', False)
+    print('{0} SLS files, {1} values in the merged pillar'.format(
+        options.sls, count(pillar)))
+
+    for strategy in STRATEGIES:
+        for merge_lists in (False, True):
+            if merge_lists and strategy == 'aggregate':
+                # The aggregate strategy always merges lists
+                continue
+            timings = timeit.repeat(
+                lambda: merge_all(pstates, strategy, merge_lists),
+                number=1,
+                repeat=options.runs)
+            report('merge {0}{1}'.format(
+                strategy, ' (merge_lists)' if merge_lists else ''), timings)
+
+    encoded = salt.utils.data.encode(pillar)
+    for name, func, data in (('decode (decoded)', salt.utils.data.decode, pillar),
+                             ('decode (encoded)', salt.utils.data.decode, encoded),
+                             ('encode (decoded)', salt.utils.data.encode, pillar),
+                             ('encode (encoded)', salt.utils.data.encode, encoded)):
+        timings = timeit.repeat(lambda: func(data), number=1, repeat=options.runs)
+        report(name, timings)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+'''
+Time the rendering of a formula-heavy tree of Jinja SLS files
+
+Usage::
+
+    python tests/perf/render_jinja.py [--sls 200] [--macros 50] [--runs 3] [--bytecode-cache]
+
+A temporary file_roots is filled with a ``map.jinja`` and a ``macros.jinja``
+library of ``--macros`` macros, and ``--sls`` SLS files which all import both
+of them, the way formulas do. Every run renders all the SLS files, the way a
+highstate does. Pass ``--bytecode-cache`` to set ``jinja_bytecode_cache``.
+'''
+
+# Import python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import optparse
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+# Import salt libs
+import salt.config
+import salt.utils.files
+import salt.utils.templates
+from salt.ext.six.moves import range  # pylint: disable=redefined-builtin
+
+MAP = '''\
+{% set defaults = {
+    'Debian': {'pkg': 'nginx', 'service': 'nginx', 'conf': '/etc/nginx'},
+    'RedHat': {'pkg': 'nginx', 'service': 'nginx', 'conf': '/etc/nginx'},
+} %}
+{% set server = salt['grains.filter_by'](defaults, grain='os_family', merge=pillar.get('nginx', {})) %}
+'''
+
+MACRO = '''\
+{{% macro macro{0}(name, options={{}}) -%}}
+{{{{ name }}}}_{0}:
+  file.managed:
+    - name: /etc/app/{{{{ name }}}}/{0}.conf
+    - contents: |
+{{%- for key, value in options|dictsort %}}
+        {{{{ key }}}} = {{{{ value }}}}
+{{%- endfor %}}
+{{%- if options.get('watch') %}}
+    - watch_in:
+      - service: {{{{ name }}}}
+{{%- endif %}}
+{{%- endmacro %}}
+'''
+
+SLS = '''\
+{{% from 'map.jinja' import server with context %}}
+{{% import 'macros.jinja' as macros with context %}}
+{{{{ server.pkg }}}}_{0}:
+  pkg.installed:
+    - name: {{{{ server.pkg }}}}
+{{% for index in range({1}) %}}
+{{{{ macros['macro' ~ index]('app{0}', {{'index': index, 'watch': index is even}}) }}}}
+{{% endfor %}}
+'''
+
+
+def make_roots(root, sls, macros):
+    with salt.utils.files.fopen(os.path.join(root, 'map.jinja'), 'w') as fp_:
+        fp_.write(MAP)
+    with salt.utils.files.fopen(os.path.join(root, 'macros.jinja'), 'w') as fp_:
+        for index in range(macros):
+            fp_.write(MACRO.format(index))
+    paths = []
+    for index in range(sls):
+        path = os.path.join(root, 'sls{0}.sls'.format(index))
+        with salt.utils.files.fopen(path, 'w') as fp_:
+            fp_.write(SLS.format(index, min(macros, 10)))
+        paths.append(path)
+    return paths
+
+
+def render_all(opts, paths):
+    def _filter_by(lookup, grain='os_family', merge=None):
+        ret = dict(lookup[opts['grains'][grain]])
+        ret.update(merge or {})
+        return ret
+    for path in paths:
+        salt.utils.templates.JINJA(
+            path,
+            to_str=True,
+            salt={'grains.filter_by': _filter_by},
+            grains=opts['grains'],
+            pillar={},
+            opts=opts,
+            saltenv='base',
+            sls=os.path.basename(path)[:-4])
+
+
+def main():
+    parser = optparse.OptionParser()
+    parser.add_option('--sls', type='int', default=200,
+                      help='Number of SLS files rendered by each run')
+    parser.add_option('--macros', type='int', default=50,
+                      help='Number of macros in the macro library')
+    parser.add_option('--runs', type='int', default=3,
+                      help='Number of timed runs')
+    parser.add_option('--bytecode-cache', action='store_true', default=False,
+                      help='Set jinja_bytecode_cache')
+    options, _ = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    try:
+        root = os.path.join(tmp, 'roots')
+        os.makedirs(root)
+        paths = make_roots(root, options.sls, options.macros)
+        opts = salt.config.DEFAULT_MINION_OPTS.copy()
+        opts.update({'file_client': 'local',
+                     'file_roots': {'base': [root]},
+                     'cachedir': os.path.join(tmp, 'cache'),
+                     'grains': {'os_family': 'Debian'},
+                     'jinja_bytecode_cache': options.bytecode_cache})
+        opts['pillar_roots'] = opts['file_roots']
+        timings = timeit.repeat(
+            lambda: render_all(opts, paths), number=1, repeat=options.runs)
+        print('{0} SLS files importing {1} macros'.format(
+            options.sls, options.macros))
+        print('first run {0:.3f}s, best {1:.3f}s, mean {2:.3f}s'.format(
+            timings[0], min(timings), sum(timings) / len(timings)))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
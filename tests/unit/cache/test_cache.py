@@ -5,11 +5,16 @@ unit tests for the localfs cache
 
 # Import Python libs
 from __future__ import absolute_import, print_function, unicode_literals
+import os
+import shutil
+import tempfile
+import time
 
 # Import Salt Testing libs
 # import integration
 from tests.support.unit import skipIf, TestCase
 from tests.support.mock import (
+    MagicMock,
     NO_MOCK,
     NO_MOCK_REASON,
     patch,
@@ -18,6 +23,9 @@ from tests.support.mock import (
 # Import Salt libs
 import salt.payload
 import salt.cache
+import salt.exceptions
+import salt.utils.event
+import salt.utils.stringutils
 
 
 class CacheFunctionsTest(TestCase):
@@ -217,3 +225,272 @@ class MemCacheTest(TestCase):
         # Check debug data
         self.assertEqual(self.cache.call, 6)
         self.assertEqual(self.cache.hit, 3)
+
+
+class FakeDriverMixin(object):
+    '''
+    Patch the cache loader to return the functions of a fake_driver cache
+    module, which stores the data in ``self.stored``
+    '''
+    def setUp(self):
+        self.stored = {}
+        self.modules = {
+            'fake_driver.fetch': MagicMock(
+                side_effect=lambda bank, key, **kwargs: self.stored.get((bank, key), {})),
+            'fake_driver.store': MagicMock(
+                side_effect=lambda bank, key, data, **kwargs: self.stored.update({(bank, key): data})),
+            'fake_driver.list': MagicMock(return_value=[]),
+            'fake_driver.contains': MagicMock(return_value=False),
+            'fake_driver.flush': MagicMock(),
+        }
+        patcher = patch('salt.loader.cache', MagicMock(return_value=self.modules))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class WriteBehindTest(FakeDriverMixin, TestCase):
+    '''
+    Validate the delayed cache stores
+    '''
+    def setUp(self):
+        super(WriteBehindTest, self).setUp()
+        self.opts = {'cache': 'fake_driver',
+                     'cache_write_window': 10,
+                     'cache_write_max_items': 3}
+        self.cache = salt.cache.factory(self.opts)
+        self.addCleanup(salt.cache._PENDING.discard, self.cache)
+
+    def test_window(self):
+        with patch('time.time', return_value=0):
+            self.cache.store('minions/alpha', 'data', {'grains': 1})
+            self.cache.store('minions/alpha', 'data', {'grains': 2})
+        self.assertFalse(self.modules['fake_driver.store'].called)
+        # The delayed stores are seen by the cache object
+        self.assertEqual(self.cache.fetch('minions/alpha', 'data'), {'grains': 2})
+        self.assertEqual(self.cache.updated('minions/alpha', 'data'), 0)
+        self.assertEqual(self.cache.list('minions'), ['alpha'])
+        self.assertTrue(self.cache.contains('minions'))
+        self.assertTrue(self.cache.contains('minions/alpha', 'data'))
+        self.assertFalse(self.cache.contains('minions/alpha', 'mine'))
+
+        with patch('time.time', return_value=10):
+            self.cache.store('minions/beta', 'data', {'grains': 3})
+        self.assertEqual(self.stored, {('minions/alpha', 'data'): {'grains': 2},
+                                       ('minions/beta', 'data'): {'grains': 3}})
+        self.assertNotIn(self.cache, salt.cache._PENDING)
+
+    def test_max_items(self):
+        with patch('time.time', return_value=0):
+            for minion in ('alpha', 'beta'):
+                self.cache.store('minions/{0}'.format(minion), 'data', {})
+            self.assertFalse(self.modules['fake_driver.store'].called)
+            self.cache.store('minions/gamma', 'data', {})
+        self.assertEqual(self.modules['fake_driver.store'].call_count, 3)
+
+    def test_unchanged(self):
+        self.stored[('minions/alpha', 'data')] = {'grains': 1}
+        self.cache.store('minions/alpha', 'data', {'grains': 1})
+        self.cache.store('minions/beta', 'data', {'grains': 1})
+        salt.cache.write_pending()
+        self.modules['fake_driver.store'].assert_called_once_with(
+            'minions/beta', 'data', {'grains': 1})
+
+    def test_store_many(self):
+        self.modules['fake_driver.store_many'] = MagicMock(return_value=1)
+        self.cache.store('minions/alpha', 'data', {'grains': 1})
+        self.cache.store('minions/beta', 'mine', {})
+        self.cache.write_pending()
+        self.modules['fake_driver.store_many'].assert_called_once_with(
+            [('minions/alpha', 'data', self.cache.serial.dumps({'grains': 1})),
+             ('minions/beta', 'mine', self.cache.serial.dumps({}))])
+
+    def test_flush(self):
+        self.cache.write_max = 10
+        self.cache.store('minions/alpha', 'data', {})
+        self.cache.store('minions/alpha', 'mine', {})
+        self.cache.store('minions/beta', 'data', {})
+        self.cache.flush('minions/alpha', 'mine')
+        self.assertEqual(self.cache.list('minions'), ['alpha', 'beta'])
+        self.cache.flush('minions')
+        self.assertEqual(self.cache.list('minions'), [])
+        self.cache.write_pending()
+        self.assertFalse(self.modules['fake_driver.store'].called)
+
+    def test_failure(self):
+        self.modules['fake_driver.store_many'] = MagicMock(
+            side_effect=salt.exceptions.SaltCacheError('unavailable'))
+        with patch('time.time', return_value=0):
+            self.cache.store('minions/alpha', 'data', {'grains': 1})
+            self.cache.store('minions/beta', 'data', {'grains': 2})
+            # The failure is not raised from an unrelated store
+            self.cache.store('minions/gamma', 'data', {'grains': 3})
+        self.assertEqual(self.modules['fake_driver.store_many'].call_count, 1)
+        # The stores stay pending, and are retried after another window
+        self.assertEqual(self.cache.fetch('minions/alpha', 'data'), {'grains': 1})
+        with patch('time.time', return_value=5):
+            self.cache.store('minions/delta', 'data', {'grains': 4})
+            self.assertEqual(self.modules['fake_driver.store_many'].call_count, 1)
+            self.assertRaises(salt.exceptions.SaltCacheError, self.cache.write_pending)
+        self.modules['fake_driver.store_many'].side_effect = None
+        self.modules['fake_driver.store_many'].return_value = 4
+        with patch('time.time', return_value=20):
+            self.cache.store('minions/alpha', 'data', {'grains': 5})
+        self.assertEqual(
+            self.modules['fake_driver.store_many'].call_args[0][0],
+            [('minions/alpha', 'data', self.cache.serial.dumps({'grains': 5})),
+             ('minions/beta', 'data', self.cache.serial.dumps({'grains': 2})),
+             ('minions/gamma', 'data', self.cache.serial.dumps({'grains': 3})),
+             ('minions/delta', 'data', self.cache.serial.dumps({'grains': 4}))])
+        self.assertEqual(self.cache.list('minions'), [])
+        self.assertNotIn(self.cache, salt.cache._PENDING)
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class FetchManyTest(FakeDriverMixin, TestCase):
+    '''
+    Validate the bulk fetches
+    '''
+    def setUp(self):
+        super(FetchManyTest, self).setUp()
+        salt.cache.MemCache.data = {}
+        self.opts = {'cache': 'fake_driver'}
+        self.stored.update({('minions/alpha', 'data'): {'grains': 1},
+                            ('minions/alpha', 'mine'): {'fun': 2},
+                            ('minions/beta', 'data'): {'grains': 3}})
+        self.modules['fake_driver.list'].return_value = ['data', 'mine', 'sub']
+
+    def test_fetch_many(self):
+        cache = salt.cache.factory(self.opts)
+        bank_keys = [('minions/alpha', 'data'), ('minions/beta', 'data'), ('minions/gamma', 'data')]
+        expected = {('minions/alpha', 'data'): {'grains': 1},
+                    ('minions/beta', 'data'): {'grains': 3},
+                    ('minions/gamma', 'data'): {}}
+        self.assertEqual(cache.fetch_many(bank_keys), expected)
+        self.assertEqual(self.modules['fake_driver.fetch'].call_count, 3)
+
+        # The driver function only returns the keys found
+        self.modules['fake_driver.fetch_many'] = MagicMock(
+            side_effect=lambda bank_keys, **kwargs: dict(
+                (bank_key, self.stored[bank_key]) for bank_key in bank_keys
+                if bank_key in self.stored))
+        self.assertEqual(cache.fetch_many(bank_keys), expected)
+        self.modules['fake_driver.fetch_many'].assert_called_once_with(bank_keys)
+
+    def test_fetch_many_pending(self):
+        self.opts['cache_write_window'] = 10
+        self.modules['fake_driver.fetch_many'] = MagicMock(return_value={})
+        cache = salt.cache.factory(self.opts)
+        self.addCleanup(salt.cache._PENDING.discard, cache)
+        cache.store('minions/alpha', 'data', {'grains': 4})
+        ret = cache.fetch_many([('minions/alpha', 'data'), ('minions/beta', 'data')])
+        self.assertEqual(ret[('minions/alpha', 'data')], {'grains': 4})
+        self.modules['fake_driver.fetch_many'].assert_called_once_with(
+            [('minions/beta', 'data')])
+
+    def test_fetch_bank(self):
+        cache = salt.cache.factory(self.opts)
+        # Without a driver function, the sub-banks are told apart by their
+        # lack of data
+        self.assertEqual(cache.fetch_bank('minions/alpha'),
+                         {'data': {'grains': 1}, 'mine': {'fun': 2}})
+        self.modules['fake_driver.fetch_bank'] = MagicMock(return_value={'data': {}})
+        self.assertEqual(cache.fetch_bank('minions/alpha'), {'data': {}})
+
+    def test_memcache_fetch_many(self):
+        self.opts['memcache_expire_seconds'] = 10
+        cache = salt.cache.factory(self.opts)
+        cache.fetch('minions/alpha', 'data')
+        self.modules['fake_driver.fetch'].reset_mock()
+        ret = cache.fetch_many([('minions/alpha', 'data'), ('minions/beta', 'data')])
+        self.assertEqual(ret, {('minions/alpha', 'data'): {'grains': 1},
+                               ('minions/beta', 'data'): {'grains': 3}})
+        self.modules['fake_driver.fetch'].assert_called_once_with('minions/beta', 'data')
+        self.assertEqual(cache.fetch('minions/beta', 'data'), {'grains': 3})
+        self.assertEqual(self.modules['fake_driver.fetch'].call_count, 1)
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class MemCacheTiersTest(FakeDriverMixin, TestCase):
+    '''
+    Validate the memcache bounds and the shared memcache
+    '''
+    def setUp(self):
+        super(MemCacheTiersTest, self).setUp()
+        salt.cache.MemCache.data = {}
+        salt.cache.MemCache.sizes = {}
+        salt.cache.MemCache.nbytes = {}
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.opts = {'cache': 'fake_driver',
+                     'cachedir': self.tmp,
+                     'sock_dir': self.tmp,
+                     'memcache_expire_seconds': 10,
+                     'memcache_max_items': 100}
+
+    def test_max_bytes(self):
+        self.opts['memcache_max_bytes'] = 250
+        cache = salt.cache.factory(self.opts)
+        for key in ('key1', 'key2', 'key3'):
+            cache.store('bank', key, 'x' * 100)
+        self.assertEqual(list(cache.storage), [('bank', 'key2'), ('bank', 'key3')])
+        # The least recently used value is evicted first
+        cache.fetch('bank', 'key2')
+        cache.store('bank', 'key4', 'x' * 100)
+        self.assertEqual(list(cache.storage), [('bank', 'key2'), ('bank', 'key4')])
+        self.assertEqual(salt.cache.MemCache.nbytes['fake_driver'],
+                         2 * len(cache.serial.dumps('x' * 100)))
+        # The values larger than the limit are not kept
+        cache.store('bank', 'key5', 'x' * 300)
+        self.assertNotIn(('bank', 'key5'), cache.storage)
+        cache.flush('bank')
+        self.assertEqual(salt.cache.MemCache.nbytes['fake_driver'], 0)
+
+    def test_shared(self):
+        self.opts['memcache_shared'] = True
+        self.stored[('minions/alpha', 'data')] = {'grains': 1}
+        event = MagicMock()
+        with patch('salt.utils.event.get_master_event', MagicMock(return_value=event)):
+            cache = salt.cache.factory(self.opts)
+            self.assertEqual(cache.fetch('minions/alpha', 'data'), {'grains': 1})
+            self.assertEqual(self.modules['fake_driver.fetch'].call_count, 1)
+            # Another process finds the value in the shared tier
+            salt.cache.MemCache.data = {}
+            other = salt.cache.factory(self.opts)
+            self.assertEqual(other.fetch_many([('minions/alpha', 'data')]),
+                             {('minions/alpha', 'data'): {'grains': 1}})
+            self.assertEqual(self.modules['fake_driver.fetch'].call_count, 1)
+
+            # Writing a value drops it from the shared tier and tells the
+            # other processes
+            other.store('minions/alpha', 'data', {'grains': 2})
+            self.assertFalse(os.path.exists(other._shared_path('minions/alpha', 'data')))
+            data, tag = event.fire_event.call_args[0]
+            self.assertEqual(tag, 'salt/cache/store')
+            self.assertEqual(data['keys'], [['minions/alpha', 'data']])
+
+        salt.cache.MemCache._listener = MagicMock(serial=cache.serial)
+        self.addCleanup(setattr, salt.cache.MemCache, '_listener', None)
+        raw = salt.utils.stringutils.to_bytes(tag + salt.utils.event.TAGEND)
+        # The process writing the value keeps it
+        salt.cache.MemCache._handle_event(raw + cache.serial.dumps(data))
+        self.assertIn(('minions/alpha', 'data'), other.storage)
+        data['pid'] = -1
+        salt.cache.MemCache._handle_event(raw + cache.serial.dumps(data))
+        self.assertNotIn(('minions/alpha', 'data'), other.storage)
+
+    def test_clean_shared(self):
+        self.opts['memcache_shared'] = True
+        self.stored[('minions/alpha', 'data')] = {'grains': 1}
+        self.stored[('minions/beta', 'data')] = {'grains': 2}
+        cache = salt.cache.factory(self.opts)
+        cache.fetch('minions/alpha', 'data')
+        cache.fetch('minions/beta', 'data')
+        expired = cache._shared_path('minions/alpha', 'data')
+        fresh = cache._shared_path('minions/beta', 'data')
+        past = time.time() - 60
+        os.utime(expired, (past, past))
+        salt.cache.MemCache.clean_shared(self.opts)
+        self.assertFalse(os.path.exists(os.path.dirname(expired)))
+        self.assertTrue(os.path.exists(fresh))
+        self.assertTrue(os.path.isdir(os.path.join(self.tmp, 'memcache')))
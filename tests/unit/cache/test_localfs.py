@@ -103,6 +103,25 @@ class LocalFSTest(TestCase, LoaderModuleMockMixin):
             for line in fh_:
                 self.assertIn(b'payload data', line)
 
+    def test_store_many(self):
+        '''
+        Tests that store_many only writes the files whose data changed.
+        '''
+        tmp_dir = tempfile.mkdtemp(dir=TMP)
+        serial = salt.payload.Serial(self)
+        self._create_tmp_cache_file(tmp_dir, serial)
+        key_file = os.path.join(tmp_dir, 'bank', 'key.p')
+        os.utime(key_file, (0, 0))
+        inode = os.stat(key_file).st_ino
+        items = [('bank', 'key', serial.dumps('payload data')),
+                 ('bank', 'key2', serial.dumps('other data'))]
+        self.assertEqual(localfs.store_many(items, cachedir=tmp_dir), 1)
+        # The unchanged file is touched, not written again
+        self.assertEqual(os.stat(key_file).st_ino, inode)
+        self.assertNotEqual(os.path.getmtime(key_file), 0)
+        with salt.utils.files.fopen(os.path.join(tmp_dir, 'bank', 'key2.p'), 'rb') as fh_:
+            self.assertEqual(serial.load(fh_), 'other data')
+
     # 'fetch' function tests: 3
 
     def test_fetch_return_when_cache_file_does_not_exist(self):
@@ -140,6 +159,19 @@ class LocalFSTest(TestCase, LoaderModuleMockMixin):
             with patch.dict(localfs.__context__, {'serial': serializer}):
                 self.assertIn('payload data', localfs.fetch(bank='bank', key='key', cachedir=tmp_dir))
 
+    def test_fetch_bank(self):
+        '''
+        Tests that fetch_bank returns the data of the keys of a bank, not its
+        sub-banks.
+        '''
+        tmp_dir = tempfile.mkdtemp(dir=TMP)
+        self._create_tmp_cache_file(tmp_dir, salt.payload.Serial(self))
+        os.makedirs(os.path.join(tmp_dir, 'bank', 'sub'))
+        with patch.dict(localfs.__context__, {'serial': salt.payload.Serial(self)}):
+            self.assertEqual(localfs.fetch_bank(bank='bank', cachedir=tmp_dir),
+                             {'key': 'payload data'})
+            self.assertEqual(localfs.fetch_bank(bank='nobank', cachedir=tmp_dir), {})
+
     # 'updated' function tests: 3
 
     def test_updated_return_when_cache_file_does_not_exist(self):
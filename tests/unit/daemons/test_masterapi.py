@@ -563,6 +563,9 @@ class FakeCache(object):
     def fetch(self, bank, key):
         return self.data[bank, key]
 
+    def fetch_many(self, bank_keys):
+        return dict((bank_key, self.data.get(bank_key, {})) for bank_key in bank_keys)
+
 
 class RemoteFuncsTestCase(TestCase):
     '''
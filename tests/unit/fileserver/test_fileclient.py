@@ -19,6 +19,7 @@ from tests.support.mock import MagicMock, patch, NO_MOCK, NO_MOCK_REASON
 # Import salt libs
 import salt.utils.files
 from salt import fileclient
+from salt.exceptions import SaltClientError
 from salt.ext import six
 
 log = logging.getLogger(__name__)
@@ -359,3 +360,180 @@ class FileclientCacheTest(TestCase, AdaptedConfigurationTestCaseMixin, LoaderMod
                 log.debug('cache_loc = %s', cache_loc)
                 log.debug('content = %s', content)
                 self.assertTrue(saltenv in content)
+
+    def test_get_file_delta_transfer(self):
+        '''
+        Ensure that only the changed chunks of a file are transferred when
+        file_delta_transfer is enabled
+        '''
+        patched_opts = dict((x, y) for x, y in six.iteritems(self.minion_opts))
+        patched_opts.update(MOCKED_OPTS)
+        patched_opts['file_delta_transfer'] = True
+        patched_opts['file_buffer_size'] = 16
+        path = os.path.join(FS_ROOT, 'base', 'delta.bin')
+        with salt.utils.files.fopen(path, 'wb') as fp_:
+            fp_.write(b'a' * 64)
+
+        with patch.dict(fileclient.__opts__, patched_opts):
+            client = fileclient.get_file_client(fileclient.__opts__, pillar=False)
+            cache_loc = client.cache_file('salt://delta.bin', 'base')
+
+            with salt.utils.files.fopen(path, 'wb') as fp_:
+                fp_.write(b'a' * 32 + b'b' * 16 + b'a' * 24)
+            responses = []
+            send = client.channel.send
+
+            def _send(load, **kwargs):
+                ret = send(load, **kwargs)
+                responses.append(ret)
+                return ret
+
+            with patch.object(client.channel, 'send', _send):
+                self.assertEqual(client.cache_file('salt://delta.bin', 'base'), cache_loc)
+
+            with salt.utils.files.fopen(cache_loc, 'rb') as fp_:
+                self.assertEqual(fp_.read(), b'a' * 32 + b'b' * 16 + b'a' * 24)
+            # The first, second and fourth chunks were reused from the cache
+            self.assertEqual(len([x for x in responses if x.get('same')]), 3)
+
+            # The blocks are compared with the chunks of the master, whatever
+            # the buffer size of the minion
+            with salt.utils.files.fopen(path, 'wb') as fp_:
+                fp_.write(b'a' * 32 + b'c' * 16 + b'a' * 24)
+            del responses[:]
+            client.opts = dict(client.opts, file_buffer_size=8)
+            with patch.object(client.channel, 'send', _send):
+                self.assertEqual(client.cache_file('salt://delta.bin', 'base'), cache_loc)
+
+        with salt.utils.files.fopen(cache_loc, 'rb') as fp_:
+            self.assertEqual(fp_.read(), b'a' * 32 + b'c' * 16 + b'a' * 24)
+        # All chunks but the third one were reused, only the second half of
+        # the first one was sent
+        same = [x for x in responses if x.get('same')]
+        self.assertEqual(len(same), 4)
+        self.assertEqual(same[0]['data'], b'a' * 8)
+
+    def test_cache_dir_concurrent(self):
+        '''
+        Ensure entire directory is cached when the files are fetched
+        concurrently
+        '''
+        patched_opts = dict((x, y) for x, y in six.iteritems(self.minion_opts))
+        patched_opts.update(MOCKED_OPTS)
+        patched_opts['file_client_concurrency'] = 2
+
+        with patch.dict(fileclient.__opts__, patched_opts):
+            client = fileclient.get_file_client(fileclient.__opts__, pillar=False)
+            for saltenv in SALTENVS:
+                ret = client.cache_dir(
+                    'salt://{0}'.format(SUBDIR),
+                    saltenv,
+                    cachedir=None
+                )
+                self.assertEqual(len(ret), len(SUBDIR_FILES))
+                for subdir_file in SUBDIR_FILES:
+                    cache_loc = os.path.join(fileclient.__opts__['cachedir'],
+                                             'files',
+                                             saltenv,
+                                             SUBDIR,
+                                             subdir_file)
+                    self.assertIn(cache_loc, ret)
+                    with salt.utils.files.fopen(cache_loc) as fp_:
+                        content = fp_.read()
+                    self.assertTrue(subdir_file in content)
+                    self.assertTrue(saltenv in content)
+            # The clients of the worker threads are reused by the next calls
+            self.assertTrue(client._idle_clients)
+            self.assertLessEqual(len(client._idle_clients), 2)
+
+    def test_prefetch_files(self):
+        '''
+        Ensure that the hashes of prefetched files are not requested again
+        until the prefetch is cleared
+        '''
+        patched_opts = dict((x, y) for x, y in six.iteritems(self.minion_opts))
+        patched_opts.update(MOCKED_OPTS)
+
+        with patch.dict(fileclient.__opts__, patched_opts):
+            client = fileclient.get_file_client(fileclient.__opts__, pillar=False)
+            ret = client.prefetch_files(['salt://foo.txt'], 'base')
+            cache_loc = os.path.join(fileclient.__opts__['cachedir'],
+                                     'files', 'base', 'foo.txt')
+            self.assertEqual(ret, [cache_loc])
+            hsum = client.hash_file('salt://foo.txt', 'base')
+
+            with patch.object(client.channel, 'send', MagicMock(side_effect=Exception)):
+                self.assertEqual(client.hash_file('salt://foo.txt', 'base'), hsum)
+                self.assertEqual(client.cache_file('salt://foo.txt', 'base'), cache_loc)
+
+            client.clear_prefetch()
+            with salt.utils.files.fopen(os.path.join(FS_ROOT, 'base', 'foo.txt'), 'w') as fp_:
+                fp_.write('changed')
+            self.assertNotEqual(client.hash_file('salt://foo.txt', 'base'), hsum)
+
+    def test_prefetch_files_dests(self):
+        '''
+        Ensure that files whose destination is up to date are not downloaded
+        '''
+        patched_opts = dict((x, y) for x, y in six.iteritems(self.minion_opts))
+        patched_opts.update(MOCKED_OPTS)
+        dest = os.path.join(TMP, 'prefetch_dest.txt')
+        shutil.copyfile(os.path.join(FS_ROOT, 'base', 'foo.txt'), dest)
+        self.addCleanup(os.remove, dest)
+
+        with patch.dict(fileclient.__opts__, patched_opts):
+            client = fileclient.get_file_client(fileclient.__opts__, pillar=False)
+            with patch.object(client, 'cache_file') as cache_file:
+                self.assertEqual(
+                    client.prefetch_files(['salt://foo.txt'], 'base',
+                                          dests={'salt://foo.txt': dest}),
+                    [dest])
+                self.assertFalse(cache_file.called)
+            client.clear_prefetch()
+
+            # A failed prefetch does not need to be cleared
+            with patch.object(client, 'hash_and_stat_files',
+                              MagicMock(side_effect=SaltClientError)):
+                self.assertRaises(SaltClientError, client.prefetch_files,
+                                  ['salt://foo.txt'], 'base')
+            self.assertEqual(client.prefetch_depth, 0)
+            self.assertIsNone(client.hash_cache)
+
+            with salt.utils.files.fopen(dest, 'w') as fp_:
+                fp_.write('changed')
+            cache_loc = os.path.join(fileclient.__opts__['cachedir'],
+                                     'files', 'base', 'foo.txt')
+            self.assertEqual(
+                client.prefetch_files(['salt://foo.txt'], 'base',
+                                      dests={'salt://foo.txt': dest}),
+                [cache_loc])
+            client.clear_prefetch()
+
+    def test_hash_and_stat_files(self):
+        '''
+        Ensure that the hashes and stat results of many files are fetched
+        with a single request
+        '''
+        patched_opts = dict((x, y) for x, y in six.iteritems(self.minion_opts))
+        patched_opts.update(MOCKED_OPTS)
+
+        with patch.dict(fileclient.__opts__, patched_opts):
+            client = fileclient.get_file_client(fileclient.__opts__, pillar=False)
+            paths = ['salt://{0}/{1}'.format(SUBDIR, x) for x in SUBDIR_FILES]
+            paths.append('salt://missing.txt')
+            expected = dict((path, client.hash_and_stat_file(path, 'dev'))
+                            for path in paths)
+            send = MagicMock(side_effect=client.channel.send)
+            with patch.object(client.channel, 'send', send):
+                ret = client.hash_and_stat_files(paths, 'dev')
+            self.assertEqual(send.call_count, 1)
+            self.assertEqual(ret, expected)
+            self.assertEqual(ret['salt://missing.txt'][0], '')
+
+            # The whole directory can be requested by prefix too
+            ret = client.channel.send({'cmd': '_file_hash_and_stat_many',
+                                       'saltenv': 'dev',
+                                       'prefix': SUBDIR})
+            self.assertEqual(
+                sorted(ret),
+                sorted('{0}/{1}'.format(SUBDIR, x) for x in SUBDIR_FILES))
@@ -20,6 +20,7 @@ from tests.support.mock import Mock, MagicMock, patch, NO_MOCK, NO_MOCK_REASON
 from salt.ext import six
 from salt.exceptions import CommandExecutionError, SaltInvocationError
 import salt.modules.aptpkg as aptpkg
+import salt.modules.pkg_resource as pkg_resource
 
 try:
     import pytest
@@ -348,6 +349,84 @@ class AptPkgTestCase(TestCase, LoaderModuleMockMixin):
                 with patch.multiple(aptpkg, **patch_kwargs):
                     self.assertEqual(aptpkg.upgrade(), dict())
 
+    def test_latest_version(self):
+        '''
+        Test - The candidates of all the packages are queried at once.
+        '''
+        policy = textwrap.dedent('''\
+            wget:
+              Installed: 1.17.1-1ubuntu1.4
+              Candidate: 1.19.4-1ubuntu2
+              Version table:
+            tmux:
+              Installed: (none)
+              Candidate: 2.1-3build1
+              Version table:
+            ''')
+        run_all = MagicMock(side_effect=[{'retcode': 0, 'stdout': policy},
+                                         {'retcode': 0, 'stdout': ''}])
+        patch_kwargs = {
+            '__salt__': {
+                'cmd.run_all': run_all,
+                'config.get': MagicMock(return_value=False)
+            }
+        }
+        with patch.multiple(aptpkg, **patch_kwargs), \
+                patch('salt.modules.aptpkg.list_pkgs',
+                      MagicMock(return_value={'wget': ['1.17.1-1ubuntu1.4']})), \
+                patch('salt.modules.aptpkg.version_cmp',
+                      MagicMock(return_value=-1)):
+            self.assertEqual(
+                aptpkg.latest_version('wget', 'tmux', 'missing', refresh=False),
+                {'wget': '1.19.4-1ubuntu2', 'tmux': '2.1-3build1', 'missing': ''})
+        self.assertEqual(run_all.call_args_list[0][0][0],
+                         ['apt-cache', '-q', 'policy', 'wget', 'tmux', 'missing'])
+        self.assertEqual(run_all.call_args_list[1][0][0],
+                         ['apt-cache', '-q', 'policy', 'missing'])
+
+    def test_refresh_pkg_context(self):
+        '''
+        Test - Only the packages changed by apt-get are queried again.
+        '''
+        out = textwrap.dedent('''\
+            Preparing to unpack .../wget_1.19.4-1ubuntu2_amd64.deb ...
+            Unpacking wget (1.19.4-1ubuntu2) over (1.17.1-1ubuntu1.4) ...
+            Setting up wget (1.19.4-1ubuntu2) ...
+            Removing tmux:amd64 (2.1-3build1) ...
+            Processing triggers for man-db (2.8.3-2) ...
+            ''')
+        query = MagicMock(return_value={
+            'retcode': 1,
+            'stdout': 'install ok installed wget 1.19.4-1ubuntu2 amd64\n'
+                      'deinstall ok config-files tmux 2.1-3build1 amd64\n'})
+        snapshot = {'installed': {'wget': ['1.17.1-1ubuntu1.4'],
+                                  'tmux': ['2.1-3build1'],
+                                  'zsh': ['5.1.1-1ubuntu2']},
+                    'removed': {},
+                    'purge_desired': {}}
+        patch_kwargs = {
+            '__context__': {'pkg.list_pkgs': snapshot},
+            '__grains__': {},
+            '__salt__': {
+                'cmd.run_all': query,
+                'pkg_resource.add_pkg': pkg_resource.add_pkg,
+                'pkg_resource.sort_pkglist': pkg_resource.sort_pkglist
+            }
+        }
+        with patch.multiple(aptpkg, **patch_kwargs):
+            aptpkg._refresh_pkg_context([out])
+            self.assertEqual(aptpkg.__context__['pkg.list_pkgs'], {
+                'installed': {'wget': ['1.19.4-1ubuntu2'],
+                              'zsh': ['5.1.1-1ubuntu2']},
+                'removed': {'tmux': ['2.1-3build1']},
+                'purge_desired': {}})
+            self.assertEqual(query.call_args[0][0][-2:], ['tmux', 'wget'])
+
+            # Nothing recognized in the output drops the snapshot
+            aptpkg._refresh_pkg_context(['Reading package lists...'])
+            self.assertNotIn('pkg.list_pkgs', aptpkg.__context__)
+            self.assertEqual(query.call_count, 1)
+
     def test_show(self):
         '''
         Test that the pkg.show function properly parses apt-cache show output.
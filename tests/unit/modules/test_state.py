@@ -33,6 +33,7 @@ import salt.utils.json
 import salt.utils.hashutils
 import salt.utils.odict
 import salt.utils.platform
+import salt.utils.profile
 import salt.utils.state
 import salt.modules.state as state
 from salt.exceptions import CommandExecutionError, SaltInvocationError
@@ -58,7 +59,7 @@ class MockState(object):
                      pillar_override=False,
                      pillar_enc=None,
                      initial_pillar=None):
-            pass
+            self.profiler = salt.utils.profile.PhaseProfiler(enabled=False)
 
         def verify_data(self, data):
             '''
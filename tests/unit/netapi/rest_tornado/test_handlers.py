@@ -651,6 +651,30 @@ class TestSaltRunHandler(SaltnadoTestCase):
             self.assertEqual(valid_response, salt.utils.json.loads(response.body))
 
 
+class TestStatsHandler(SaltnadoTestCase):
+
+    def get_app(self):
+        urls = [('/stats', saltnado.StatsSaltAPIHandler)]
+        return self.build_tornado_app(urls)
+
+    def test_get(self):
+        '''
+        Test the statistics of the event listener
+        '''
+        response = self.fetch('/stats',
+                              follow_redirects=False)
+        self.assertEqual(response.code, 302)
+
+        with patch.object(saltnado.BaseSaltAPIHandler, '_verify_auth',
+                          MagicMock(return_value=True)):
+            response = self.fetch('/stats',
+                                  headers={'Accept': self.content_type_map['json']})
+        self.assertEqual(response.code, 200)
+        stats = salt.utils.json.loads(response.body)['event_listener']
+        self.assertEqual(stats['waiting_futures'], 0)
+        self.assertEqual(stats['events'], 0)
+
+
 @skipIf(HAS_TORNADO is False, 'The tornado package needs to be installed')  # pylint: disable=W0223
 class TestWebsocketSaltAPIHandler(SaltnadoTestCase):
 
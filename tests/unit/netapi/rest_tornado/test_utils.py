@@ -211,7 +211,8 @@ class TestEventListener(AsyncTestCase):
 
             self.assertFalse(dummy_request_future_2.done())
 
-            self.assertEqual(2, len(event_listener.tag_map))
+            # The tags matched by an event are unindexed with their futures
+            self.assertEqual(1, len(event_listener.tag_map))
             self.assertEqual(1, len(event_listener.request_map))
 
             event_listener.clean_by_request(dummy_request)
@@ -221,3 +222,47 @@ class TestEventListener(AsyncTestCase):
 
             self.assertEqual(0, len(event_listener.tag_map))
             self.assertEqual(0, len(event_listener.request_map))
+
+    def test_indexed_matchers(self):
+        '''
+        Test that an event only completes the futures matching its tag, and
+        that the tags are unindexed once no future waits on them
+        '''
+        with eventpublisher_process():
+            me = salt.utils.event.MasterEvent(SOCK_DIR)
+            event_listener = saltnado.EventListener({},  # we don't use mod_opts, don't save?
+                                                    {'sock_dir': SOCK_DIR,
+                                                     'transport': 'zeromq'})
+            self._finished = False  # fit to event_listener's behavior
+            exact = event_listener.get_event(
+                self, 'salt/job/1/ret/a', matcher=event_listener.exact_matcher)
+            other_exact = event_listener.get_event(
+                self, 'salt/job/1/ret', matcher=event_listener.exact_matcher)
+            prefix = event_listener.get_event(self, 'salt/job/1')
+            other_prefix = event_listener.get_event(self, 'salt/job/2')
+            custom = event_listener.get_event(
+                self, 'ret/a', matcher=lambda mtag, tag: mtag.endswith(tag),
+                callback=self.stop)
+            self.assertEqual(5, len(event_listener.tag_map))
+
+            me.fire_event({'data': 'foo'}, 'salt/job/1/ret/a')
+            self.wait()
+
+            for future in (exact, prefix, custom):
+                self.assertTrue(future.done())
+                self.assertEqual(future.result()['tag'], 'salt/job/1/ret/a')
+                self.assertEqual(future.result()['data']['data'], 'foo')
+            self.assertFalse(other_exact.done())
+            self.assertFalse(other_prefix.done())
+            self.assertEqual(2, len(event_listener.tag_map))
+            self.assertEqual(0, len(event_listener.custom_keys))
+            self.assertEqual(list(event_listener.prefix_trie), ['s'])
+
+            stats = event_listener.get_stats()
+            self.assertEqual(stats['events_matched'], 1)
+            self.assertEqual(stats['futures_set'], 3)
+            self.assertEqual(stats['waiting_futures'], 2)
+
+            event_listener.clean_by_request(self)
+            self.assertEqual(0, len(event_listener.tag_map))
+            self.assertEqual({}, event_listener.prefix_trie)
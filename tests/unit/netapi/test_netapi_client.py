@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+'''
+    tests.unit.netapi.test_netapi_client
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import os
+
+# Import Salt Testing libs
+from tests.support.unit import TestCase
+from tests.support.mock import MagicMock, patch
+
+# Import Salt libs
+import salt.netapi
+import salt.utils.event
+from tests.unit.utils.test_event import eventpublisher_process, SOCK_DIR  # pylint: disable=import-error
+
+
+class LocalAsyncStreamTestCase(TestCase):
+    '''
+    Test the local_async_stream client of salt.netapi.NetapiClient
+    '''
+    def setUp(self):
+        if not os.path.exists(SOCK_DIR):
+            os.makedirs(SOCK_DIR)
+        self.opts = {'sock_dir': SOCK_DIR,
+                     'transport': 'zeromq',
+                     'timeout': 5}
+        self.addCleanup(setattr, salt.netapi.JobReturnListener, '_instance', None)
+
+    def test_local_async_stream(self):
+        with eventpublisher_process():
+            event = salt.utils.event.MasterEvent(SOCK_DIR)
+
+            def _run_job(tgt, fun, arg, tgt_type, ret, jid, **kwargs):
+                for minion in ('minion1', 'minion2', 'other'):
+                    event.fire_event({'id': minion, 'jid': jid, 'return': True},
+                                     'salt/job/{0}/ret/{1}'.format(jid, minion))
+                event.fire_event({'id': 'minion1', 'return': True},
+                                 'salt/job/other/ret/minion1')
+                return {'jid': jid, 'minions': ['minion1', 'minion2', 'minion3']}
+            local = MagicMock()
+            local.run_job.side_effect = _run_job
+
+            netapi = salt.netapi.NetapiClient(self.opts)
+            with patch('salt.client.get_local_client', MagicMock(return_value=local)):
+                rets = netapi.local_async_stream('*', 'test.ping', timeout=3)
+                rets2 = netapi.local_async_stream('*', 'test.ping', timeout=3)
+            listener = salt.netapi.JobReturnListener.get(self.opts)
+            self.assertEqual(len(listener.queues), 2)
+            self.assertEqual(list(rets), [{'minion1': True}, {'minion2': True}])
+            self.assertEqual(list(rets2), [{'minion1': True}, {'minion2': True}])
+            self.assertEqual(listener.queues, {})
+
+    def test_local_async_stream_close(self):
+        local = MagicMock()
+        local.run_job.return_value = {'jid': '1', 'minions': ['minion1']}
+        netapi = salt.netapi.NetapiClient(self.opts)
+        with eventpublisher_process(), \
+                patch('salt.client.get_local_client', MagicMock(return_value=local)):
+            rets = netapi.local_async_stream('*', 'test.ping', timeout=3)
+            listener = salt.netapi.JobReturnListener.get(self.opts)
+            self.assertEqual(len(listener.queues), 1)
+            # Closing the returns before iterating over them unsubscribes the job
+            rets.close()
+            self.assertEqual(listener.queues, {})
+            self.assertEqual(list(rets), [])
@@ -5,10 +5,12 @@ unittests for highstate outputter
 
 # Import Python Libs
 from __future__ import absolute_import
+import copy
 
 # Import Salt Testing Libs
 from tests.support.mixins import LoaderModuleMockMixin
 from tests.support.unit import TestCase
+from tests.support.mock import patch
 
 # Import Salt Libs
 import salt.utils.stringutils
@@ -91,6 +93,28 @@ class JsonTestCase(TestCase, LoaderModuleMockMixin):
         self.assertIn('Failed:    0', ret)
         self.assertIn('Total states run:     1', ret)
 
+    def test_output_iter(self):
+        '''
+        The streamed output is the output split by state
+        '''
+        ret = highstate.output(copy.deepcopy(self.data))
+        chunks = list(highstate.output_iter(copy.deepcopy(self.data)))
+        self.assertEqual(chunks[0], 'master:')
+        self.assertTrue(chunks[1].startswith('----------\n          ID: call_sleep_state'))
+        self.assertTrue(chunks[2].startswith('\nSummary for master'))
+        self.assertEqual('\n'.join(chunks), ret)
+
+    def test_terse_output_skips_changes(self):
+        '''
+        The changes of the states shown tersely are not formatted
+        '''
+        with patch.dict(highstate.__opts__, {'state_output': 'terse'}), \
+                patch.object(highstate, '_format_changes') as format_changes:
+            ret = highstate.output(self.data)
+        self.assertIn('Name: call_sleep_state - Function: salt.state - Result: Changed', ret)
+        self.assertIn('Succeeded: 1 (changed=1)', ret)
+        format_changes.assert_not_called()
+
     def test_output_comment_is_not_unicode(self):
         entry = None
         for key in ('data', 'master', 'salt_|-call_sleep_state_|-call_sleep_state_|-state',
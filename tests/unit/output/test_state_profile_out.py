@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+'''
+unittests for state_profile outputter
+'''
+
+# Import Python Libs
+from __future__ import absolute_import, print_function, unicode_literals
+
+# Import Salt Testing Libs
+from tests.support.mixins import LoaderModuleMockMixin
+from tests.support.unit import TestCase
+
+# Import Salt Libs
+import salt.output.state_profile as state_profile
+
+
+class StateProfileTestCase(TestCase, LoaderModuleMockMixin):
+    '''
+    Test cases for salt.output.state_profile
+    '''
+    def setup_loader_modules(self):
+        return {state_profile: {'__opts__': {'color': False}}}
+
+    def test_output(self):
+        data = {'minion': {
+            'jid': '20180101000000000000',
+            'fun': 'state.highstate',
+            'phases': {
+                'render': {'wall': 1.0, 'cpu': 0.5, 'calls': 1},
+                'render;sls base:a': {'wall': 0.3, 'cpu': 0.25, 'calls': 2},
+                'execute': {'wall': 2.0, 'cpu': 1.0, 'calls': 1}},
+            'stats': []}}
+        lines = state_profile.output(data).splitlines()
+        self.assertEqual(lines[0], 'minion:')
+        self.assertEqual(lines[1].split(), ['phase', 'wall', '(s)', 'cpu', '(s)', 'calls'])
+        # Slowest phases first, children below their parent
+        self.assertEqual(lines[2].split(), ['execute', '2.000', '1.000', '1', '#' * 20])
+        self.assertEqual(lines[3].split(), ['render', '1.000', '0.500', '1', '#' * 10])
+        self.assertEqual(lines[4].split(), ['sls', 'base:a', '0.300', '0.250', '2', '#' * 3])
+        self.assertTrue(lines[4].startswith('      sls'))
+
+    def test_no_profile(self):
+        self.assertEqual(state_profile.output({'minion': {}}).splitlines(),
+                         ['minion:', '    No profile recorded'])
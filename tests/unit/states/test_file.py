@@ -6,6 +6,7 @@ from datetime import datetime
 import os
 import pprint
 import shutil
+import tempfile
 
 try:
     from dateutil.relativedelta import relativedelta
@@ -1874,6 +1875,28 @@ class TestFileState(TestCase, LoaderModuleMockMixin):
         run_checks(strptime_format=fake_strptime_format)
         run_checks(strptime_format=fake_strptime_format, test=True)
 
+    def test_mod_drift_probe(self):
+        '''
+        Test that the drift probe covers the file and its local sources
+        '''
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, ignore_errors=True)
+        name = os.path.join(tmp, 'dest')
+        source = os.path.join(tmp, 'source')
+        for path in (name, source):
+            with salt.utils.files.fopen(path, 'w') as fp_:
+                fp_.write('foo')
+        low = {'fun': 'managed', 'name': name, 'source': source}
+        probe = filestate.mod_drift_probe(low)
+        self.assertEqual(filestate.mod_drift_probe(low), probe)
+        with salt.utils.files.fopen(source, 'w') as fp_:
+            fp_.write('bar')
+        self.assertNotEqual(filestate.mod_drift_probe(low), probe)
+        os.remove(source)
+        self.assertIsNone(filestate.mod_drift_probe(low))
+        low['source'] = 'http://example.com/source'
+        self.assertIsNone(filestate.mod_drift_probe(low))
+
 
 class TestFindKeepFiles(TestCase):
 
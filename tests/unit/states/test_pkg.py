@@ -14,6 +14,7 @@ from tests.support.mock import (
 
 # Import Salt Libs
 from salt.ext import six
+import salt.state
 import salt.states.pkg as pkg
 
 
@@ -176,3 +177,45 @@ class PkgTestCase(TestCase, LoaderModuleMockMixin):
                 ret = pkg.uptodate('dummy', test=True, pkgs=[pkgname for pkgname in six.iterkeys(self.pkgs)])
                 self.assertIsNone(ret['result'])
                 self.assertDictEqual(ret['changes'], pkgs)
+
+    def test_mod_aggregate(self):
+        '''
+        Test pkg.mod_aggregate only merges the states whose requisites are met
+        '''
+        def chunk(name, **kwargs):
+            low = {'state': 'pkg', 'fun': 'installed', 'name': name,
+                   '__id__': name, '__sls__': 'pkgs'}
+            low.update(kwargs)
+            return low
+
+        chunks = [
+            chunk('pkga'),
+            chunk('pkgb', require=[{'file': 'repo'}]),
+            chunk('pkgc', require=[{'file': 'other'}]),
+            chunk('pkgd', require=[{'file': 'failed'}]),
+            chunk('pkge', onlyif='true'),
+            chunk('pkgf', fun='removed'),
+            chunk('pkgg', require=[{'pkg': 'pkga'}]),
+            {'state': 'file', 'fun': 'managed', 'name': 'repo',
+             '__id__': 'repo', '__sls__': 'pkgs'},
+            {'state': 'file', 'fun': 'managed', 'name': 'other',
+             '__id__': 'other', '__sls__': 'pkgs'},
+            {'state': 'file', 'fun': 'managed', 'name': 'failed',
+             '__id__': 'failed', '__sls__': 'pkgs'},
+        ]
+        running = {
+            'file_|-repo_|-repo_|-managed': {'result': True},
+            'file_|-failed_|-failed_|-managed': {'result': False},
+        }
+        gen_tag = MagicMock(
+            side_effect=lambda low: '{0[state]}_|-{0[__id__]}_|-{0[name]}_|-{0[fun]}'.format(low))
+        with patch.dict(pkg.__utils__, {'state.gen_tag': gen_tag}):
+            # Without the index of the chunks, their requisites are not met
+            low = pkg.mod_aggregate(dict(chunks[0]), [dict(x) for x in chunks], running)
+            self.assertEqual(low['pkgs'], ['pkga'])
+            with patch.dict(pkg.__context__,
+                            {'state.requisite_index': salt.state.RequisiteIndex(chunks)}):
+                low = pkg.mod_aggregate(chunks[0], chunks, running)
+        self.assertEqual(low['pkgs'], ['pkga', 'pkgb'])
+        self.assertEqual([x['name'] for x in chunks if x.get('__agg__')],
+                         ['pkga', 'pkgb'])
@@ -28,6 +28,7 @@ from salt.ext.six.moves import builtins
 import salt.utils.json
 from salt.utils.decorators.jinja import JinjaFilter
 from salt.utils.jinja import (
+    SaltBytecodeCache,
     SaltCacheLoader,
     SerializerExtension,
     ensure_sequence_filter
@@ -286,6 +287,71 @@ class TestGetTemplate(TestCase):
             self.assertEqual(out, 'Hey world !Hi Salt !' + os.linesep)
             self.assertEqual(fc.requests[0]['path'], 'salt://macro')
 
+    def test_bytecode_cache(self):
+        '''
+        With jinja_bytecode_cache, the compiled templates are kept in the
+        cachedir and only compiled again when their source changes
+        '''
+        opts = dict(self.local_opts, jinja_bytecode_cache=True)
+        filename = os.path.join(self.TEMPLATES_DIR, 'hello_import')
+
+        def _render():
+            with salt.utils.files.fopen(filename) as fp_:
+                return render_jinja_tmpl(
+                    salt.utils.stringutils.to_unicode(fp_.read()),
+                    dict(opts=opts, saltenv='test', salt=self.local_salt,
+                         a='Hi', b='Salt'),
+                    tmplpath=filename)
+
+        self.assertEqual(_render(), 'Hey world !Hi Salt !' + os.linesep)
+        bytecode_dir = os.path.join(self.TEMPDIR, 'jinja_bytecode')
+        self.assertEqual(len(os.listdir(bytecode_dir)), 2)
+
+        # A new process loads the bytecode instead of compiling
+        self.addCleanup(SaltBytecodeCache._compiled.clear)
+        SaltBytecodeCache._compiled.clear()
+        with patch('jinja2.Environment.compile', MagicMock(side_effect=AssertionError)):
+            self.assertEqual(_render(), 'Hey world !Hi Salt !' + os.linesep)
+
+        with salt.utils.files.fopen(os.path.join(self.TEMPLATES_DIR, 'macro'), 'w') as fp_:
+            fp_.write('{% macro mymacro(greeting, greetee=\'world\') -%}\n'
+                      '{{ greeting ~ \' \' ~ greetee }} ?\n'
+                      '{%- endmacro %}\n')
+        self.assertEqual(_render(), 'Hey world ?Hi Salt ?' + os.linesep)
+
+    def test_nested_render(self):
+        '''
+        A template rendered while rendering another one does not change the
+        loader and the globals of the outer template
+        '''
+        def _write(name, contents):
+            path = os.path.join(self.TEMPDIR, name)
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with salt.utils.files.fopen(path, 'w') as fp_:
+                fp_.write(contents)
+            return path
+
+        _write('outer/map.jinja', "{% set who = 'outer' %}")
+        _write('inner/map.jinja', "{% set who = 'inner' %}")
+        inner = _write('inner/init.sls',
+                       "{% from 'map.jinja' import who %}{{ who }}")
+        outer = _write('outer/init.sls',
+                       "{{ nested() }}|{% from 'map.jinja' import who %}{{ who }}"
+                       "|{{ name }}")
+
+        def _render(path, **context):
+            with salt.utils.files.fopen(path) as fp_:
+                return render_jinja_tmpl(
+                    salt.utils.stringutils.to_unicode(fp_.read()),
+                    dict(opts=self.local_opts, saltenv=None,
+                         salt=self.local_salt, **context),
+                    tmplpath=path)
+
+        out = _render(outer, name='outer',
+                      nested=lambda: _render(inner, name='inner'))
+        self.assertEqual(out, 'inner|outer|outer')
+
     def test_macro_additional_log_for_generalexc(self):
         '''
         If we failed in a macro because of e.g. a TypeError, get
@@ -575,6 +641,14 @@ class TestJinjaDefaultOptions(TestCase):
              'mylist': [0, 1, 2, 3],
         }
 
+    def setUp(self):
+        # Keep the fileserver cache out of the source tree
+        self.local_opts['cachedir'] = tempfile.mkdtemp()
+        super(TestJinjaDefaultOptions, self).setUp()
+
+    def tearDown(self):
+        salt.utils.files.rm_rf(self.local_opts['cachedir'])
+
     def test_comment_prefix(self):
 
         template = """
@@ -635,6 +709,14 @@ class TestCustomExtensions(TestCase):
             # 'file.dirname': filemod.dirname
         }
 
+    def setUp(self):
+        # Keep the fileserver cache out of the source tree
+        self.local_opts['cachedir'] = tempfile.mkdtemp()
+        super(TestCustomExtensions, self).setUp()
+
+    def tearDown(self):
+        salt.utils.files.rm_rf(self.local_opts['cachedir'])
+
     def test_regex_escape(self):
         dataset = 'foo?:.*/\\bar'
         env = Environment(extensions=[SerializerExtension])
@@ -72,6 +72,64 @@ class LoadAuthTestCase(TestCase):
             self.lauth.get_groups(valid_eauth_load)
             format_call_mock.assert_has_calls((expected_ret,), any_order=True)
 
+    def test_eauth_cache(self):
+        calls = []
+
+        def _auth(username, password):
+            calls.append('auth')
+            return password == 'secret'
+
+        def _groups(username, password):
+            calls.append('groups')
+            return ['admins']
+        self.lauth.auth = {'pam.auth': _auth, 'pam.groups': _groups}
+        self.lauth.cache = auth.EauthCache({'eauth_cache_ttl': 60,
+                                            'eauth_cache_negative_ttl': 60})
+        auth.EauthCache.clear()
+        self.addCleanup(auth.EauthCache.clear)
+        good = {'username': 'test_user', 'password': 'secret', 'eauth': 'pam'}
+        bad = {'username': 'test_user', 'password': 'wrong', 'eauth': 'pam'}
+        with patch('time.sleep') as sleep_mock:
+            for _ in range(3):
+                self.assertTrue(self.lauth.time_auth(good))
+                self.assertEqual(self.lauth.get_groups(good), ['admins'])
+                self.assertFalse(self.lauth.time_auth(bad))
+            self.assertEqual(calls, ['auth', 'groups', 'auth'])
+            # Failures served from the cache are still delayed
+            self.assertEqual(sleep_mock.call_count, 3)
+
+        self.assertEqual(len(auth.EauthCache._entries), 3)
+        self.assertNotIn('secret', repr(auth.EauthCache._entries))
+        stats = auth.EauthCache.get_stats()
+        self.assertEqual(stats['misses'], 3)
+        self.assertEqual(stats['hits'], 4)
+        self.assertEqual(stats['negative_hits'], 2)
+
+    def test_eauth_cache_failures(self):
+        calls = []
+
+        def _auth(username, password):
+            calls.append(password)
+            if password == 'error':
+                raise Exception('LDAP server unreachable')
+            return password == 'secret'
+        self.lauth.auth = {'pam.auth': _auth}
+        self.lauth.cache = auth.EauthCache({'eauth_cache_ttl': 60,
+                                            'eauth_cache_negative_ttl': 60})
+        self.lauth.cache.shared = MagicMock()
+        self.lauth.cache.shared.fetch.return_value = None
+        auth.EauthCache.clear()
+        self.addCleanup(auth.EauthCache.clear)
+        with patch('time.sleep'):
+            for password in ('error', 'error', 'wrong', 'wrong', 'secret'):
+                self.lauth.time_auth({'username': 'test_user',
+                                      'password': password,
+                                      'eauth': 'pam'})
+        # Exceptions of the module are not cached
+        self.assertEqual(calls, ['error', 'error', 'wrong', 'secret'])
+        # Failed authentications are not shared
+        self.assertEqual(self.lauth.cache.shared.store.call_count, 1)
+
 
 class MasterACLTestCase(ModuleCase):
     '''
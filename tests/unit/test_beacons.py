@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+'''
+    tests.unit.test_beacons
+    ~~~~~~~~~~~~~~~~~~~~~~~
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import time
+
+# Import Salt Testing libs
+from tests.support.unit import skipIf, TestCase
+from tests.support.mock import NO_MOCK, NO_MOCK_REASON, patch, MagicMock
+
+# Import Salt libs
+import salt.beacons
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class BeaconTestCase(TestCase):
+    '''
+    Test case for salt.beacons.Beacon
+    '''
+
+    def _beacon(self, events, **opts):
+        beacon_opts = {'id': 'minion', 'loop_interval': 1, 'beacons': {}}
+        beacon_opts.update(opts)
+        calls = []
+
+        def beacon(config):
+            calls.append(config)
+            return [dict(event) for event in events]
+
+        with patch('salt.loader.beacons', MagicMock(return_value={'test.beacon': beacon})):
+            return salt.beacons.Beacon(beacon_opts, {}), calls
+
+    def test_process(self):
+        beacon, calls = self._beacon([{'foo': 'bar'}])
+        ret = beacon.process({'test': [{'foo': 'bar'}]}, {})
+        self.assertEqual(ret, [{'tag': 'salt/beacon/minion/test/',
+                                'data': {'foo': 'bar', 'id': 'minion'}}])
+        self.assertEqual(calls, [[{'foo': 'bar'}]])
+
+    def test_emit_on_change(self):
+        '''
+        Identical events from consecutive runs are only fired once
+        '''
+        beacon, calls = self._beacon([{'foo': 'bar'}])
+        config = {'test': [{'foo': 'bar'}, {'emit_on_change': True}]}
+        self.assertEqual(len(beacon.process(config, {})), 1)
+        self.assertEqual(beacon.process(config, {}), [])
+        # The option is not handed to the beacon itself
+        self.assertEqual(calls, [[{'foo': 'bar'}], [{'foo': 'bar'}]])
+
+    def test_workers(self):
+        '''
+        With beacons_workers the events are collected on a later pass
+        '''
+        beacon, calls = self._beacon([{'foo': 'bar'}], beacons_workers=1)
+        config = {'test': [{'foo': 'bar'}]}
+        ret = beacon.process(config, {})
+        for _ in range(50):
+            if not beacon.running:
+                break
+            time.sleep(0.1)
+        ret.extend(beacon.process(config, {}))
+        self.assertIn({'tag': 'salt/beacon/minion/test/',
+                       'data': {'foo': 'bar', 'id': 'minion'}}, ret)
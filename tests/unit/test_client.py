@@ -13,6 +13,8 @@ from tests.support.mock import patch, NO_MOCK, NO_MOCK_REASON
 
 # Import Salt libs
 from salt import client
+import salt.utils.batch
+import salt.utils.files
 import salt.utils.platform
 from salt.exceptions import (
     EauthAuthenticationError, SaltInvocationError, SaltClientError, SaltReqTimeoutError
@@ -81,6 +83,30 @@ class LocalClientTestCase(TestCase,
                                                     ret='')
 
     @skipIf(salt.utils.platform.is_windows(), 'Not supported on Windows')
+    def test_cmd_batch_master(self):
+        jid = '20181018000000000000'
+        salt.utils.batch.save_batch(
+            self.client.opts,
+            {'jid': jid, 'minions': ['m1', 'm2'], 'size': 1, 'timeout': 5,
+             'gather_job_timeout': 5, 'batch_wait': 0})
+        path = salt.utils.batch.batch_path(self.client.opts, jid)
+        self.addCleanup(salt.utils.files.safe_rm, path)
+        events = [{'tag': 'salt/job/{0}/ret/m1'.format(jid),
+                   'data': {'id': 'm1', 'return': True}}]
+
+        def get_event(*args, **kwargs):
+            if events:
+                return events.pop(0)
+            # The done event was missed
+            salt.utils.files.safe_rm(path)
+
+        with patch.object(self.client, 'run_job', return_value={'jid': jid, 'minions': []}), \
+                patch.object(self.client.event, 'get_event', side_effect=get_event), \
+                patch.object(self.client, '_clean_up_subscriptions'):
+            self.assertEqual(
+                list(self.client.cmd_batch_master('*', 'test.ping', batch='1')),
+                [{'m1': True}])
+
     def test_pub(self):
         '''
         Tests that the client cleanly returns when the publisher is not running
@@ -2,10 +2,13 @@
 
 # Import Python libs
 from __future__ import absolute_import
+import shutil
+import tempfile
 
 # Import Salt libs
 import salt.config
 import salt.master
+import salt.utils.batch
 
 # Import Salt Testing Libs
 from tests.support.unit import TestCase
@@ -331,3 +334,36 @@ class ClearFuncsTestCase(TestCase):
                 patch('salt.utils.master.get_values_of_matching_keys', MagicMock(return_value=['test'])), \
                 patch('salt.utils.minions.CkMinions.auth_check', MagicMock(return_value=False)):
             self.assertEqual(mock_ret, self.clear_funcs.publish(load))
+
+    def test_publish_batch(self):
+        '''
+        Asserts that a publication with a batch kwarg is saved for the batch
+        manager instead of being published
+        '''
+        load = {'user': 'test', 'fun': 'test.arg', 'tgt': '*', 'tgt_type': 'glob',
+                'jid': '', 'ret': '', 'arg': ['foo'], 'kwargs': {'batch': '1'}}
+        self.clear_funcs.opts['batch_master'] = True
+        self.clear_funcs.opts['cachedir'] = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.clear_funcs.opts['cachedir'], ignore_errors=True)
+        jid = '20181018120000000000'
+        with patch('salt.acl.PublisherACL.user_is_blacklisted', MagicMock(return_value=False)), \
+                patch('salt.acl.PublisherACL.cmd_is_blacklisted', MagicMock(return_value=False)), \
+                patch('salt.auth.LoadAuth.authenticate_key', MagicMock(return_value='fake-user-key')), \
+                patch('salt.utils.master.get_values_of_matching_keys', MagicMock(return_value=['test'])), \
+                patch('salt.utils.minions.CkMinions.auth_check', MagicMock(return_value=True)), \
+                patch('salt.utils.minions.CkMinions.check_minions',
+                      MagicMock(return_value={'minions': ['web1', 'web2'], 'missing': []})), \
+                patch('salt.utils.minions.CkMinions.connected_ids', MagicMock(return_value={'web1'})), \
+                patch.object(self.clear_funcs, '_prep_jid', MagicMock(return_value=jid)), \
+                patch.object(self.clear_funcs, '_send_pub') as send_pub:
+            ret = self.clear_funcs.publish(dict(load))
+            self.assertEqual(ret['load']['minions'], ['web1'])
+            self.assertFalse(send_pub.called)
+            batch = salt.utils.batch.load_batch(self.clear_funcs.opts, jid)
+            self.assertEqual(batch['down'], ['web2'])
+            self.assertEqual(batch['load']['fun'], 'test.arg')
+
+            self.clear_funcs.opts['batch_master'] = False
+            ret = self.clear_funcs.publish(dict(load))
+            self.assertIn('error', ret['load'])
+            self.assertFalse(send_pub.called)
@@ -73,6 +73,137 @@ class StateCompilerTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
             with self.assertRaises(salt.exceptions.SaltRenderError):
                 state_obj.call_high(high_data)
 
+    def test_prefetch_file_refs(self):
+        '''
+        Test that the salt:// files of the low chunks are prefetched per
+        saltenv when state_prefetch_files is set
+        '''
+        with patch('salt.state.State._gather_pillar'):
+            minion_opts = self.get_temp_config('minion')
+            minion_opts['state_prefetch_files'] = True
+            state_obj = salt.state.State(minion_opts)
+        chunks = [
+            {'state': 'file', 'fun': 'managed', 'name': '/a', '__env__': 'base',
+             'source': 'salt://a.conf'},
+            {'state': 'file', 'fun': 'managed', 'name': '/b', '__env__': 'base',
+             'source': ['salt://b.conf', 'salt://a.conf']},
+            {'state': 'file', 'fun': 'managed', 'name': '/c', '__env__': 'dev',
+             'source': 'salt://c.conf'},
+            {'state': 'cmd', 'fun': 'run', 'name': 'true', '__env__': 'base'},
+        ]
+        prefetch = MagicMock()
+        with patch.dict(state_obj.functions, {'cp.prefetch_files': prefetch}):
+            self.assertTrue(state_obj.prefetch_file_refs(chunks))
+        prefetch.assert_any_call(['salt://a.conf', 'salt://b.conf'], 'base')
+        prefetch.assert_any_call(['salt://c.conf'], 'dev')
+        self.assertEqual(prefetch.call_count, 2)
+
+    def _call_high_workers(self, **opts):
+        high = OrderedDict([
+            ('a', {'test': ['succeed_with_changes', {'order': 1}], '__sls__': 'w', '__env__': 'base'}),
+            ('b', {'test': ['fail_without_changes', {'order': 2}], '__sls__': 'w', '__env__': 'base'}),
+            ('c', {'test': ['nop', {'require': ['b']}, {'order': 3}], '__sls__': 'w', '__env__': 'base'}),
+            ('d', {'test': ['nop', {'onchanges': ['a']}, {'order': 4}], '__sls__': 'w', '__env__': 'base'}),
+            ('e', {'test': ['nop', {'onfail': ['a']}, {'order': 5}], '__sls__': 'w', '__env__': 'base'}),
+            ('f', {'test': ['nop', {'prereq': ['a']}, {'order': 6}],
+                   '__sls__': 'w', '__env__': 'base'}),
+        ])
+        with patch('salt.state.State._gather_pillar'):
+            minion_opts = self.get_temp_config('minion')
+            minion_opts.update(opts)
+            state_obj = salt.state.State(minion_opts)
+        ret = state_obj.call_high(high)
+        return dict((tag.split('_|-')[1], (ret[tag]['result'], ret[tag]['comment']))
+                    for tag in ret)
+
+    def test_state_workers(self):
+        '''
+        Test that running the states on workers gives the results of a
+        sequential run
+        '''
+        expected = self._call_high_workers()
+        self.assertEqual(expected['c'], (False, 'One or more requisite failed: w.b'))
+        self.assertEqual(
+            self._call_high_workers(state_workers=2), expected)
+
+    def test_incremental(self):
+        '''
+        Test that a state is skipped when neither its arguments nor its drift
+        probe changed since the last successful run
+        '''
+        high = {'a': {'test': ['succeed_with_changes'], '__sls__': 'inc', '__env__': 'base'}}
+        tag = 'test_|-a_|-a_|-succeed_with_changes'
+        with patch('salt.state.State._gather_pillar'):
+            state_obj = salt.state.State(self.get_temp_config('minion'))
+        probe = MagicMock(return_value=[1])
+
+        def call_high():
+            state_obj.load_incremental()
+            return state_obj.call_high(high)[tag]
+
+        with patch.dict(state_obj.states, {'test.mod_drift_probe': probe}):
+            self.assertTrue(call_high()['changes'])
+            ret = call_high()
+            self.assertTrue(ret['result'])
+            self.assertFalse(ret['changes'])
+            self.assertIn('was not run', ret['comment'])
+            probe.return_value = [2]
+            self.assertTrue(call_high()['changes'])
+            high['a']['test'].append({'order': 1, 'failhard': False})
+            self.assertTrue(call_high()['changes'])
+            # Rendered templates can depend on anything, they always run
+            low = state_obj.compile_high_data(high)[0]
+            self.assertIsNotNone(state_obj._incremental_record(low))
+            low['template'] = 'jinja'
+            self.assertIsNone(state_obj._incremental_record(low))
+        os.remove(os.path.join(state_obj.opts['cachedir'], 'state_incremental.p'))
+
+    def test_requisite_index(self):
+        '''
+        Test that the requisite index resolves requisites by id, name, sls
+        and glob, in the order of the chunks
+        '''
+        chunks = [
+            {'state': 'pkg', 'fun': 'installed', '__id__': 'web', 'name': 'nginx',
+             '__sls__': 'web.pkg'},
+            {'state': 'file', 'fun': 'managed', '__id__': 'conf', 'name': '/etc/nginx.conf',
+             '__sls__': 'web.conf'},
+            {'state': 'service', 'fun': 'running', '__id__': 'nginx', 'name': 'nginx',
+             '__sls__': 'web.conf'},
+        ]
+        index = salt.state.RequisiteIndex(chunks)
+        self.assertEqual(index.find('id', 'nginx'), [chunks[0], chunks[2]])
+        self.assertEqual(index.find('pkg', 'nginx'), [chunks[0]])
+        self.assertEqual(index.find('file', 'nginx'), [])
+        self.assertEqual(index.find('sls', 'web.*'), chunks)
+        self.assertEqual(index.find('file', '/etc/*'), [chunks[1]])
+        self.assertTrue(index.current(chunks))
+        self.assertFalse(index.current(list(chunks)))
+
+    def test_requisite_graph(self):
+        '''
+        Test the requisite graph of a list of low chunks
+        '''
+        with patch('salt.state.State._gather_pillar'):
+            state_obj = salt.state.State(self.get_temp_config('minion'))
+        chunks = [
+            {'state': 'pkg', 'fun': 'installed', '__id__': 'nginx', 'name': 'nginx',
+             '__sls__': 'web'},
+            {'state': 'file', 'fun': 'managed', '__id__': 'conf', 'name': '/etc/nginx.conf',
+             '__sls__': 'web', 'require': [{'pkg': 'nginx'}]},
+            {'state': 'service', 'fun': 'running', '__id__': 'svc', 'name': 'nginx',
+             '__sls__': 'web', 'require': ['nginx'], 'watch': [{'file': 'conf'}]},
+        ]
+        self.assertEqual(
+            state_obj.requisite_graph(chunks),
+            {'pkg_|-nginx_|-nginx_|-installed': {},
+             'file_|-conf_|-/etc/nginx.conf_|-managed': {
+                 'require': ['pkg_|-nginx_|-nginx_|-installed']},
+             'service_|-svc_|-nginx_|-running': {
+                 'require': ['pkg_|-nginx_|-nginx_|-installed',
+                             'service_|-svc_|-nginx_|-running'],
+                 'watch': ['file_|-conf_|-/etc/nginx.conf_|-managed']}})
+
 
 class HighStateTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
     def setUp(self):
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+'''
+unit tests for the sqlite token store
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import shutil
+import tempfile
+import time
+
+# Import Salt Testing libs
+from tests.support.paths import TMP
+from tests.support.unit import TestCase
+
+# Import Salt libs
+import salt.tokens.sqlite as sqlite
+
+
+class SqliteTokensTestCase(TestCase):
+    '''
+    Test the sqlite token store
+    '''
+    def setUp(self):
+        self.opts = {'token_dir': tempfile.mkdtemp(dir=TMP),
+                     'hash_type': 'sha256'}
+        self.addCleanup(shutil.rmtree, self.opts['token_dir'], ignore_errors=True)
+        self.addCleanup(sqlite._CACHE.clear)
+
+    def test_token_lifecycle(self):
+        tdata = sqlite.mk_token(self.opts, {'name': 'user', 'eauth': 'pam',
+                                            'expire': time.time() + 60})
+        tok = tdata['token']
+        self.assertEqual(len(tok), 64)
+        self.assertEqual(sqlite.get_token(self.opts, tok)['name'], 'user')
+        self.assertEqual(sqlite.list_tokens(self.opts), [tok])
+        self.assertEqual(sqlite.get_token(self.opts, 'missing'), {})
+        self.assertEqual(sqlite.rm_token(self.opts, tok), {})
+        self.assertEqual(sqlite.get_token(self.opts, tok), {})
+        self.assertEqual(sqlite.list_tokens(self.opts), [])
+
+    def test_cache(self):
+        tok = sqlite.mk_token(self.opts, {'name': 'user', 'expire': time.time() + 60})['token']
+        sqlite.get_token(self.opts, tok)
+        # Another process removes the token
+        with sqlite._conn(self.opts) as con:
+            con.execute('DELETE FROM tokens')
+        self.assertEqual(sqlite.get_token(self.opts, tok)['name'], 'user')
+        self.opts['eauth_sqlite_cache_ttl'] = 0
+        self.assertEqual(sqlite.get_token(self.opts, tok), {})
+
+    def test_rm_expired(self):
+        now = time.time()
+        expired = [sqlite.mk_token(self.opts, {'expire': now - 10})['token']
+                   for _ in range(3)]
+        valid = sqlite.mk_token(self.opts, {'expire': now + 60})['token']
+        for tok in expired:
+            sqlite.get_token(self.opts, tok)
+        self.assertEqual(sqlite.rm_expired(self.opts), 3)
+        self.assertEqual(sqlite.list_tokens(self.opts), [valid])
+        for tok in expired:
+            self.assertEqual(sqlite.get_token(self.opts, tok), {})
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+'''
+    tests.unit.utils.test_batch
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import os
+import shutil
+import tempfile
+
+# Import Salt Testing libs
+from tests.support.unit import TestCase, skipIf
+from tests.support.mock import MagicMock, patch, NO_MOCK, NO_MOCK_REASON
+
+# Import Salt libs
+import salt.payload
+import salt.utils.batch
+import salt.utils.event
+import salt.utils.stringutils
+
+MINIONS = ['alpha', 'beta', 'gamma', 'delta', 'epsilon']
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class BatchTestCase(TestCase):
+    '''
+    Test case for salt.utils.batch
+    '''
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.opts = {'cachedir': self.tmp,
+                     'timeout': 5,
+                     'gather_job_timeout': 10}
+        self.load = {'fun': 'test.ping', 'arg': [], 'tgt': '*',
+                     'tgt_type': 'glob', 'jid': '20181018120000000000',
+                     'ret': '', 'user': 'root'}
+
+    def _batch(self, **extra):
+        extra.setdefault('batch', '2')
+        data = salt.utils.batch.new_batch(
+            self.opts, self.load, MINIONS, extra,
+            present=set(MINIONS) - set(['delta']))
+        return salt.utils.batch.BatchJob(data)
+
+    def test_get_bnum(self):
+        self.assertEqual(salt.utils.batch.get_bnum('3', 10), 3)
+        self.assertEqual(salt.utils.batch.get_bnum('25%', 10), 2)
+        self.assertEqual(salt.utils.batch.get_bnum('5%', 10), 1)
+        self.assertRaises(ValueError, salt.utils.batch.get_bnum, 'all', 10)
+
+    def test_window(self):
+        batch = self._batch()
+        self.assertEqual(batch.data['down'], ['delta'])
+        self.assertTrue(os.path.isfile(salt.utils.batch.batch_path(self.opts, self.load['jid'])))
+        self.assertEqual(batch.next_minions(100), ['alpha', 'beta'])
+        self.assertEqual(batch.next_minions(100), [])
+        batch.returned('alpha', {'retcode': 0}, 101)
+        self.assertEqual(batch.next_minions(101), ['gamma'])
+        batch.returned('beta', {'retcode': 1}, 102)
+        self.assertEqual(batch.next_minions(102), ['epsilon'])
+        # A late return of a minion no longer run is ignored
+        batch.returned('beta', {'retcode': 0}, 103)
+        batch.returned('gamma', {}, 103)
+        self.assertFalse(batch.done)
+        batch.returned('epsilon', {}, 104)
+        self.assertTrue(batch.done)
+        self.assertEqual(batch.summary()['failed'], ['beta'])
+        self.assertEqual(sorted(batch.summary()['returned']),
+                         ['alpha', 'beta', 'epsilon', 'gamma'])
+
+    def test_batch_wait(self):
+        batch = self._batch(batch_wait=3)
+        self.assertEqual(batch.next_minions(100), ['alpha', 'beta'])
+        batch.returned('alpha', {}, 101)
+        self.assertEqual(batch.next_minions(103), [])
+        self.assertEqual(batch.next_minions(104), ['gamma'])
+
+    def test_failhard(self):
+        batch = self._batch(failhard=True)
+        batch.next_minions(100)
+        batch.returned('alpha', {'retcode': 2}, 101)
+        self.assertEqual(batch.next_minions(101), [])
+        self.assertFalse(batch.done)
+        batch.returned('beta', {}, 102)
+        self.assertTrue(batch.done)
+        self.assertEqual(batch.summary()['not_run'], ['gamma', 'epsilon'])
+
+    def test_timeouts(self):
+        batch = self._batch(batch_timeout=5)
+        batch.next_minions(100)
+        self.assertEqual(batch.to_check(104), [])
+        self.assertEqual(sorted(batch.to_check(105)), ['alpha', 'beta'])
+        self.assertEqual(batch.to_check(106), [])
+        # alpha still runs the job, beta does not answer
+        batch.found_job('alpha', {'jid': self.load['jid']}, 106)
+        self.assertEqual(batch.timed_out(114), [])
+        self.assertEqual(batch.timed_out(115), ['beta'])
+        self.assertEqual(batch.next_minions(115), ['gamma'])
+        self.assertEqual(batch.to_check(111), ['alpha'])
+        batch.found_job('alpha', {}, 112)
+        self.assertEqual(batch.summary()['timedout'], ['beta', 'alpha'])
+
+    def test_manager(self):
+        manager = salt.utils.batch.BatchManager(self.opts)
+        manager.event = MagicMock()
+        manager.event.serial = salt.payload.Serial(self.opts)
+        self._batch()
+        jid = self.load['jid']
+
+        def _event(tag, data):
+            return salt.utils.stringutils.to_bytes(tag + salt.utils.event.TAGEND) + \
+                manager.event.serial.dumps(data)
+        with patch.object(manager, 'publish') as publish:
+            # Only the saved batches can be started
+            manager.handle_event(_event('salt/batch/../new', {}))
+            self.assertEqual(manager.batches, {})
+            manager.handle_event(_event('salt/batch/{0}/new'.format(jid), {}))
+            self.assertEqual(publish.call_args[0][0]['tgt'], ['alpha', 'beta'])
+            self.assertEqual(publish.call_args[0][0]['tgt_type'], 'list')
+            self.assertEqual(publish.call_args[0][0]['jid'], jid)
+
+            manager.handle_event(_event('salt/job/{0}/ret/beta'.format(jid),
+                                        {'id': 'beta', 'return': True, 'retcode': 0}))
+            self.assertEqual(publish.call_args[0][0]['tgt'], ['gamma'])
+            for minion in ('alpha', 'gamma', 'epsilon'):
+                manager.handle_event(_event('salt/job/{0}/ret/{1}'.format(jid, minion),
+                                            {'id': minion, 'return': True, 'retcode': 0}))
+            self.assertEqual(publish.call_count, 3)
+        self.assertEqual(manager.batches, {})
+        self.assertFalse(os.path.exists(salt.utils.batch.batch_path(self.opts, jid)))
+        tag = salt.utils.event.tagify([jid, 'done'], 'batch')
+        done = [call[0][0] for call in manager.event.fire_event.call_args_list
+                if call[0][1] == tag]
+        self.assertEqual(done[0]['down'], ['delta'])
+        self.assertEqual(len(done[0]['returned']), 4)
@@ -396,6 +396,20 @@ class DataTestCase(TestCase):
         with patch.object(builtins, '__salt_system_encoding__', 'ascii'):
             self.assertEqual(salt.utils.data.decode(_b('яйца')), 'яйца')
 
+    def test_decode_already_decoded(self):
+        '''
+        Values which are already decoded, and values which cannot be, are
+        handed back as they are
+        '''
+        data = {'a': ['b', 1, 2.5, None, True], 'c': {'d': 'яйца'}}
+        ret = salt.utils.data.decode(data)
+        self.assertEqual(ret, data)
+        self.assertIs(ret['c']['d'], data['c']['d'])
+        self.assertIs(salt.utils.data.decode(data['c']['d']), data['c']['d'])
+        self.assertEqual(
+            salt.utils.data.encode(ret),
+            {_b('a'): [_b('b'), 1, 2.5, None, True], _b('c'): {_b('d'): _b('яйца')}})
+
     def test_encode(self):
         '''
         NOTE: This uses the lambda "_b" defined above in the global scope,
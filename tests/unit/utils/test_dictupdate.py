@@ -195,3 +195,39 @@ class UtilDictMergeTestCase(TestCase):
         mdict1['A'] = ['B']
         ret = dictupdate.merge_list(mdict1, {'A': ['b', 'c']})
         self.assertEqual({'A': [['B'], ['b', 'c']], 'C': {'D': 'E', 'F': {'I': 'J', 'G': 'H'}}}, ret)
+
+    def test_merge_recurse_copy(self):
+        '''
+        By default the result shares nothing with obj_a
+        '''
+        dict1 = {'x': {'a': 1}}
+        ret = dictupdate.merge(dict1, {'y': 2})
+        ret['x']['b'] = 2
+        self.assertEqual(dict1, {'x': {'a': 1}})
+
+    def test_merge_recurse_copy_on_write(self):
+        '''
+        obj_a is left untouched and only the mappings along the merged keys
+        are copied
+        '''
+        dict1 = copy.deepcopy(self.dict1)
+        dict1['K'] = {'L': 'M'}
+        ret = dictupdate.merge_recurse(dict1, {'C': {'F': {'G': 'g'}}},
+                                       copy_on_write=True)
+        self.assertEqual(dict1, dict(self.dict1, K={'L': 'M'}))
+        self.assertEqual(ret['C']['F'], {'G': 'g', 'I': 'J'})
+        self.assertIsNot(ret, dict1)
+        self.assertIsNot(ret['C'], dict1['C'])
+        self.assertIsNot(ret['C']['F'], dict1['C']['F'])
+        self.assertIs(ret['K'], dict1['K'])
+
+    def test_merge_recurse_lists(self):
+        '''
+        Merged lists are new lists holding the items of the second list which
+        the first one lacks
+        '''
+        dict1 = {'A': [1, {'B': 'C'}, 2]}
+        ret = dictupdate.merge_recurse(
+            dict1, {'A': [2, {'B': 'C'}, 3, [4]]}, merge_lists=True)
+        self.assertEqual(ret, {'A': [1, {'B': 'C'}, 2, 3, [4]]})
+        self.assertEqual(dict1, {'A': [1, {'B': 'C'}, 2]})
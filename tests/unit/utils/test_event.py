@@ -25,6 +25,7 @@ from multiprocessing import Process
 from tests.support.unit import expectedFailure, skipIf, TestCase
 
 # Import salt libs
+import salt.payload
 import salt.utils.event
 import salt.utils.stringutils
 import tests.integration as integration
@@ -337,6 +338,13 @@ class TestSaltEvent(TestCase):
             evt = me.get_event(tag='fire_master')
             self.assertGotEvent(evt, {'data': data, 'tag': 'test_master', 'events': None, 'pretag': None})
 
+    def test_unpack_tag(self):
+        serial = salt.payload.Serial({'serial': 'msgpack'})
+        mdata = serial.dumps({'data': 'foo1'})
+        raw = salt.utils.stringutils.to_bytes('evt1' + salt.utils.event.TAGEND) + mdata
+        self.assertEqual(salt.utils.event.SaltEvent.unpack_tag(raw), ('evt1', mdata))
+        self.assertEqual(salt.utils.event.SaltEvent.unpack(raw), ('evt1', {'data': 'foo1'}))
+
 
 class TestAsyncEventPublisher(AsyncTestCase):
     def get_new_ioloop(self):
@@ -2,9 +2,13 @@
 
 # Import python libs
 from __future__ import absolute_import, unicode_literals
+import os
+import shutil
 import sys
+import tempfile
 
 # Import Salt Libs
+import salt.utils.files
 import salt.utils.minions
 
 # Import Salt Testing Libs
@@ -368,6 +372,70 @@ class CkMinionsTestCase(TestCase):
         ret = self.ckminions.auth_check(auth_list, 'test.arg', args, 'runner')
         self.assertTrue(ret)
 
+    def test_match_check_regex_cache(self):
+        salt.utils.minions._REGEX_CACHE.clear()
+        self.assertTrue(self.ckminions.match_check('test.*', 'test.ping'))
+        self.assertTrue(self.ckminions.match_check('test.*', ['test.arg', 'test.echo']))
+        self.assertFalse(self.ckminions.match_check('test.*', ['test.arg', 'cmd.run']))
+        self.assertEqual(list(salt.utils.minions._REGEX_CACHE), ['test.*'])
+        # Invalid regexes never match
+        self.assertFalse(self.ckminions.match_check('test.(', 'test.ping'))
+        self.assertIsNone(salt.utils.minions._REGEX_CACHE['test.('])
+        self.assertFalse(self.ckminions.match_check(['test.*'], 'test.ping'))
+
+    def test_expand_matching_cache(self):
+        pki_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, pki_dir, ignore_errors=True)
+        os.makedirs(os.path.join(pki_dir, 'minions'))
+
+        def _add_key(minion):
+            path = os.path.join(pki_dir, 'minions', minion)
+            with salt.utils.files.fopen(path, 'w') as fp_:
+                fp_.write(minion)
+            # Age the directory past the resolution of its mtime
+            past = os.stat(pki_dir).st_mtime - 100 + len(os.listdir(os.path.dirname(path)))
+            os.utime(os.path.join(pki_dir, 'minions'), (past, past))
+        _add_key('web1')
+        _add_key('db1')
+        ckminions = salt.utils.minions.CkMinions({'pki_dir': pki_dir, 'key_cache': ''})
+        with patch.object(ckminions, '_pki_minions', wraps=ckminions._pki_minions) as pki_minions:
+            self.assertEqual(ckminions._expand_matching('web*'), set(['web1']))
+            self.assertEqual(ckminions._expand_matching('web*'), set(['web1']))
+            self.assertEqual(pki_minions.call_count, 1)
+            # Accepting a key invalidates the cached results
+            _add_key('web2')
+            self.assertEqual(ckminions._expand_matching('web*'), set(['web1', 'web2']))
+            self.assertEqual(pki_minions.call_count, 2)
+            # The results of the other matchers are never cached
+            with patch.object(ckminions, '_check_grain_minions',
+                              MagicMock(return_value={'minions': ['db1'], 'missing': []})) as grain:
+                ckminions._expand_matching('G@role:db')
+                ckminions._expand_matching('G@role:db')
+                self.assertEqual(grain.call_count, 2)
+
+    @patch('salt.utils.minions.CkMinions._pki_minions', MagicMock(return_value=['alpha', 'beta', 'gamma']))
+    def test_auth_check_resolves_target_once(self):
+        auth_list = [{'beta': 'test.ping'}, {'gamma': 'test.ping'}, {'al*': 'test.ping'}]
+        with patch.object(self.ckminions, 'check_minions',
+                          wraps=self.ckminions.check_minions) as check_minions:
+            self.assertTrue(self.ckminions.auth_check(auth_list, 'test.ping', None, 'alpha'))
+        targets = [call[0][0] for call in check_minions.call_args_list]
+        self.assertEqual(targets.count('alpha'), 1)
+
+
+    def test_check_cache_minions_fetch_many(self):
+        ckminions = salt.utils.minions.CkMinions({'minion_data_cache': True})
+        mdatas = {('minions/alpha', 'data'): {'grains': {'role': 'web'}},
+                  ('minions/beta', 'data'): {'grains': {'role': 'db'}},
+                  ('minions/gamma', 'data'): {}}
+        with patch.object(ckminions.cache, 'list', MagicMock(return_value=['alpha', 'beta', 'gamma'])), \
+                patch.object(ckminions.cache, 'fetch_many', MagicMock(return_value=mdatas)) as fetch_many, \
+                patch.object(ckminions.cache, 'fetch') as fetch:
+            ret = ckminions._check_grain_minions('role:web', ':', False)
+        self.assertEqual(ret['minions'], ['alpha'])
+        self.assertEqual(fetch_many.call_count, 1)
+        self.assertFalse(fetch.called)
+
 
 @skipIf(sys.version_info < (2, 7), 'Python 2.7 needed for dictionary equality assertions')
 class TargetParseTestCase(TestCase):
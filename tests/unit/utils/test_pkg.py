@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+'''
+    tests.unit.utils.test_pkg
+    ~~~~~~~~~~~~~~~~~~~~~~~~~
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import os
+import shutil
+import tempfile
+
+# Import Salt Testing libs
+from tests.support.unit import TestCase
+
+# Import Salt libs
+import salt.utils.files
+import salt.utils.pkg
+
+
+class MetadataCacheTestCase(TestCase):
+    '''
+    Test case for the package metadata cache of salt.utils.pkg
+    '''
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.opts = {'cachedir': os.path.join(self.tmp, 'cache'),
+                     'pkg_metadata_cache': True}
+        self.lists = os.path.join(self.tmp, 'lists')
+        os.makedirs(os.path.join(self.lists, 'partial'))
+        self.write(os.path.join(self.lists, 'Release'), 'a')
+        self.write(os.path.join(self.lists, 'partial', 'repomd.xml'), 'a')
+
+    def write(self, path, data):
+        with salt.utils.files.fopen(path, 'w') as fp_:
+            fp_.write(data)
+
+    def test_metadata_stamp(self):
+        stamp = salt.utils.pkg.metadata_stamp(self.opts, [self.lists])
+        self.assertEqual(
+            [x[0] for x in stamp],
+            [self.lists,
+             os.path.join(self.lists, 'Release'),
+             os.path.join(self.lists, 'partial', 'repomd.xml')])
+        stamp = salt.utils.pkg.metadata_stamp(
+            self.opts, [self.lists, os.path.join(self.tmp, 'missing')], ['*.xml'])
+        self.assertEqual(
+            stamp[1:],
+            [[os.path.join(self.lists, 'partial', 'repomd.xml')] + stamp[1][1:],
+             [os.path.join(self.tmp, 'missing'), None, None]])
+        self.assertIsNone(salt.utils.pkg.metadata_stamp({}, [self.lists]))
+
+    def test_metadata_cache(self):
+        stamp = salt.utils.pkg.metadata_stamp(self.opts, [self.lists])
+        self.assertIsNone(
+            salt.utils.pkg.read_metadata_cache(self.opts, 'test', ['a'], stamp))
+        salt.utils.pkg.write_metadata_cache(
+            self.opts, 'test', ['a'], stamp, {'foo': '1.0'})
+        salt.utils.pkg.write_metadata_cache(
+            self.opts, 'test', ['b'], stamp, {'bar': '2.0'})
+        self.assertEqual(
+            salt.utils.pkg.read_metadata_cache(self.opts, 'test', ['a'], stamp),
+            {'foo': '1.0'})
+        self.assertEqual(
+            salt.utils.pkg.read_metadata_cache(self.opts, 'test', ['b'], stamp),
+            {'bar': '2.0'})
+
+        # Updating the metadata invalidates all the entries
+        self.write(os.path.join(self.lists, 'Release'), 'ab')
+        stamp = salt.utils.pkg.metadata_stamp(self.opts, [self.lists])
+        self.assertIsNone(
+            salt.utils.pkg.read_metadata_cache(self.opts, 'test', ['a'], stamp))
+
+        # Without pkg_metadata_cache there is no stamp, nothing is cached
+        salt.utils.pkg.write_metadata_cache(self.opts, 'test', ['a'], None, {})
+        self.assertIsNone(
+            salt.utils.pkg.read_metadata_cache(self.opts, 'test', ['a'], None))
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+'''
+    tests.unit.utils.test_presence
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import os
+import shutil
+import tempfile
+import time
+
+# Import Salt Testing libs
+from tests.support.unit import TestCase, skipIf
+from tests.support.mock import MagicMock, patch, NO_MOCK, NO_MOCK_REASON
+
+# Import Salt libs
+import salt.payload
+import salt.utils.event
+import salt.utils.minions
+import salt.utils.presence
+import salt.utils.stringutils
+
+GRAINS = {
+    'web1': {'ipv4': ['10.0.0.1']},
+    'web2': {'ipv4': ['10.0.0.2'], 'ipv6': ['fe80::2']},
+    'db1': {'ipv4': ['10.0.0.3']},
+}
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class PresenceServiceTestCase(TestCase):
+    '''
+    Test case for salt.utils.presence
+    '''
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.opts = {'cachedir': self.tmp,
+                     'minion_data_cache': True,
+                     'presence_service': True,
+                     'presence_events': True,
+                     'presence_interval': 5,
+                     'loop_interval': 60,
+                     'publish_port': 4505,
+                     'transport': 'zeromq'}
+        self.grains = dict(GRAINS)
+        self.service = salt.utils.presence.PresenceService(self.opts)
+        self.service.cache = MagicMock()
+        self.service.cache.list.side_effect = lambda bank: list(self.grains)
+        self.service.cache.fetch.side_effect = \
+            lambda bank, key: {'grains': self.grains[bank.split('/')[1]]} \
+            if bank.split('/')[1] in self.grains else None
+        self.service.event = MagicMock()
+        self.service.event.serial = salt.payload.Serial(self.opts)
+
+    def _tick(self, conns):
+        with patch('salt.utils.presence.connected_addrs', MagicMock(return_value=set(conns))):
+            self.service.tick()
+
+    def _event(self, tag, data):
+        self.service.handle_event(
+            salt.utils.stringutils.to_bytes(tag + salt.utils.event.TAGEND) +
+            self.service.event.serial.dumps(data))
+
+    def _fired(self, tag):
+        return [call[0][0] for call in self.service.event.fire_event.call_args_list
+                if call[0][1] == tag]
+
+    def test_connections(self):
+        self._tick(['10.0.0.1', 'fe80::2'])
+        self.assertEqual(self.service.present, {'web1': '10.0.0.1', 'web2': 'fe80::2'})
+        self.assertEqual(self.service.cache.list.call_count, 1)
+        self.assertEqual(salt.utils.presence.connected(self.opts),
+                         {'web1': '10.0.0.1', 'web2': 'fe80::2'})
+
+        # Only the minions at the changed addresses are looked at
+        self.service.cache.fetch.reset_mock()
+        self._tick(['10.0.0.1', 'fe80::2', '10.0.0.2', '10.0.0.3'])
+        self._tick(['10.0.0.2', '10.0.0.3'])
+        self.assertEqual(self.service.present, {'web2': '10.0.0.2', 'db1': '10.0.0.3'})
+        self.assertEqual(self.service.cache.fetch.call_count, 0)
+        self.assertEqual(self.service.cache.list.call_count, 1)
+        changes = self._fired(salt.utils.event.tagify('change', 'presence'))
+        self.assertEqual(changes[-1], {'new': [], 'lost': ['web1']})
+
+    def test_unknown_addresses(self):
+        self._tick(['10.0.0.1'])
+        self.grains['app1'] = {'ipv4': ['10.0.0.9']}
+        # New minions are indexed from their events
+        self._event('salt/minion/app1/start', {})
+        self._tick(['10.0.0.1', '10.0.0.9'])
+        self.assertIn('app1', self.service.present)
+        self.assertEqual(self.service.cache.list.call_count, 1)
+        # Unknown addresses are looked for in the whole cache at most once
+        # per loop_interval
+        self._tick(['10.0.0.1', '10.0.0.9', '10.0.0.10'])
+        self.assertEqual(self.service.cache.list.call_count, 1)
+        self.service.last_rebuild -= 60
+        self._tick(['10.0.0.1', '10.0.0.9', '10.0.0.10'])
+        self.assertEqual(self.service.cache.list.call_count, 2)
+        self._tick(['10.0.0.1', '10.0.0.9', '10.0.0.10'])
+        self.assertEqual(self.service.cache.list.call_count, 2)
+
+    def test_key_events(self):
+        self._tick(['10.0.0.1', '10.0.0.3'])
+        self._event('salt/key', {'act': 'delete', 'id': 'db1', 'result': True})
+        self.assertEqual(self.service.present, {'web1': '10.0.0.1'})
+        self.grains['db1'] = {'ipv4': ['10.0.0.1']}
+        self._event('salt/auth', {'act': 'accept', 'id': 'db1', 'result': True})
+        self.assertEqual(self.service.present, {'web1': '10.0.0.1', 'db1': '10.0.0.1'})
+
+    def test_connected_ids(self):
+        ckminions = salt.utils.minions.CkMinions(self.opts)
+        self._tick(['10.0.0.1', '10.0.0.2'])
+        with patch.object(ckminions.cache, 'list') as cache_list:
+            self.assertEqual(ckminions.connected_ids(), set(['web1', 'web2']))
+            self.assertEqual(ckminions.connected_ids(subset=['web2', 'db1']), set(['web2']))
+            self.assertEqual(ckminions.connected_ids(show_ip=True),
+                             set([('web1', '10.0.0.1'), ('web2', '10.0.0.2')]))
+            self.assertFalse(cache_list.called)
+        # A table which is no longer updated is not used
+        past = time.time() - 60
+        os.utime(salt.utils.presence.presence_path(self.opts), (past, past))
+        self.assertIsNone(salt.utils.presence.connected(self.opts))
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+'''
+    tests.unit.utils.test_profile
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import os
+import shutil
+import tempfile
+
+# Import Salt Testing libs
+from tests.support.unit import skipIf, TestCase
+
+# Import Salt libs
+import salt.utils.files
+import salt.utils.profile
+
+
+class PhaseProfilerTestCase(TestCase):
+    '''
+    Test case for salt.utils.profile.PhaseProfiler
+    '''
+    def test_nested_phases(self):
+        profiler = salt.utils.profile.PhaseProfiler()
+        with profiler.phase('render'):
+            for _ in range(2):
+                with profiler.phase('sls base:a;b'):
+                    pass
+        with profiler.phase('execute'):
+            pass
+        self.assertEqual(
+            sorted(profiler.phases),
+            ['execute', 'render', 'render;sls base:a:b'])
+        self.assertEqual(profiler.phases['render;sls base:a:b']['calls'], 2)
+        self.assertEqual(profiler.phases['render']['calls'], 1)
+        self.assertGreaterEqual(
+            profiler.phases['render']['wall'],
+            profiler.phases['render;sls base:a:b']['wall'])
+
+    def test_exception(self):
+        profiler = salt.utils.profile.PhaseProfiler()
+        with self.assertRaises(ValueError):
+            with profiler.phase('render'):
+                raise ValueError()
+        with profiler.phase('execute'):
+            pass
+        self.assertEqual(sorted(profiler.phases), ['execute', 'render'])
+
+    def test_disabled(self):
+        profiler = salt.utils.profile.PhaseProfiler(enabled=False)
+        with profiler.phase('render'):
+            pass
+        self.assertEqual(profiler.phases, {})
+        self.assertEqual(profiler.dump_stats('jid'), [])
+
+    @skipIf(not salt.utils.profile.HAS_CPROFILE, 'cProfile is not available')
+    def test_dump_stats(self):
+        stats_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, stats_path, ignore_errors=True)
+        profiler = salt.utils.profile.PhaseProfiler(stats_path=stats_path)
+        with profiler.phase('render'):
+            with profiler.phase('sls base:a'):
+                pass
+        paths = profiler.dump_stats('jid')
+        self.assertEqual(paths, [os.path.join(stats_path, 'jid.render.pstats')])
+        self.assertTrue(os.path.isfile(paths[0]))
+
+    @skipIf(not salt.utils.profile.HAS_CPROFILE, 'cProfile is not available')
+    def test_dump_stats_error(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, ignore_errors=True)
+        # The stats path cannot be created under a file
+        stats_file = os.path.join(tmp_dir, 'file')
+        with salt.utils.files.fopen(stats_file, 'w'):
+            pass
+        profiler = salt.utils.profile.PhaseProfiler(
+            stats_path=os.path.join(stats_file, 'stats'))
+        with profiler.phase('render'):
+            pass
+        self.assertEqual(profiler.dump_stats('jid'), [])
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+'''
+    tests.unit.utils.test_topmatch
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import os
+import shutil
+import tempfile
+
+# Import Salt Testing libs
+from tests.support.unit import TestCase
+
+# Import Salt libs
+import salt.minion
+import salt.utils.files
+import salt.utils.topmatch
+
+
+class TopMatchCacheTestCase(TestCase):
+    '''
+    Test case for salt.utils.topmatch
+    '''
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.opts = {'cachedir': self.tmp,
+                     'id': 'web1',
+                     'top_match_cache': True,
+                     'renderer': 'yaml',
+                     'nodegroups': {'web': 'G@role:web or L@db1'},
+                     'grains': {'os': 'Debian', 'role': 'web',
+                                'ipv4': ['10.0.0.1']},
+                     'pillar': {'tier': {'name': 'prod'}}}
+
+    def _cache(self):
+        cache = salt.utils.topmatch.TopMatchCache(self.opts, 'state')
+        matcher = salt.minion.Matcher(self.opts)
+        matcher.top_cache = cache
+        calls = []
+        confirm = matcher._confirm_top
+
+        def _confirm_top(*args):
+            calls.append(args[1])
+            return confirm(*args)
+        matcher._confirm_top = _confirm_top
+        return cache, matcher, calls
+
+    def test_references(self):
+        refs = salt.utils.topmatch.references
+        self.assertEqual(refs('glob', 'web*', self.opts), [['id']])
+        self.assertEqual(refs('grain', 'os:Debian', self.opts),
+                         [['grains', 'os']])
+        self.assertEqual(refs('pillar', 'tier:name:prod', self.opts),
+                         [['pillar', 'tier']])
+        self.assertEqual(
+            refs('compound', 'G@os:Debian and not I@tier:name:dev or N@web',
+                 self.opts),
+            [['grains', 'os'], ['pillar', 'tier'],
+             ['grains', 'role'], ['id']])
+        self.assertEqual(
+            refs('compound', 'P|@os|Deb.* and web*', self.opts),
+            [['grains', 'os'], ['id']])
+        self.assertEqual(
+            refs('nodegroup', 'web', self.opts, self.opts['nodegroups']),
+            [['grains', 'role'], ['id']])
+        self.assertIsNone(refs('data', 'foo:bar', self.opts))
+
+    def test_confirm_top(self):
+        cache, matcher, calls = self._cache()
+        self.assertTrue(matcher.confirm_top('G@os:Debian', ['a']))
+        self.assertTrue(matcher.confirm_top('web*', ['b']))
+        self.assertFalse(matcher.confirm_top('os:RedHat', [{'match': 'grain'}, 'c']))
+        cache.save()
+        self.assertEqual(len(calls), 3)
+
+        # Another run with the same inputs matches nothing
+        cache, matcher, calls = self._cache()
+        self.assertTrue(matcher.confirm_top('G@os:Debian', ['a']))
+        self.assertTrue(matcher.confirm_top('web*', ['b']))
+        self.assertFalse(matcher.confirm_top('os:RedHat', [{'match': 'grain'}, 'c']))
+        cache.save()
+        self.assertEqual(calls, [])
+
+        # Only the targets reading the changed grain are matched again
+        self.opts['grains']['os'] = 'RedHat'
+        cache, matcher, calls = self._cache()
+        self.assertFalse(matcher.confirm_top('G@os:Debian', ['a']))
+        self.assertTrue(matcher.confirm_top('web*', ['b']))
+        self.assertTrue(matcher.confirm_top('os:RedHat', [{'match': 'grain'}, 'c']))
+        self.assertEqual(calls, ['G@os:Debian', 'os:RedHat'])
+
+    def test_compile_top(self):
+        cache = salt.utils.topmatch.TopMatchCache(self.opts, 'state')
+        path = os.path.join(self.tmp, 'top.sls')
+        with salt.utils.files.fopen(path, 'w') as fp_:
+            fp_.write('base:\n  "*":\n    - {{ grains.os }}\n')
+        renders = []
+
+        def _render():
+            renders.append(1)
+            return {'base': {'*': [self.opts['grains']['os']]}}
+        self.assertEqual(cache.compile_top(path, 'base', _render),
+                         {'base': {'*': ['Debian']}})
+        cache.save()
+        cache = salt.utils.topmatch.TopMatchCache(self.opts, 'state')
+        self.assertEqual(cache.compile_top(path, 'base', _render),
+                         {'base': {'*': ['Debian']}})
+        self.assertEqual(len(renders), 1)
+        # The top file is a template, so it is rendered for other grains
+        self.opts['grains']['os'] = 'RedHat'
+        self.assertEqual(cache.compile_top(path, 'base', _render),
+                         {'base': {'*': ['RedHat']}})
+        self.assertEqual(len(renders), 2)
+
+    def test_compile_top_dynamic(self):
+        path = os.path.join(self.tmp, 'top.sls')
+        renders = []
+
+        def _render():
+            renders.append(1)
+            return {'base': {'*': ['core']}}
+
+        def _compile_twice(contents):
+            with salt.utils.files.fopen(path, 'w') as fp_:
+                fp_.write(contents)
+            del renders[:]
+            for _ in range(2):
+                cache = salt.utils.topmatch.TopMatchCache(self.opts, 'state')
+                cache.compile_top(path, 'base', _render)
+                cache.save()
+            return len(renders)
+
+        self.assertEqual(_compile_twice('base:\n  "*":\n    - salt.minion\n'), 1)
+        for contents in ('{% set r = salt["cmd.run"]("hostname") %}',
+                         '{% from "map.jinja" import roles %}',
+                         '{% include "other.sls" %}',
+                         'base:\n  "*":\n    - ${grains["os"]}\n'):
+            self.assertEqual(_compile_twice(contents), 2)
+        self.opts['renderer'] = 'mako|yaml'
+        self.assertEqual(_compile_twice('base:\n  "*":\n    - core\n'), 2)
+
+    def test_disabled(self):
+        self.opts['top_match_cache'] = False
+        cache, matcher, calls = self._cache()
+        matcher.confirm_top('web*', ['b'])
+        cache.save()
+        matcher.confirm_top('web*', ['b'])
+        self.assertEqual(len(calls), 2)
+        self.assertFalse(os.path.exists(os.path.join(self.tmp, 'top_match')))